@@ -1,10 +1,15 @@
 import json
 
+import numpy as np
+
+from sc2cast.event_store import EventStore
+
 data = json.load(open('output/replay_events.json'))
+events = EventStore.from_records(data['events'])
 
 # Get high-priority events (battles, expansions)
-high = [e for e in data['events'] if e['priority'] == 'high']
-medium = [e for e in data['events'] if e['priority'] == 'medium']
+high = events[events.with_priority('high')]
+medium = events[events.with_priority('medium')]
 
 print("=" * 80)
 print("HIGH-PRIORITY EVENTS (Expansions, Major Units)")
@@ -22,20 +27,21 @@ print(f"Total: {len(medium)}")
 
 # Group by minute for battles
 print("\nArmy deaths by minute:")
+army_deaths = medium[medium.of_type('unit_died')]
+minutes = army_deaths.timestamps // 60
 for minute in range(7):
-    min_events = [e for e in medium if minute * 60 <= e['timestamp'] < (minute + 1) * 60 and e['type'] == 'unit_died']
-    if min_events:
+    min_events = army_deaths[minutes == minute]
+    if len(min_events):
         # Show unit types
-        units = {}
-        for e in min_events:
-            unit = e.get('unit_name', 'Unknown')
-            units[unit] = units.get(unit, 0) + 1
-        unit_str = ", ".join([f"{count} {unit}" for unit, count in sorted(units.items(), key=lambda x: -x[1])[:3]])
+        name_ids, counts = np.unique(min_events.name_ids, return_counts=True)
+        top = np.argsort(-counts, kind='stable')[:3]
+        unit_str = ", ".join([f"{counts[i]} {events.names[name_ids[i]]}" for i in top])
         print(f"  {minute}:00-{minute}:59 → {len(min_events)} army deaths ({unit_str})")
 
 # Show some key battles
 print("\nSample battle events (minutes 4-6):")
-battle_events = [e for e in medium if 240 <= e['timestamp'] < 378 and e['type'] == 'unit_died']
+in_window = (army_deaths.timestamps >= 240) & (army_deaths.timestamps < 378)
+battle_events = army_deaths[in_window]
 for e in battle_events[:15]:
     name = e.get('unit_name', 'Unknown')
     mins = e['timestamp'] // 60
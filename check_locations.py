@@ -1,9 +1,14 @@
 import json
 
+import numpy as np
+
+from sc2cast.event_store import EventStore
+
 data = json.load(open('output/replay_events.json'))
+events = EventStore.from_records(data['events'])
 
 # Check high-priority events with locations
-high = [e for e in data['events'] if e['priority'] == 'high' and e.get('location')]
+high = events[events.with_priority('high') & events.has_location]
 
 print("=" * 80)
 print("HIGH-PRIORITY EVENTS WITH LOCATIONS")
@@ -19,11 +24,10 @@ for e in high:
 print("\n" + "=" * 80)
 print("BATTLE LOCATIONS (Sample from minutes 4-6)")
 print("=" * 80)
-battles = [e for e in data['events'] 
-           if e['type'] == 'unit_died' 
-           and e['priority'] == 'medium' 
-           and 240 <= e['timestamp'] < 378
-           and e.get('location')]
+battles = events[events.of_type('unit_died')
+                & events.with_priority('medium')
+                & (events.timestamps >= 240) & (events.timestamps < 378)
+                & events.has_location]
 
 print(f"Found {len(battles)} army deaths with locations")
 print("\nFirst 15 battle events:")
@@ -40,17 +44,12 @@ print("BATTLE HOTSPOTS (clustered by location)")
 print("=" * 80)
 
 # Simple clustering by rounding to nearest 10
-clusters = {}
-for e in battles:
-    if e.get('location'):
-        loc = e['location']
-        cluster_key = (round(loc['x'] / 10) * 10, round(loc['y'] / 10) * 10)
-        if cluster_key not in clusters:
-            clusters[cluster_key] = []
-        clusters[cluster_key].append(e)
+cells = np.stack([np.round(battles.data['x'] / 10) * 10, np.round(battles.data['y'] / 10) * 10], axis=1).astype(int)
+keys, cell_index, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
 
 # Show top battle locations
-top_clusters = sorted(clusters.items(), key=lambda x: len(x[1]), reverse=True)[:5]
-for (x, y), events in top_clusters:
-    time_range = f"{min(e['timestamp'] for e in events)}s - {max(e['timestamp'] for e in events)}s"
-    print(f"  Location ({x:>3}, {y:>3}): {len(events):>2} deaths, {time_range}")
+for i in np.argsort(-counts, kind='stable')[:5]:
+    x, y = keys[i]
+    times = battles.timestamps[cell_index.ravel() == i]
+    time_range = f"{times.min()}s - {times.max()}s"
+    print(f"  Location ({x:>3}, {y:>3}): {counts[i]:>2} deaths, {time_range}")
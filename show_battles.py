@@ -1,6 +1,9 @@
 import json
 
+from sc2cast.event_index import EventIndex
+
 data = json.load(open('output/prioritized_events.json'))
+camera_events = EventIndex(data['events'])
 
 print("=" * 80)
 print("BATTLE DETAILS")
@@ -17,8 +20,16 @@ for battle in data['battles']:
     print(f"   Location: ({battle['location']['x']}, {battle['location']['y']})")
     print(f"   Deaths: {battle['death_count']}")
     print(f"   Army Value Lost: {battle['army_value_lost']}")
+    kills = battle.get('kills_by_player', {})
+    if kills:
+        print(f"   Kills: {', '.join(f'P{player} {value}' for player, value in kills.items())}")
     print(f"   Priority: {battle['priority']}")
     print(f"   Peak Time: {battle['peak_time']//60:02d}:{battle['peak_time']%60:02d}")
+    
+    # Other camera-worthy moments competing for the camera during this battle
+    during = [e for e in camera_events.overlapping(battle['start_time'], battle['end_time']) if e['event_type'] != 'battle']
+    if during:
+        print(f"   Also happening: {', '.join(e['description'] for e in during)}")
 
 print("\n" + "=" * 80)
 print("CAMERA-READY EVENTS")
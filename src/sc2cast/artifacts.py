@@ -0,0 +1,415 @@
+"""
+Analysis Artifacts - Compact binary container for one replay's analysis.
+
+The batch artifacts used to be three pretty-printed JSON files, and the
+prioritized events file repeated every death of every battle as a full
+dict. An artifact is a single uncompressed .npz holding:
+
+- events.*: raw extracted events, one array per EventStore column
+- priority.*: prioritized events (descriptions, types as string ids)
+- battles.*: battle columns; their deaths are events.*-style columns in
+  deaths.*, sliced by battles.death_offsets
+- shots.*: camera script (params as compact JSON strings)
+- strings.*: one interned string table shared by everything above
+- meta: small JSON document (replay file, game length, summary)
+
+Timestamps are delta-encoded and every integer column is stored in the
+narrowest dtype that fits. Because members are stored uncompressed,
+ArtifactReader memory-maps a column straight out of the file the first
+time it is used; nothing else is read. export_json() writes the old JSON
+layout for debugging.
+"""
+
+import json
+import os
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .event_store import EventStore, EVENT_DTYPE, NO_LOCATION, NO_PLAYER, PRIORITIES, PRIORITY_CODES
+except ImportError:
+    from event_store import EventStore, EVENT_DTYPE, NO_LOCATION, NO_PLAYER, PRIORITIES, PRIORITY_CODES
+
+
+ARTIFACT_FILE = "analysis.npz"
+FORMAT_VERSION = 1
+
+# Zip local file header: signature ... name length (offset 26), extra length (offset 28)
+LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+# Columns written for an EventStore besides the delta-encoded timestamp
+STORE_COLUMNS = ("type", "name", "player", "owner", "x", "y", "priority")
+
+
+def narrow(values) -> np.ndarray:
+    """Integer array in the smallest signed dtype that holds all values."""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return values.astype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def delta_encode(values) -> np.ndarray:
+    """First value followed by successive differences (narrowed)."""
+    values = np.asarray(values, dtype=np.int64)
+    return narrow(np.diff(values, prepend=0))
+
+
+def delta_decode(deltas) -> np.ndarray:
+    return np.cumsum(deltas, dtype=np.int64)
+
+
+def _number(value) -> float:
+    """Stored float32 back to the int it usually was."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class StringTable:
+    """Interned strings, stored as one UTF-8 blob plus end offsets."""
+    
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+    
+    def intern(self, text: str) -> int:
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(text)
+            self._ids[text] = string_id
+        return string_id
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in self.strings]
+        return {
+            "strings.blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "strings.ends": np.cumsum([len(b) for b in encoded], dtype=np.int64),
+        }
+
+
+def _store_arrays(prefix: str, store: EventStore, strings: StringTable) -> Dict[str, np.ndarray]:
+    """EventStore columns, with name ids remapped into the shared string table."""
+    data = store.data
+    name_map = np.array([strings.intern(name) for name in store.names], dtype=np.int64)
+    arrays = {f"{prefix}.timestamp": delta_encode(data["timestamp"])}
+    for column in STORE_COLUMNS:
+        values = name_map[data["name"]] if column == "name" and len(data) else data[column]
+        arrays[f"{prefix}.{column}"] = narrow(values)
+    return arrays
+
+
+def _location_arrays(prefix: str, locations: List[Optional[Dict[str, int]]]) -> Dict[str, np.ndarray]:
+    return {
+        f"{prefix}.x": narrow([loc["x"] if loc else NO_LOCATION for loc in locations]),
+        f"{prefix}.y": narrow([loc["y"] if loc else NO_LOCATION for loc in locations]),
+    }
+
+
+def write_artifact(path: Path, events: Optional[EventStore] = None, prioritizer=None, shots=None,
+                   meta: Optional[Dict[str, Any]] = None):
+    """
+    Write an analysis artifact (atomically).
+    
+    Args:
+        path: Output .npz path
+        events: Raw extracted events
+        prioritizer: EventPrioritizer after process_events()
+        shots: CameraShot list from ScriptGenerator
+        meta: Extra JSON-serializable metadata (replay file, game length, ...)
+    """
+    strings = StringTable()
+    arrays: Dict[str, np.ndarray] = {}
+    meta = dict(meta or {})
+    meta["format_version"] = FORMAT_VERSION
+    
+    if events is not None:
+        arrays.update(_store_arrays("events", events, strings))
+    
+    if prioritizer is not None:
+        meta["summary"] = prioritizer.get_summary()
+        
+        priority_events = prioritizer.all_priority_events
+        arrays["priority.time"] = delta_encode([e.time_seconds for e in priority_events])
+        arrays["priority.event_type"] = narrow([strings.intern(e.event_type) for e in priority_events])
+        arrays["priority.description"] = narrow([strings.intern(e.description) for e in priority_events])
+        arrays["priority.priority"] = narrow([PRIORITY_CODES[e.priority] for e in priority_events])
+        arrays["priority.score"] = np.array([e.score for e in priority_events], dtype=np.float32)
+        arrays["priority.duration"] = narrow([e.duration for e in priority_events])
+        arrays.update(_location_arrays("priority", [e.location for e in priority_events]))
+        
+        battles = prioritizer.battles
+        arrays["battles.start"] = narrow([b.start_time for b in battles])
+        arrays["battles.end"] = narrow([b.end_time for b in battles])
+        arrays["battles.peak"] = narrow([b.peak_time for b in battles])
+        arrays["battles.value"] = narrow([b.army_value_lost for b in battles])
+        arrays["battles.priority"] = narrow([PRIORITY_CODES[b.priority] for b in battles])
+        arrays["battles.resources_lost"] = narrow([-1 if b.resources_lost is None else b.resources_lost for b in battles])
+        arrays.update(_location_arrays("battles", [b.location for b in battles]))
+        arrays["battles.death_offsets"] = np.cumsum([0] + [len(b.deaths) for b in battles], dtype=np.int64)
+        
+        kills = [(i, player, value) for i, b in enumerate(battles) for player, value in b.kills_by_player.items()]
+        arrays["kills.battle"] = narrow([k[0] for k in kills])
+        arrays["kills.player"] = narrow([k[1] for k in kills])
+        arrays["kills.value"] = np.array([k[2] for k in kills], dtype=np.float32)
+        
+        losses = [(i, player, value) for i, b in enumerate(battles) for player, value in b.losses_by_player.items()]
+        arrays["losses.battle"] = narrow([k[0] for k in losses])
+        arrays["losses.player"] = narrow([k[1] for k in losses])
+        arrays["losses.value"] = np.array([k[2] for k in losses], dtype=np.float32)
+        
+        deaths = EventStore.from_records(death for b in battles for death in b.deaths)
+        arrays.update(_store_arrays("deaths", deaths, strings))
+    
+    if shots is not None:
+        arrays["shots.time"] = delta_encode([s.time_seconds for s in shots])
+        arrays["shots.type"] = narrow([strings.intern(s.shot_type.value) for s in shots])
+        arrays["shots.params"] = narrow([strings.intern(json.dumps(s.params, separators=(",", ":"))) for s in shots])
+    
+    arrays.update(strings.arrays())
+    arrays["meta"] = np.frombuffer(json.dumps(meta, separators=(",", ":")).encode("utf-8"), dtype=np.uint8)
+    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+class ArtifactReader:
+    """
+    Lazy reader for an analysis artifact.
+    
+    Columns are memory-mapped on first access; decoding (timestamps, the
+    string table, dict views) happens only for what is asked for.
+    
+    Example:
+        artifact = ArtifactReader(replay_dir / ARTIFACT_FILE)
+        artifact.meta["summary"]["battles"]
+        artifact.column("battles.value")     # memory-mapped array
+        artifact.shots()                     # save_script-style dicts
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._meta: Optional[Dict[str, Any]] = None
+        self._strings: Optional[List[str]] = None
+        
+        # Data offset of every member (np.savez stores them uncompressed)
+        self._offsets: Dict[str, int] = {}
+        with open(self.path, "rb") as f, zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError(f"{self.path}: member {info.filename} is compressed, cannot memory-map")
+                f.seek(info.header_offset)
+                signature, name_length, extra_length = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+                if signature != b"PK\x03\x04":
+                    raise ValueError(f"{self.path}: bad zip member header for {info.filename}")
+                key = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+                self._offsets[key] = info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._offsets
+    
+    def column(self, name: str) -> np.ndarray:
+        """Raw stored column (memory-mapped, read-only)."""
+        array = self._columns.get(name)
+        if array is None:
+            with open(self.path, "rb") as f:
+                f.seek(self._offsets[name])
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                offset = f.tell()
+            if int(np.prod(shape)) == 0:
+                array = np.empty(shape, dtype=dtype)
+            else:
+                array = np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                                  order="F" if fortran_order else "C")
+            self._columns[name] = array
+        return array
+    
+    @property
+    def meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            self._meta = json.loads(bytes(self.column("meta")).decode("utf-8"))
+        return self._meta
+    
+    @property
+    def strings(self) -> List[str]:
+        """The interned string table."""
+        if self._strings is None:
+            blob = bytes(self.column("strings.blob"))
+            ends = self.column("strings.ends").tolist()
+            starts = [0] + ends[:-1]
+            self._strings = [blob[s:e].decode("utf-8") for s, e in zip(starts, ends)]
+        return self._strings
+    
+    def timestamps(self, prefix: str) -> np.ndarray:
+        """Decoded timestamp column of an event group ("events", "deaths")."""
+        return delta_decode(self.column(f"{prefix}.timestamp"))
+    
+    def _store(self, prefix: str) -> EventStore:
+        length = len(self.column(f"{prefix}.timestamp"))
+        data = np.empty(length, dtype=EVENT_DTYPE)
+        data["timestamp"] = self.timestamps(prefix)
+        for column in STORE_COLUMNS:
+            if f"{prefix}.{column}" in self:
+                data[column] = self.column(f"{prefix}.{column}")
+            else:
+                data[column] = NO_PLAYER  # owner: absent in older artifacts
+        return EventStore(data, self.strings)
+    
+    def events(self) -> EventStore:
+        """Raw extracted events (names resolve through the shared string table)."""
+        return self._store("events")
+    
+    def _location(self, prefix: str, i: int) -> Optional[Dict[str, int]]:
+        x, y = int(self.column(f"{prefix}.x")[i]), int(self.column(f"{prefix}.y")[i])
+        return None if x == NO_LOCATION and y == NO_LOCATION else {"x": x, "y": y}
+    
+    def priority_events(self) -> List[Dict[str, Any]]:
+        """Prioritized events as PrioritizedEvent.to_dict() dicts."""
+        if "priority.time" not in self:
+            return []
+        strings = self.strings
+        times = delta_decode(self.column("priority.time"))
+        event_types = self.column("priority.event_type")
+        descriptions = self.column("priority.description")
+        priorities = self.column("priority.priority")
+        scores = self.column("priority.score")
+        durations = self.column("priority.duration")
+        return [
+            {
+                "time_seconds": int(times[i]),
+                "event_type": strings[event_types[i]],
+                "description": strings[descriptions[i]],
+                "location": self._location("priority", i),
+                "priority": PRIORITIES[priorities[i]],
+                "score": _number(scores[i]),
+                "duration": int(durations[i]),
+            }
+            for i in range(len(times))
+        ]
+    
+    def _battle_player_values(self, prefix: str) -> Dict[int, Dict[int, float]]:
+        """Per-battle {player: value} from a kills.*/losses.* group (empty if absent)."""
+        values: Dict[int, Dict[int, float]] = {}
+        if f"{prefix}.battle" not in self:
+            return values
+        for battle, player, value in zip(self.column(f"{prefix}.battle"), self.column(f"{prefix}.player"), self.column(f"{prefix}.value")):
+            values.setdefault(int(battle), {})[int(player)] = round(float(value), 1)
+        return values
+    
+    def battles(self, with_deaths: bool = True) -> List[Dict[str, Any]]:
+        """Battles as BattleEvent.to_dict() dicts (deaths decoded only if asked for)."""
+        if "battles.start" not in self:
+            return []
+        starts, ends = self.column("battles.start"), self.column("battles.end")
+        offsets = self.column("battles.death_offsets")
+        deaths = self._store("deaths") if with_deaths else None
+        
+        kills = self._battle_player_values("kills")
+        losses = self._battle_player_values("losses")
+        
+        # -1: no player stats (absent altogether in older artifacts)
+        resources_lost = self.column("battles.resources_lost") if "battles.resources_lost" in self else None
+        
+        battles = []
+        for i in range(len(starts)):
+            battle = {
+                "start_time": int(starts[i]),
+                "end_time": int(ends[i]),
+                "duration": int(ends[i]) - int(starts[i]),
+                "peak_time": int(self.column("battles.peak")[i]),
+                "location": self._location("battles", i),
+                "death_count": int(offsets[i + 1] - offsets[i]),
+                "army_value_lost": int(self.column("battles.value")[i]),
+                "kills_by_player": kills.get(i, {}),
+                "losses_by_player": losses.get(i, {}),
+                "resources_lost": int(resources_lost[i]) if resources_lost is not None and resources_lost[i] >= 0 else None,
+                "priority": PRIORITIES[self.column("battles.priority")[i]],
+            }
+            if with_deaths:
+                battle["deaths"] = deaths[int(offsets[i]):int(offsets[i + 1])].to_dicts()
+            battles.append(battle)
+        return battles
+    
+    def shots(self) -> List[Dict[str, Any]]:
+        """Camera script as ScriptGenerator.save_script() shot dicts."""
+        if "shots.time" not in self:
+            return []
+        strings = self.strings
+        times = delta_decode(self.column("shots.time"))
+        return [
+            {"time_seconds": int(t), "shot_type": strings[shot_type], "params": json.loads(strings[params])}
+            for t, shot_type, params in zip(times, self.column("shots.type"), self.column("shots.params"))
+        ]
+
+
+def export_json(artifact: ArtifactReader, output_dir: Path):
+    """Write the JSON files batch used to produce (debugging aid)."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    meta = artifact.meta
+    
+    documents = {}
+    if "events.timestamp" in artifact:
+        events = artifact.events().to_dicts()
+        documents["replay_events.json"] = {
+            "replay_file": meta.get("replay_file"),
+            "game_length": meta.get("game_length") or "Unknown",
+            "total_events": len(events),
+            "events": events,
+        }
+    if "priority.time" in artifact:
+        documents["prioritized_events.json"] = {
+            "summary": meta.get("summary"),
+            "events": artifact.priority_events(),
+            "battles": artifact.battles(),
+        }
+    if "shots.time" in artifact:
+        shots = artifact.shots()
+        documents["generated_camera_script.json"] = {"total_shots": len(shots), "shots": shots}
+    
+    for name, document in documents.items():
+        with open(output_dir / name, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"💾 Exported {output_dir / name}")
+
+
+def main():
+    """Summarize an artifact, optionally exporting it to JSON."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Inspect a binary analysis artifact")
+    parser.add_argument("artifact", type=Path, help=f"{ARTIFACT_FILE} file")
+    parser.add_argument("--json", type=Path, metavar="DIR", help="Export the JSON debug files to DIR")
+    args = parser.parse_args()
+    
+    artifact = ArtifactReader(args.artifact)
+    summary = artifact.meta.get("summary", {})
+    print(f"📦 {args.artifact} ({args.artifact.stat().st_size / 1024:.1f} KB, {len(artifact.strings)} strings)")
+    print(f"   Replay: {artifact.meta.get('replay_file')}")
+    print(f"   Priority events: {summary.get('total_events', 0)} | Battles: {summary.get('battles', 0)} | "
+          f"Shots: {len(artifact.column('shots.time')) if 'shots.time' in artifact else 0}")
+    
+    if args.json:
+        export_json(artifact, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Batch Analysis - Run extract → prioritize → script generation over a replay directory.
+
+Usage:
+    poetry run python -m sc2cast.batch replays/ --out output/batch --jobs 8
+
+Each replay gets its own artifact directory (events, prioritized events,
+camera script in one binary analysis.npz artifact, plus an analysis log;
+--json also writes the old JSON files for debugging). A summary.json is
+written last and marks the replay as done, so re-running after a crash
+skips finished replays. It records the replay's content hash, so a file
+overwritten under the same name is analyzed again.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from sc2cast.event_extractor import EventExtractor
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.script_generator import ScriptGenerator
+from sc2cast.replay_cache import ReplayCache, DEFAULT_CACHE_DIR, hash_replay
+from sc2cast.replay_loader import memo_for
+from sc2cast.artifacts import write_artifact, ARTIFACT_FILE
+
+
+SUMMARY_FILE = "summary.json"
+
+
+def artifact_dir(replay_path: Path, out_dir: Path) -> Path:
+    """Artifact directory for a replay."""
+    return out_dir / replay_path.stem
+
+
+def is_done(replay_path: Path, out_dir: Path) -> bool:
+    """
+    True if a previous run fully analyzed the replay's current contents.
+    
+    The content hash is only recomputed when the file's size or mtime
+    differs from the one recorded in its summary.
+    """
+    try:
+        with open(artifact_dir(replay_path, out_dir) / SUMMARY_FILE, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        stat = replay_path.stat()
+    except (OSError, ValueError):
+        return False
+    
+    if "hash" not in summary:
+        return False  # Written before summaries recorded content hashes
+    if summary.get("size") == stat.st_size and summary.get("mtime") == stat.st_mtime:
+        return True
+    return summary["hash"] == hash_replay(replay_path)
+
+
+def analyze_replay(replay_path: Path, out_dir: Path, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                   json_debug: bool = False) -> Dict[str, Any]:
+    """
+    Analyze one replay and write its artifacts.
+    
+    Runs in a worker process. Stage output goes to analysis.log in the
+    artifact directory instead of the (shared) console.
+    
+    Args:
+        replay_path: Path to .SC2Replay file
+        out_dir: Batch output directory
+        cache_dir: Analysis cache and load level memo directory (None disables both)
+        json_debug: Also write the JSON event/script files
+    
+    Returns:
+        Summary dict (counts and timing)
+    """
+    start = time.perf_counter()
+    replay_dir = artifact_dir(replay_path, out_dir)
+    replay_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Identify the contents before reading them: if the file changes during
+    # analysis, the recorded hash is stale and the next run redoes it
+    stat = replay_path.stat()
+    digest = hash_replay(replay_path)
+    
+    cache = ReplayCache(cache_dir) if cache_dir else None
+    
+    with open(replay_dir / "analysis.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        extractor = EventExtractor(replay_path, cache=cache, load_memo=memo_for(cache_dir))
+        extractor.load_replay()
+        extractor.extract_events()
+        
+        player_stats = extractor.player_stats
+        prioritizer = EventPrioritizer(player_stats=player_stats)
+        priority_events = prioritizer.process_events(extractor.events)
+        
+        replay_duration = extractor.game_length_seconds or 0
+        generator = ScriptGenerator()
+        economic_events = player_stats.economic_events() if player_stats else None
+        shots = generator.generate_from_events(priority_events, replay_duration, economic_events)
+        
+        meta = {"replay_file": str(replay_path), "game_length": extractor.game_length, "game_length_seconds": replay_duration}
+        write_artifact(replay_dir / ARTIFACT_FILE, extractor.events, prioritizer, shots, meta)
+        
+        if json_debug:
+            extractor.save_to_json(replay_dir / "replay_events.json")
+            prioritizer.save_to_json(replay_dir / "prioritized_events.json")
+            generator.save_script(shots, replay_dir / "generated_camera_script.json")
+    
+    prioritizer_summary = prioritizer.get_summary()
+    summary = {
+        "replay_file": str(replay_path),
+        "hash": digest,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "game_length_seconds": replay_duration,
+        "raw_events": len(extractor.events),
+        "priority_events": prioritizer_summary["total_events"],
+        "battles": prioritizer_summary["battles"],
+        "camera_shots": len(shots),
+        "from_cache": extractor.from_cache,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    
+    # Written last: its presence marks the replay as done
+    tmp_path = replay_dir / f"{SUMMARY_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, replay_dir / SUMMARY_FILE)
+    
+    return summary
+
+
+def find_replays(replay_dir: Path) -> List[Path]:
+    """All .SC2Replay files in a directory (sorted)."""
+    return sorted(replay_dir.glob("*.SC2Replay"))
+
+
+def run_batch(replay_dir: Path, out_dir: Path, jobs: int = 1, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+              json_debug: bool = False) -> Dict[str, Any]:
+    """
+    Analyze every replay in a directory with a process pool.
+    
+    Args:
+        replay_dir: Directory of .SC2Replay files
+        out_dir: Output directory for per-replay artifacts
+        jobs: Number of worker processes
+        cache_dir: Analysis cache and load level memo directory (None disables both)
+        json_debug: Also write the JSON event/script files
+    
+    Returns:
+        Throughput summary
+    """
+    replays = find_replays(replay_dir)
+    pending = [r for r in replays if not is_done(r, out_dir)]
+    skipped = len(replays) - len(pending)
+    
+    print(f"📂 {len(replays)} replays in {replay_dir} ({skipped} already done, {len(pending)} to analyze)")
+    print(f"⚙️  Workers: {jobs}")
+    
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    done, failed = [], []
+    
+    def report(replay_path, summary):
+        done.append(summary)
+        source = "cache" if summary["from_cache"] else "parsed"
+        print(f"  ✅ {replay_path.name}: {summary['raw_events']} events, {summary['battles']} battles, "
+              f"{summary['camera_shots']} shots ({summary['seconds']:.2f}s, {source})")
+    
+    def report_failure(replay_path, error):
+        failed.append(str(replay_path))
+        print(f"  ❌ {replay_path.name}: {error}")
+    
+    if jobs <= 1:
+        for replay_path in pending:
+            try:
+                report(replay_path, analyze_replay(replay_path, out_dir, cache_dir, json_debug))
+            except Exception as e:
+                traceback.print_exc()
+                report_failure(replay_path, e)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(analyze_replay, r, out_dir, cache_dir, json_debug): r for r in pending}
+            for future in as_completed(futures):
+                replay_path = futures[future]
+                try:
+                    report(replay_path, future.result())
+                except Exception as e:
+                    report_failure(replay_path, e)
+    
+    elapsed = time.perf_counter() - start
+    total_events = sum(s["raw_events"] for s in done)
+    
+    throughput = {
+        "replays": len(replays),
+        "analyzed": len(done),
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "replays_per_second": round(len(done) / elapsed, 2) if elapsed > 0 else 0.0,
+        "events_per_second": round(total_events / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    
+    print()
+    print("📊 BATCH COMPLETE")
+    print("-" * 80)
+    print(f"   Analyzed: {len(done)} | Skipped: {skipped} | Failed: {len(failed)}")
+    print(f"   Time: {elapsed:.2f}s")
+    print(f"   Throughput: {throughput['replays_per_second']} replays/s, {throughput['events_per_second']} events/s")
+    
+    return throughput
+
+
+def main(argv=None):
+    """Batch-analyze a replay directory."""
+    parser = argparse.ArgumentParser(description="Batch replay analysis (extract → prioritize → camera script)")
+    parser.add_argument("replay_dir", type=Path, nargs="?", default=Path("replays"), help="Directory of .SC2Replay files")
+    parser.add_argument("--out", type=Path, default=Path("output/batch"), help="Artifact output directory")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse replays")
+    parser.add_argument("--json", action="store_true", help="Also write JSON artifacts (debugging)")
+    args = parser.parse_args(argv)
+    
+    if not args.replay_dir.is_dir():
+        print(f"❌ Replay directory not found: {args.replay_dir}")
+        return 1
+    
+    result = run_batch(args.replay_dir, args.out, jobs=args.jobs, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR,
+                       json_debug=args.json)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -9,11 +9,6 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-if __name__ == "__main__":
-    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sc2cast.observer_hotkeys import ObserverHotkeys, StatPanel, UIPanel
 from sc2cast.minimap_camera import MinimapCameraController
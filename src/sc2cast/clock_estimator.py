@@ -0,0 +1,289 @@
+"""
+Clock Estimator - Online estimate of game time from timer readings.
+
+The timer shows whole game seconds and is read a few times per second.
+Game time advances at an unknown rate: about 1 game second per real second
+at "Faster", up to 8 at "Fast x4", and 0 while paused. The old clock
+assumed a fixed start offset and a configured multiplier and only fixed
+itself by a hard reset when drift exceeded 3 seconds.
+
+ClockEstimator fits game_time = offset + rate * t (weighted least squares
+over the recent samples of the current regime) and reports:
+
+- game_time(t): fractional game time at any monotonic instant
+- rate: game seconds per real second (0 while paused)
+- uncertainty(t): 1-sigma prediction error in game seconds
+- regime changes: a speed change (consecutive samples off the fitted line
+  in the same direction), a pause (timer stuck for a few ticks at the
+  current rate, or consecutive off-line samples that all show the stuck
+  value), and a resume
+
+A regime that starts from a known rate (the prior, a rate given to
+set_rate(), or the rate before a pause) blends its fitted slope with that
+rate by inverse variance, so two samples a fraction of a second apart
+that straddle a tick can't claim a rate of 5. After a detected speed
+change the old rate is wrong and the samples alone set the new one.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+
+# A displayed second is anywhere in [s, s + 1): its midpoint has this variance
+QUANTIZATION_VARIANCE = 1 / 12
+
+# Relative error assumed for a rate that isn't fitted yet (prior or carried over)
+PRIOR_RATE_ERROR = 0.25
+
+# Longest a running timer shows one value (it ticks every 1.4 s at "Normal");
+# a shorter stall may have been a slowdown rather than a pause
+MAX_TICK_SECONDS = 1.4
+
+
+@dataclass
+class ClockEstimate:
+    """Estimated game clock at one instant."""
+    game_time: float        # Game seconds (fractional)
+    rate: float             # Game seconds per real second
+    uncertainty: float      # 1-sigma error of game_time, in game seconds
+    paused: bool
+
+
+class ClockEstimator:
+    """
+    Weighted linear fit of game time against monotonic time, regime by regime.
+    
+    Example:
+        estimator = ClockEstimator(prior_rate=1.0)
+        event = estimator.add(sample.capture_time, sample.game_seconds, sample.confidence)
+        estimator.game_time(time.monotonic())
+    """
+    
+    def __init__(self, prior_rate: float = 1.0, window: float = 10.0, outlier_seconds: float = 1.5,
+                 change_samples: int = 2, pause_ticks: float = 2.0, pause_samples: float = 2.0):
+        """
+        Initialize estimator.
+        
+        Args:
+            prior_rate: Rate assumed until the samples determine one
+            window: Seconds of samples the fit uses
+            outlier_seconds: Minimum distance from the fit (game seconds) for a sample to disagree
+            change_samples: Consecutive disagreeing samples that mean the rate changed
+                (fewer are discarded as misreads)
+            pause_ticks: Timer ticks (at the current rate) without a change that mean paused
+            pause_samples: ...but never fewer sample intervals than this
+        """
+        self.window = window
+        self.outlier_seconds = outlier_seconds
+        self.change_samples = change_samples
+        self.pause_ticks = pause_ticks
+        self.pause_samples = pause_samples
+        
+        self.rate = prior_rate
+        self.rate_fitted = False  # False: rate is the prior/carried-over value
+        self._prior_rate: Optional[float] = prior_rate  # Known rate the fit is blended with (None: fit alone)
+        self._rate_variance = (PRIOR_RATE_ERROR * prior_rate) ** 2
+        
+        # Current regime's samples: (time, displayed value + 0.5, weight)
+        self._samples: Deque[Tuple[float, float, float]] = deque()
+        self._suspects: List[Tuple[float, float, float]] = []
+        
+        # Fit: game_time(t) = center_value + rate * (t - center_time)
+        self._center_time = 0.0
+        self._center_value = 0.0
+        self._weight = 0.0
+        self._spread = 0.0          # Weighted sum of squared time deviations
+        self._variance = QUANTIZATION_VARIANCE
+        
+        self.last_value: Optional[int] = None
+        self._last_change_time: Optional[float] = None
+        self._last_sample_time: Optional[float] = None
+        self.sample_interval: Optional[float] = None  # Smoothed seconds between readings
+        self.paused = False
+        self._rate_before_pause = prior_rate
+        
+        # Counters
+        self.samples = 0
+        self.outliers = 0
+        self.speed_changes = 0
+        self.pauses = 0
+        self.last_residual: Optional[float] = None
+    
+    @property
+    def ready(self) -> bool:
+        """True once a sample has anchored the clock."""
+        return bool(self._samples)
+    
+    def add(self, t: float, value: int, confidence: float = 1.0) -> Optional[str]:
+        """
+        Add a timer reading.
+        
+        Args:
+            t: time.monotonic() of the capture
+            value: Displayed game seconds
+            confidence: Reader confidence (sample weight)
+        
+        Returns:
+            "speed_change", "pause", "resume", "outlier" (sample ignored) or None
+        """
+        self.samples += 1
+        sample = (t, value + 0.5, max(confidence, 0.01))
+        
+        if self._last_sample_time is not None and t > self._last_sample_time:
+            gap = t - self._last_sample_time
+            self.sample_interval = gap if self.sample_interval is None else 0.8 * self.sample_interval + 0.2 * gap
+        self._last_sample_time = t
+        
+        if not self._samples:
+            self._start_regime([sample], t, value)
+            return None
+        
+        self.last_residual = sample[1] - self.game_time(t)
+        
+        if self.paused:
+            if value == self.last_value:
+                return None
+            self.paused = False
+            stalled = t - self._last_change_time
+            if stalled > MAX_TICK_SECONDS + 2 * (self.sample_interval or 0.0):
+                # A real pause: the game continues at its old speed
+                self.rate = self._rate_before_pause
+                self._prior_rate = self.rate
+            else:
+                # Maybe it slowed down: start from the rate the stall implies, let samples decide
+                self.rate = min(self._rate_before_pause, (value - self.last_value) / stalled)
+                self._prior_rate = None
+            self._start_regime([sample], t, value)
+            return "resume"
+        
+        # Pause: the timer is stuck for longer than it can be at the current rate
+        if value == self.last_value and t - self._last_change_time > self.pause_threshold():
+            return self._pause(sample, t, value)
+        
+        # Off the fitted line: a misread, or (if it keeps happening) a speed change
+        tolerance = max(self.outlier_seconds, 3 * self.uncertainty(t))
+        if abs(self.last_residual) > tolerance:
+            if self._suspects and np.sign(self._suspects[-1][1] - self.game_time(self._suspects[-1][0])) != np.sign(self.last_residual):
+                self._suspects = []
+            self._suspects.append(sample)
+            if len(self._suspects) < self.change_samples:
+                self.outliers += 1
+                return "outlier"
+            self.outliers -= len(self._suspects) - 1  # They were the start of the change
+            if all(suspect[1] == self.last_value + 0.5 for suspect in self._suspects):
+                return self._pause(sample, t, value)  # Rate 0: the timer stopped moving
+            self.speed_changes += 1
+            self._prior_rate = None  # The old rate is wrong: fit the new one from samples alone
+            self._start_regime(self._suspects, t, value)
+            return "speed_change"
+        
+        self._suspects = []
+        self._samples.append(sample)
+        while self._samples[0][0] < t - self.window:
+            self._samples.popleft()
+        if value != self.last_value:
+            self.last_value = value
+            self._last_change_time = t
+        self._fit()
+        return None
+    
+    def pause_threshold(self) -> float:
+        """Seconds without a timer change that mean paused: a few ticks, at least a few samples."""
+        tick = 1 / max(self.rate, 0.1)
+        return max(self.pause_ticks * tick, self.pause_samples * (self.sample_interval or 0.0))
+    
+    def set_rate(self, rate: float, t: float):
+        """
+        Expect a new rate from now on (e.g. after changing replay speed).
+        
+        Re-anchors at the current estimate; samples refine the rate.
+        """
+        self._prior_rate = rate
+        if not self._samples:
+            self.rate = rate
+            self._rate_variance = (PRIOR_RATE_ERROR * rate) ** 2
+            return
+        anchor = (t, self.game_time(t), 1.0)
+        self.rate = rate
+        self._samples = deque([anchor])
+        self._suspects = []
+        self._fit()
+    
+    def game_time(self, t: float) -> float:
+        """Estimated game seconds at monotonic time t."""
+        if not self._samples:
+            return 0.0
+        if self.paused:
+            return self._center_value
+        return max(0.0, self._center_value + self.rate * (t - self._center_time))
+    
+    def uncertainty(self, t: float) -> float:
+        """1-sigma error of game_time(t), in game seconds."""
+        if not self._samples:
+            return float("inf")
+        if self.paused:
+            return float(np.sqrt(QUANTIZATION_VARIANCE))
+        dt = t - self._center_time
+        return float(np.sqrt(self._variance / self._weight + self._rate_variance * dt * dt))
+    
+    def estimate(self, t: float) -> ClockEstimate:
+        """Game time, rate, uncertainty and pause state at monotonic time t."""
+        return ClockEstimate(
+            game_time=self.game_time(t),
+            rate=0.0 if self.paused else self.rate,
+            uncertainty=self.uncertainty(t),
+            paused=self.paused,
+        )
+    
+    def _pause(self, sample, t: float, value: int) -> str:
+        self.paused = True
+        self.pauses += 1
+        self._rate_before_pause = self.rate
+        self._start_regime([sample], t, value)
+        return "pause"
+    
+    def _start_regime(self, samples, t: float, value: int):
+        """Drop the old regime's samples and refit on these."""
+        self._samples = deque(samples)
+        self._suspects = []
+        if value != self.last_value or self._last_change_time is None:
+            self._last_change_time = t
+        self.last_value = value
+        self._fit()
+    
+    def _fit(self):
+        """Weighted least squares over the regime's samples."""
+        t, y, w = (np.array(column, dtype=np.float64) for column in zip(*self._samples))
+        self._weight = float(w.sum())
+        self._center_time = float((w * t).sum() / self._weight)
+        self._center_value = float((w * y).sum() / self._weight)
+        self._spread = float((w * (t - self._center_time) ** 2).sum())
+        
+        # The rate is only determined once the samples span more than one displayed value
+        # (until then it stays the prior or the previous regime's rate)
+        self.rate_fitted = len(np.unique(y)) >= 2 and self._spread > 0
+        dof = self._weight - (2 if self.rate_fitted else 1)
+        if self.rate_fitted:
+            slope = float((w * (t - self._center_time) * (y - self._center_value)).sum() / self._spread)
+            slope_variance = self._residual_variance(t, y, w, slope, dof) / self._spread
+            if self._prior_rate is not None:
+                # Blend with the known rate: few, closely spaced samples barely move it
+                prior_variance = (PRIOR_RATE_ERROR * max(self._prior_rate, 0.1)) ** 2
+                gain = prior_variance / (prior_variance + slope_variance)
+                slope = self._prior_rate + gain * (slope - self._prior_rate)
+                slope_variance *= gain
+            self.rate = max(0.0, slope)
+            self._rate_variance = slope_variance
+        else:
+            self._rate_variance = (PRIOR_RATE_ERROR * self.rate) ** 2
+        
+        self._variance = self._residual_variance(t, y, w, self.rate, dof)
+    
+    def _residual_variance(self, t, y, w, rate: float, dof: float) -> float:
+        """Weighted variance of the samples around a line (never below the quantization variance)."""
+        residuals = y - (self._center_value + rate * (t - self._center_time))
+        fitted_variance = float((w * residuals ** 2).sum() / dof) if dof > 0 else 0.0
+        return max(QUANTIZATION_VARIANCE, fitted_variance)
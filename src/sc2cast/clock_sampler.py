@@ -0,0 +1,162 @@
+"""
+Clock Sampler - Background timer reads for the game clock.
+
+GameClock used to read the timer (3 OCR reads, 0.2s apart) on the thread
+that drives the camera director, stalling camera shots for a second or
+more per validation. TimerSampler reads the timer on its own thread and
+publishes timestamped samples into a SampleRing; clock methods only look
+at the latest samples and never wait on OCR.
+
+SampleRing is lock-free for its single writer: each slot holds an
+immutable tuple and the write counter is bumped only after the slot is
+filled (both single, GIL-atomic operations), so readers see complete
+samples and drop any the writer has lapped while they were copying.
+"""
+
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    from .timer_reader import GameTimerReader
+except ImportError:
+    from timer_reader import GameTimerReader
+
+
+class ClockSample(NamedTuple):
+    """One timer reading."""
+    capture_time: float     # time.monotonic() when the crop was captured
+    game_seconds: int       # Timer value
+    confidence: float       # Reader confidence (0-1)
+
+
+class SampleRing:
+    """Fixed-size ring of ClockSamples: one writer, any number of non-blocking readers."""
+    
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._slots: List[Optional[ClockSample]] = [None] * capacity
+        self._written = 0  # Samples ever pushed (next slot is _written % capacity)
+    
+    def __len__(self):
+        return min(self._written, self.capacity)
+    
+    @property
+    def written(self) -> int:
+        """Samples ever pushed (a cheap "anything new?" check for readers)."""
+        return self._written
+    
+    def push(self, sample: ClockSample):
+        """Publish a sample (writer thread only)."""
+        self._slots[self._written % self.capacity] = sample
+        self._written += 1
+    
+    def _copy(self, start: int, end: int) -> List[ClockSample]:
+        """Samples start..end-1 (pushed indices), minus any the writer lapped while copying."""
+        samples = [self._slots[i % self.capacity] for i in range(start, end)]
+        
+        # Slots the writer reused while we were copying hold newer samples: drop them
+        lapped = self._written - self.capacity - start
+        return samples[lapped:] if lapped > 0 else samples
+    
+    def latest(self, count: int = 1) -> List[ClockSample]:
+        """Up to count most recent samples, oldest first."""
+        end = self._written
+        return self._copy(max(0, end - min(count, self.capacity)), end)
+    
+    def read_from(self, start: int) -> Tuple[List[ClockSample], int]:
+        """
+        Samples pushed since index start, oldest first, and the index to read from next.
+        
+        Reading the counter and then the samples separately races the writer:
+        a push in between is either read twice or skipped. read_from() reads
+        the counter once, so each sample is returned at most once; samples
+        the writer lapped before they were read are dropped.
+        
+        Example:
+            samples, cursor = ring.read_from(cursor)
+        """
+        end = self._written
+        return self._copy(max(0, start, end - self.capacity), end), max(start, end)
+    
+    def since(self, capture_time: float) -> List[ClockSample]:
+        """Samples captured after capture_time, oldest first."""
+        return [s for s in self.latest(self.capacity) if s.capture_time > capture_time]
+
+
+class TimerSampler:
+    """
+    Read the game timer continuously on a background thread.
+    
+    Example:
+        sampler = TimerSampler(GameTimerReader())
+        sampler.start()
+        sample = sampler.ring.latest()  # Never blocks
+        sampler.stop()
+    """
+    
+    def __init__(self, timer_reader: GameTimerReader, interval: float = 0.2, capacity: int = 64):
+        """
+        Initialize sampler (call start() to begin reading).
+        
+        Args:
+            timer_reader: Reader used on the sampler thread only
+            interval: Seconds between reads
+            capacity: Samples kept in the ring
+        """
+        self.timer_reader = timer_reader
+        self.interval = interval
+        self.ring = SampleRing(capacity)
+        
+        # Counters (written by the sampler thread)
+        self.reads = 0
+        self.failures = 0
+        
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Start the sampler thread (no-op if already running)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="timer-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 2.0):
+        """Stop the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def sample_once(self) -> Optional[ClockSample]:
+        """Capture and read the timer once, publishing the sample if it parsed."""
+        before = time.monotonic()
+        img = self.timer_reader.capture_timer()
+        capture_time = (before + time.monotonic()) / 2
+        
+        self.reads += 1
+        reading = self.timer_reader.read(img)
+        seconds = self.timer_reader.time_to_seconds(reading.clean_time) if reading else None
+        if seconds is None:
+            self.failures += 1
+            return None
+        
+        sample = ClockSample(capture_time, seconds, reading.confidence)
+        self.ring.push(sample)
+        return sample
+    
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_once()
+            except Exception as e:  # A failed capture must not end sampling
+                self.failures += 1
+                print(f"⚠️  Timer sample failed: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
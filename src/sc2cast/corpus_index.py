@@ -0,0 +1,405 @@
+"""
+Corpus Index - SQLite index of replays and their analysis results.
+
+Usage:
+    poetry run python -m sc2cast.corpus_index update replays/ --jobs 8
+    poetry run python -m sc2cast.corpus_index query --matchup ZvP --map Ultralove --min-high-battles 3
+
+Each replay gets one row with its content hash, map, duration, build,
+matchup and the EventPrioritizer.get_summary() counts, plus one row per
+player (name, race, result). Selecting jobs is then an indexed SQL query
+instead of parsing the corpus.
+
+Updates are incremental: files whose size and mtime match their row are
+skipped without being read; a changed mtime re-hashes the file, and only
+new content (or content analyzed by an older extractor) is analyzed again.
+Rows for deleted files are removed.
+
+The index lives in the per-user data directory (see paths) unless --db
+points elsewhere.
+"""
+
+import argparse
+import contextlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sc2cast.event_extractor import EventExtractor, EXTRACTOR_VERSION
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.paths import DATA_DIR
+from sc2cast.replay_cache import ReplayCache, DEFAULT_CACHE_DIR, hash_replay
+from sc2cast.replay_header import read_replay_metadata
+from sc2cast.replay_loader import memo_for
+
+
+# Next to the analysis cache, so every working directory shares one index
+DEFAULT_INDEX_PATH = DATA_DIR / "corpus.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replays (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    map TEXT,
+    duration INTEGER,
+    build INTEGER,
+    base_build INTEGER,
+    date TEXT,
+    matchup TEXT,
+    total_events INTEGER,
+    battles INTEGER,
+    high_battles INTEGER,
+    expansions INTEGER,
+    tech INTEGER,
+    high INTEGER,
+    medium INTEGER,
+    low INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    path TEXT NOT NULL REFERENCES replays(path) ON DELETE CASCADE,
+    slot INTEGER NOT NULL,
+    name TEXT,
+    race TEXT,
+    result TEXT,
+    is_human INTEGER,
+    PRIMARY KEY (path, slot)
+);
+CREATE INDEX IF NOT EXISTS replays_hash ON replays(hash);
+CREATE INDEX IF NOT EXISTS replays_map ON replays(map COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS replays_matchup ON replays(matchup, high_battles);
+CREATE INDEX IF NOT EXISTS players_race ON players(race COLLATE NOCASE);
+"""
+
+# Analysis columns (shared by every path with the same content)
+RESULT_COLUMNS = ["map", "duration", "build", "base_build", "date", "matchup", "total_events", "battles",
+                  "high_battles", "expansions", "tech", "high", "medium", "low"]
+
+
+def matchup_of(races: List[str]) -> str:
+    """Order-independent matchup key ('Zerg', 'Protoss' -> 'PvZ')."""
+    return "v".join(sorted(race[:1].upper() or "?" for race in races))
+
+
+def analyze_replay(replay_path: Path, digest: str, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Read a replay's metadata and prioritizer summary.
+    
+    Runs in a worker process; stage output is discarded.
+    
+    Args:
+        replay_path: Path to .SC2Replay file
+        digest: Content hash of the file
+        cache_dir: Analysis cache and load level memo directory (None disables both)
+    
+    Returns:
+        Row values (RESULT_COLUMNS plus hash and version) and a "players" list
+    """
+    metadata = read_replay_metadata(replay_path)
+    cache = ReplayCache(cache_dir) if cache_dir else None
+    
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        extractor = EventExtractor(replay_path, cache=cache, load_memo=memo_for(cache_dir))
+        extractor.load_replay()
+        extractor.extract_events()
+        
+        prioritizer = EventPrioritizer(player_stats=extractor.player_stats)
+        prioritizer.process_events(extractor.events)
+        summary = prioritizer.get_summary()
+    
+    players = metadata["players"]
+    return {
+        "hash": digest,
+        "version": EXTRACTOR_VERSION,
+        "map": metadata["map_name"],
+        "duration": metadata["game_length_seconds"],
+        "build": metadata["build"],
+        "base_build": metadata["base_build"],
+        "date": metadata["date"],
+        "matchup": matchup_of([p["race"] for p in players]),
+        "total_events": summary["total_events"],
+        "battles": summary["battles"],
+        "high_battles": sum(1 for b in prioritizer.battles if b.priority == "high"),
+        "expansions": summary["expansions"],
+        "tech": summary["tech"],
+        "high": summary["by_priority"]["high"],
+        "medium": summary["by_priority"]["medium"],
+        "low": summary["by_priority"]["low"],
+        "players": players,
+    }
+
+
+class CorpusIndex:
+    """
+    SQLite index of a replay corpus.
+    
+    Example:
+        with CorpusIndex() as index:
+            index.update(Path("replays"), jobs=8)
+            paths = index.query(matchup="ZvP", min_high_battles=3)
+    """
+    
+    def __init__(self, db_path: Path = DEFAULT_INDEX_PATH):
+        """
+        Open (or create) the index.
+        
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.conn.close()
+    
+    def _save(self, path: str, stat: os.stat_result, result: Dict[str, Any]):
+        """Insert or replace a replay row and its players."""
+        columns = ["path", "mtime", "size", "hash", "version"] + RESULT_COLUMNS + ["indexed_at"]
+        values = [path, stat.st_mtime, stat.st_size, result["hash"], result["version"]]
+        values += [result[c] for c in RESULT_COLUMNS] + [time.time()]
+        
+        with self.conn:
+            self.conn.execute("DELETE FROM players WHERE path = ?", (path,))
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO replays ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                values,
+            )
+            self.conn.executemany(
+                "INSERT INTO players (path, slot, name, race, result, is_human) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, slot, p["name"], p["race"], p["result"], int(p["is_human"])) for slot, p in enumerate(result["players"])],
+            )
+    
+    def _known_result(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Analysis of identical content already in the index (e.g. a moved or copied file)."""
+        row = self.conn.execute(
+            "SELECT * FROM replays WHERE hash = ? AND version = ? LIMIT 1", (digest, EXTRACTOR_VERSION)
+        ).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result["players"] = [
+            dict(p) for p in self.conn.execute(
+                "SELECT name, race, result, is_human FROM players WHERE path = ? ORDER BY slot", (row["path"],)
+            )
+        ]
+        return result
+    
+    def update(self, replay_dir: Path, jobs: int = 1, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+        """
+        Bring the index up to date with a replay directory.
+        
+        Args:
+            replay_dir: Directory of .SC2Replay files (searched recursively)
+            jobs: Worker processes for analysis
+            cache_dir: Analysis cache directory (None disables the cache)
+        
+        Returns:
+            Counts of unchanged, touched (same content), analyzed, removed and failed files
+        """
+        start = time.perf_counter()
+        known = {
+            row["path"]: row for row in self.conn.execute("SELECT path, mtime, size, hash, version FROM replays")
+        }
+        counts = {"unchanged": 0, "touched": 0, "analyzed": 0, "removed": 0, "failed": 0}
+        
+        to_analyze = []
+        seen = set()
+        for replay_path in sorted(replay_dir.rglob("*.SC2Replay")):
+            path = str(replay_path)
+            seen.add(path)
+            stat = replay_path.stat()
+            row = known.get(path)
+            if row is not None and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size and row["version"] == EXTRACTOR_VERSION:
+                counts["unchanged"] += 1
+                continue
+            
+            digest = hash_replay(replay_path)
+            result = self._known_result(digest)
+            if result is not None:
+                # Same content as an indexed file: reuse its analysis
+                self._save(path, stat, result)
+                counts["touched"] += 1
+            else:
+                to_analyze.append((replay_path, digest, stat))
+        
+        # Files that no longer exist
+        removed = [path for path in known if path not in seen and Path(path).is_relative_to(replay_dir)]
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM replays WHERE path = ?", [(p,) for p in removed])
+            counts["removed"] = len(removed)
+        
+        print(f"📂 {len(seen)} replays in {replay_dir}: {counts['unchanged']} unchanged, "
+              f"{counts['touched']} same content, {len(to_analyze)} to analyze, {len(removed)} removed")
+        
+        def save(replay_path, digest, stat, result):
+            self._save(str(replay_path), stat, result)
+            counts["analyzed"] += 1
+        
+        def fail(replay_path, error):
+            counts["failed"] += 1
+            print(f"  ❌ {replay_path.name}: {error}")
+        
+        if jobs <= 1:
+            for replay_path, digest, stat in to_analyze:
+                try:
+                    save(replay_path, digest, stat, analyze_replay(replay_path, digest, cache_dir))
+                except Exception as e:
+                    fail(replay_path, e)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {pool.submit(analyze_replay, p, d, cache_dir): (p, d, s) for p, d, s in to_analyze}
+                for future in as_completed(futures):
+                    replay_path, digest, stat = futures[future]
+                    try:
+                        save(replay_path, digest, stat, future.result())
+                    except Exception as e:
+                        fail(replay_path, e)
+        
+        counts["seconds"] = round(time.perf_counter() - start, 3)
+        print(f"✅ Index updated in {counts['seconds']:.2f}s ({counts['analyzed']} analyzed, {counts['failed']} failed)")
+        return counts
+    
+    def query(self, map_name: Optional[str] = None, matchup: Optional[str] = None, race: Optional[str] = None,
+              player: Optional[str] = None, min_battles: int = 0, min_high_battles: int = 0,
+              min_duration: Optional[int] = None, max_duration: Optional[int] = None,
+              build: Optional[int] = None, limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """
+        Select indexed replays.
+        
+        Args:
+            map_name: Substring of the map name (case-insensitive)
+            matchup: e.g. "ZvP" (order doesn't matter)
+            race: Some player played this race
+            player: Some player's name contains this (case-insensitive)
+            min_battles: At least this many battles
+            min_high_battles: At least this many high-priority battles
+            min_duration, max_duration: Game length bounds in seconds
+            build: Exact game build
+            limit: Maximum rows
+        
+        Returns:
+            Replay rows, longest games with most high-priority battles first
+        """
+        where, params = [], []
+        if map_name:
+            where.append("map LIKE ?")
+            params.append(f"%{map_name}%")
+        if matchup:
+            where.append("matchup = ?")
+            params.append(matchup_of(matchup.split("v")))
+        if race:
+            where.append("path IN (SELECT path FROM players WHERE race = ? COLLATE NOCASE)")
+            params.append(race)
+        if player:
+            where.append("path IN (SELECT path FROM players WHERE name LIKE ?)")
+            params.append(f"%{player}%")
+        if min_battles:
+            where.append("battles >= ?")
+            params.append(min_battles)
+        if min_high_battles:
+            where.append("high_battles >= ?")
+            params.append(min_high_battles)
+        if min_duration is not None:
+            where.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            where.append("duration <= ?")
+            params.append(max_duration)
+        if build is not None:
+            where.append("build = ?")
+            params.append(build)
+        
+        sql = "SELECT * FROM replays"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY high_battles DESC, duration DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, params).fetchall()
+    
+    def players_of(self, path: str) -> List[sqlite3.Row]:
+        """Players of an indexed replay, in slot order."""
+        return self.conn.execute("SELECT * FROM players WHERE path = ? ORDER BY slot", (path,)).fetchall()
+
+
+def print_rows(index: CorpusIndex, rows: List[sqlite3.Row]):
+    """Print query results as a table."""
+    for row in rows:
+        players = " vs ".join(f"{p['name']} ({p['race'][:1]})" for p in index.players_of(row["path"]))
+        print(f"  {row['duration'] // 60:>3}:{row['duration'] % 60:02d}  {row['matchup']:<5} {row['map'][:24]:<24} "
+              f"{row['battles']:>3} battles ({row['high_battles']} high)  {players}  {row['path']}")
+
+
+def main(argv=None):
+    """Update or query the corpus index."""
+    parser = argparse.ArgumentParser(description="SQLite index of a replay corpus")
+    parser.add_argument("--db", type=Path, default=DEFAULT_INDEX_PATH, help="Index database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    update = commands.add_parser("update", help="Index new and changed replays")
+    update.add_argument("replay_dir", type=Path, nargs="?", default=Path("replays"), help="Directory of .SC2Replay files")
+    update.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    update.add_argument("--no-cache", action="store_true", help="Always re-parse replays")
+    
+    query = commands.add_parser("query", help="Select indexed replays")
+    query.add_argument("--map", dest="map_name", help="Map name contains (case-insensitive)")
+    query.add_argument("--matchup", help="e.g. ZvP (either order)")
+    query.add_argument("--race", help="Some player played this race")
+    query.add_argument("--player", help="Some player's name contains")
+    query.add_argument("--min-battles", type=int, default=0)
+    query.add_argument("--min-high-battles", type=int, default=0)
+    query.add_argument("--min-duration", type=int, help="Seconds")
+    query.add_argument("--max-duration", type=int, help="Seconds")
+    query.add_argument("--build", type=int)
+    query.add_argument("--limit", type=int)
+    query.add_argument("--paths", action="store_true", help="Print only file paths (for piping into other tools)")
+    
+    args = parser.parse_args(argv)
+    
+    with CorpusIndex(args.db) as index:
+        if args.command == "update":
+            if not args.replay_dir.is_dir():
+                print(f"❌ Replay directory not found: {args.replay_dir}")
+                return 1
+            counts = index.update(args.replay_dir, jobs=args.jobs, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
+            return 1 if counts["failed"] else 0
+        
+        start = time.perf_counter()
+        rows = index.query(
+            map_name=args.map_name, matchup=args.matchup, race=args.race, player=args.player,
+            min_battles=args.min_battles, min_high_battles=args.min_high_battles,
+            min_duration=args.min_duration, max_duration=args.max_duration,
+            build=args.build, limit=args.limit,
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if args.paths:
+            for row in rows:
+                print(row["path"])
+        else:
+            print_rows(index, rows)
+            print(f"\n🔎 {len(rows)} replays ({elapsed_ms:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
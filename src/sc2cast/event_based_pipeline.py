@@ -8,16 +8,16 @@ Complete workflow:
 
 import json
 from pathlib import Path
-from typing import Optional
-import sys
+from typing import Optional, Union
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from sc2cast.event_extractor import EventExtractor
+from sc2cast.replay_cache import ReplayCache
+from sc2cast.replay_loader import memo_for
+from sc2cast.replay_session import ReplaySession
 from sc2cast.event_prioritizer import EventPrioritizer
 from sc2cast.script_generator import ScriptGenerator
 from sc2cast.recording_pipeline import RecordingPipeline
+from sc2cast.batch import artifact_dir, is_done, SUMMARY_FILE
+from sc2cast.artifacts import ARTIFACT_FILE
 
 
 class EventBasedPipeline:
@@ -31,36 +31,48 @@ class EventBasedPipeline:
     - Records with dynamic camera control
     """
     
-    def __init__(self, replay_path: Path, output_path: Path):
+    def __init__(self, replay: Union[ReplaySession, Path], output_path: Path, cache: Optional[ReplayCache] = None,
+                 artifacts_dir: Optional[Path] = None):
         """
         Initialize event-based pipeline.
         
         Args:
-            replay_path: Path to .SC2Replay file
+            replay: ReplaySession (or .SC2Replay path) - parsed once for all stages
             output_path: Output video file path
+            cache: Analysis cache for a path (defaults to the on-disk cache in DEFAULT_CACHE_DIR)
+            artifacts_dir: Batch/watch output directory; if it already holds this
+                replay's camera script, analysis is skipped
         """
-        self.replay_path = replay_path
+        if isinstance(replay, ReplaySession):
+            self.session = replay
+        else:
+            cache = cache if cache is not None else ReplayCache()
+            self.session = ReplaySession(replay, cache=cache, load_memo=memo_for(cache.cache_dir))
+        self.replay_path = self.session.replay_path
         self.output_path = output_path
+        self.artifacts_dir = artifacts_dir
     
-    def run(self):
-        """Execute complete event-based recording pipeline."""
-        print("=" * 80)
-        print("EVENT-BASED RECORDING PIPELINE")
-        print("=" * 80)
-        print(f"\n📂 Replay: {self.replay_path.name}")
-        print(f"📹 Output: {self.output_path}")
-        
+    def _prepared_script(self):
+        """(camera shots, battle count) from batch/watch artifacts, or None if not prepared."""
+        if self.artifacts_dir is None or not is_done(self.replay_path, self.artifacts_dir):
+            return None
+        
+        replay_dir = artifact_dir(self.replay_path, self.artifacts_dir)
+        with open(replay_dir / SUMMARY_FILE, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        script_path = replay_dir / ARTIFACT_FILE
+        if not script_path.exists():
+            script_path = replay_dir / "generated_camera_script.json"  # Older or --json batch runs
+        return ScriptGenerator.load_script(script_path), summary['battles']
+    
+    def _analyze(self, replay_duration: int):
+        """Steps 1-3: extract, prioritize, generate camera script."""
         # Step 1: Extract events
         print("\n" + "=" * 80)
         print("STEP 1: EXTRACT EVENTS")
         print("=" * 80)
         
-        extractor = EventExtractor(str(self.replay_path))
-        extractor.load_replay()
-        extractor.extract_events()
-        
-        raw_events = extractor.events
-        replay_duration = extractor.replay.game_length.seconds if extractor.replay else 378
+        raw_events = self.session.events
         
         print(f"✅ Extracted {len(raw_events)} events")
         print(f"✅ Replay duration: {replay_duration}s")
@@ -70,7 +82,8 @@ class EventBasedPipeline:
         print("STEP 2: PRIORITIZE & CLUSTER EVENTS")
         print("=" * 80)
         
-        prioritizer = EventPrioritizer()
+        player_stats = self.session.player_stats
+        prioritizer = EventPrioritizer(player_stats=player_stats)
         priority_events = prioritizer.process_events(raw_events)
         
         summary = prioritizer.get_summary()
@@ -84,9 +97,31 @@ class EventBasedPipeline:
         print("=" * 80)
         
         generator = ScriptGenerator()
-        camera_shots = generator.generate_from_events(priority_events, replay_duration)
+        economic_events = player_stats.economic_events() if player_stats else None
+        camera_shots = generator.generate_from_events(priority_events, replay_duration, economic_events)
         
         print(f"✅ {len(camera_shots)} camera shots generated")
+        return camera_shots, summary['battles']
+    
+    def run(self):
+        """Execute complete event-based recording pipeline."""
+        print("=" * 80)
+        print("EVENT-BASED RECORDING PIPELINE")
+        print("=" * 80)
+        print(f"\n📂 Replay: {self.replay_path.name}")
+        print(f"📹 Output: {self.output_path}")
+        
+        replay_duration = self.session.duration
+        if not replay_duration:
+            print("❌ Could not determine replay duration!")
+            return False
+        
+        prepared = self._prepared_script()
+        if prepared is not None:
+            camera_shots, battle_count = prepared
+            print(f"\n⚡ Using prepared camera script ({len(camera_shots)} shots) from {self.artifacts_dir}")
+        else:
+            camera_shots, battle_count = self._analyze(replay_duration)
         
         # Show key shots
         print("\nKey camera movements:")
@@ -114,7 +149,7 @@ class EventBasedPipeline:
         print("   (This will take several minutes)\n")
         
         pipeline = RecordingPipeline(
-            replay_path=self.replay_path,
+            replay=self.session,
             camera_script=camera_script,
             output_path=self.output_path,
             replay_speed="fast_x4"  # 8x speed
@@ -133,7 +168,7 @@ class EventBasedPipeline:
             print(f"   Size: {file_size_mb:.1f} MB")
             print(f"   Duration: {replay_duration}s gameplay")
             print(f"   Camera shots: {len(camera_shots)}")
-            print(f"   Battles tracked: {summary['battles']}")
+            print(f"   Battles tracked: {battle_count}")
             print("\n🎉 EVENT-BASED RECORDING SUCCESS!")
         else:
             print("\n❌ Recording failed!")
@@ -151,8 +186,8 @@ def main():
         print(f"❌ Replay not found: {replay_path}")
         return
     
-    # Run pipeline
-    pipeline = EventBasedPipeline(replay_path, output_path)
+    # Run pipeline (uses the camera script prepared by `python -m sc2cast.watch` if there is one)
+    pipeline = EventBasedPipeline(replay_path, output_path, artifacts_dir=Path("output/batch"))
     success = pipeline.run()
     
     if success:
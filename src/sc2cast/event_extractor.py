@@ -2,171 +2,215 @@
 
 import json
 from pathlib import Path
+from typing import Optional
+
+from sc2reader.events.tracker import UnitBornEvent, UnitDiedEvent, UpgradeCompleteEvent, PlayerStatsEvent
 
 # Import our patched loader
 try:
-    from .replay_loader import load_replay_safe
+    from .replay_loader import load_replay_ladder, memo_for, LoadLevelMemo
+    from .replay_cache import ReplayCache
+    from .event_store import EventStore
+    from . import unit_catalog
+    from .player_stats import PlayerStats, stats_record
 except ImportError:
-    from replay_loader import load_replay_safe
+    from replay_loader import load_replay_ladder, memo_for, LoadLevelMemo
+    from replay_cache import ReplayCache
+    from event_store import EventStore
+    import unit_catalog
+    from player_stats import PlayerStats, stats_record
+
+
+# Bump whenever the extracted event format changes (invalidates cached analysis)
+EXTRACTOR_VERSION = 5
 
 
 class EventExtractor:
     """Extract and categorize events from SC2 replays."""
     
-    def __init__(self, replay_path):
-        """Initialize with replay path."""
+    def __init__(self, replay_path, cache: Optional[ReplayCache] = None, load_memo: Optional[LoadLevelMemo] = None):
+        """
+        Initialize with replay path.
+        
+        Args:
+            replay_path: Path to .SC2Replay file
+            cache: Optional analysis cache; on a hit sc2reader is skipped entirely
+            load_memo: Optional per-build memo of load levels that fail, so
+                they aren't retried on every replay
+        """
         self.replay_path = str(replay_path)
+        self.cache = cache
+        self.load_memo = load_memo
         self.replay = None
-        self.events = []
+        self.events = EventStore()
+        self.player_stats = PlayerStats()  # PlayerStatsEvent time series
+        self.load_level = None
+        self.from_cache = False
+        
+        # Metadata (available from both sc2reader and the cache)
+        self.game_length = None           # Formatted, e.g. "05.10"
+        self.game_length_seconds = None
+        
+        self._cache_key = None
     
     def load_replay(self):
-        """Load replay file with sc2reader."""
+        """Load replay file with sc2reader (or from the analysis cache)."""
         print(f"📂 Loading replay: {self.replay_path}")
         
-        # Try load level 3 (has events but avoids unknown event types in level 4)
-        try:
-            self.replay = load_replay_safe(self.replay_path, load_level=3)
+        # Read the file once: the cache key and every load attempt share these bytes
+        data = Path(self.replay_path).read_bytes()
+        
+        if self._load_from_cache(data):
             return
-        except Exception as e:
-            print(f"   ⚠️  Load level 3 failed: {e}")
         
-        # Fall back to load level 2
-        try:
-            print(f"  Trying load_level=2...")
-            self.replay = load_replay_safe(self.replay_path, load_level=2)
+        self.replay, level = load_replay_ladder(self.replay_path, data=data, memo=self.load_memo)
+        
+        # "tracker" loads carry the same events as level 3
+        self.load_level = 3 if level == "tracker" else level
+        if self.replay.game_length:
+            self.game_length = str(self.replay.game_length)
+            self.game_length_seconds = self.replay.game_length.seconds
+        
+        if self.load_level == 0:
+            print(f"✅ Replay loaded (minimal): {self.replay.game_length}")
+    
+    def _load_from_cache(self, data: bytes) -> bool:
+        """Populate events and metadata from the analysis cache. Returns True on a hit."""
+        if not self.cache:
+            return False
+        
+        self._cache_key = self.cache.key_for(self.replay_path, EXTRACTOR_VERSION, data=data)
+        cached = self.cache.get(self._cache_key)
+        if cached is None:
+            return False
+        
+        self.events = EventStore.from_records(cached["events"])
+        self.player_stats = PlayerStats.from_records(cached.get("player_stats", []))
+        self.game_length = cached.get("game_length")
+        self.game_length_seconds = cached.get("game_length_seconds")
+        self.from_cache = True
+        print(f"⚡ Cache hit: {len(self.events)} events ({self.game_length})")
+        return True
+    
+    def _store_in_cache(self):
+        """Store extracted events and metadata in the analysis cache."""
+        # Minimal loads have no events - don't pin a degraded result in the cache
+        if not self.cache or self.load_level is None or self.load_level < 3:
             return
-        except Exception as e:
-            print(f"   ⚠️  Load level 2 failed: {e}")
         
-        # Last resort: minimal load
-        print(f"  ⚠️  Using minimal load (0)...")
-        self.replay = load_replay_safe(self.replay_path, load_level=0)
-        print(f"✅ Replay loaded (minimal): {self.replay.game_length}")
+        if self._cache_key is None:
+            self._cache_key = self.cache.key_for(self.replay_path, EXTRACTOR_VERSION)
+        
+        self.cache.put(self._cache_key, {
+            "extractor_version": EXTRACTOR_VERSION,
+            "game_length": self.game_length,
+            "game_length_seconds": self.game_length_seconds,
+            "events": self.events.to_dicts(),
+            "player_stats": self.player_stats.to_records(),
+        })
     
     def extract_events(self):
         """Extract all game events from replay."""
+        if self.from_cache:
+            print(f"✅ Using {len(self.events)} cached events")
+            return
+        
         if not self.replay:
             raise ValueError("Replay not loaded. Call load_replay() first.")
         
-        # Build unit registry from UnitBornEvents
-        unit_registry = {}  # Maps unit_id -> unit_type_name
-        
-        # First pass: register all units
-        for event in self.replay.events:
-            if type(event).__name__ == "UnitBornEvent":
-                unit_id = getattr(event, 'unit_id', None)
-                unit_type = getattr(event, 'unit_type_name', None)
-                if unit_id and unit_type:
-                    unit_registry[unit_id] = unit_type
-        
-        print(f"🔍 Built unit registry with {len(unit_registry)} units")
-        print(f"🔍 Processing {len(self.replay.events)} events...")
-        
-        # Second pass: extract events with unit type names
-        for event in self.replay.events:
-            event_data = self._process_event(event, unit_registry)
-            if event_data:
-                self.events.append(event_data)
-        
-        print(f"✅ Extracted {len(self.events)} relevant events")
-    
-    def _process_event(self, event, unit_registry):
-        """Process individual event and extract relevant data."""
-        event_type = type(event).__name__
-        
-        # Extract location if available
-        location = None
-        if hasattr(event, 'location') and event.location:
-            location = {"x": event.location[0], "y": event.location[1]}
-        elif hasattr(event, 'x') and hasattr(event, 'y'):
-            location = {"x": event.x, "y": event.y}
-        
-        # Track unit births (buildings, units trained)
-        if event_type == "UnitBornEvent":
-            unit_name = getattr(event, 'unit_type_name', 'Unknown')
-            return {
-                "timestamp": event.second,
-                "type": "unit_born",
-                "unit_name": unit_name,
-                "player": getattr(event, 'control_pid', 0),
-                "priority": self._calculate_priority("unit_born", event, unit_name),
-                "location": location
-            }
-        
-        # Track unit deaths (battles, losses) - use unit registry for names
-        elif event_type == "UnitDiedEvent":
-            unit_id = getattr(event, 'unit_id', None)
-            unit_name = unit_registry.get(unit_id, 'Unknown')
-            
-            return {
-                "timestamp": event.second,
-                "type": "unit_died",
-                "unit_name": unit_name,
-                "player": getattr(event, 'killer_pid', 0),
-                "priority": self._calculate_priority("unit_died", event, unit_name),
-                "location": location
-            }
-        
-        # Track upgrades (no location data typically)
-        elif event_type == "UpgradeCompleteEvent":
-            upgrade_name = getattr(event, 'upgrade_type_name', 'Unknown')
-            return {
-                "timestamp": event.second,
-                "type": "upgrade_complete",
-                "upgrade_name": upgrade_name,
-                "player": getattr(event, 'pid', 0),
-                "priority": self._calculate_priority("upgrade_complete", event, upgrade_name),
-                "location": None  # Upgrades don't have location
-            }
-        
-        return None
+        # Everything we extract lives in the tracker event stream
+        tracker_events = self.replay.tracker_events
+        print(f"🔍 Processing {len(tracker_events)} tracker events...")
+        
+        # Single pass: births always precede deaths, so died-unit names are
+        # resolved from the registry as we go. Unknown event classes miss the
+        # dispatch table and are skipped with one dict lookup. Player stats
+        # samples go to their own time series.
+        unit_registry = {}  # Maps unit_id -> (unit_type_name, owner pid) (alive units)
+        handlers = self._event_handlers()
+        get_handler = handlers.get
+        append = self.events.append
+        stat_records = []
+        
+        for event in tracker_events:
+            event_class = event.__class__
+            handler = get_handler(event_class)
+            if handler is not None:
+                append(handler(event, unit_registry))
+            elif event_class is PlayerStatsEvent:
+                stat_records.append(stats_record(event))
+        
+        self.player_stats = PlayerStats.from_records(stat_records)
+        
+        print(f"✅ Extracted {len(self.events)} relevant events ({len(stat_records)} player stats samples)")
+        
+        self._store_in_cache()
     
-    def _calculate_priority(self, event_type, event, unit_or_upgrade_name):
-        """Calculate event priority for camera direction."""
-        name = unit_or_upgrade_name.lower()
+    def _event_handlers(self):
+        """Dispatch table: sc2reader event class -> handler."""
+        return {
+            UnitBornEvent: self._on_unit_born,
+            UnitDiedEvent: self._on_unit_died,
+            UpgradeCompleteEvent: self._on_upgrade_complete,
+        }
+    
+    def _on_unit_born(self, event, unit_registry):
+        """Track unit births (buildings, units trained)."""
+        unit_name = event.unit_type_name
+        unit_registry[event.unit_id] = (unit_name, event.control_pid)
         
-        if event_type == "unit_born":
-            # High priority for expansions and tech buildings
-            if 'hatchery' in name or 'nexus' in name or 'command' in name or 'orbital' in name or 'lair' in name or 'hive' in name:
-                return "high"
-            if 'spire' in name or 'fleet' in name or 'stargate' in name or 'robo' in name:
-                return "high"
-            # Medium for production buildings
-            if 'gateway' in name or 'barracks' in name or 'factory' in name or 'starport' in name:
-                return "medium"
-            # Low for everything else (workers, minerals, etc.)
-            return "low"
+        return {
+            "timestamp": event.second,
+            "type": "unit_born",
+            "unit_name": unit_name,
+            "player": event.control_pid,
+            "priority": self._calculate_priority("unit_born", event, unit_name),
+            "location": {"x": event.x, "y": event.y}
+        }
+    
+    def _on_unit_died(self, event, unit_registry):
+        """Track unit deaths (battles, losses) - use unit registry for names."""
+        # A unit dies once, so drop it from the registry to keep it small
+        unit_name, owner = unit_registry.pop(event.unit_id, ('Unknown', None))
         
-        elif event_type == "unit_died":
-            # High priority for building/expensive unit deaths
-            if 'hatchery' in name or 'nexus' in name or 'command' in name or 'orbital' in name:
-                return "high"
-            if 'carrier' in name or 'battlecruiser' in name or 'mothership' in name:
-                return "high"
-            if 'colossus' in name or 'thor' in name or 'ultralisk' in name or 'broodlord' in name:
-                return "high"
-            # Medium for army units
-            if any(x in name for x in ['stalker', 'marine', 'zergling', 'roach', 'hydralisk', 'baneling']):
-                return "medium"
-            # Low for workers, minerals, etc.
-            return "low"
+        return {
+            "timestamp": event.second,
+            "type": "unit_died",
+            "unit_name": unit_name,
+            "player": event.killer_pid,
+            "owner": owner,
+            "priority": self._calculate_priority("unit_died", event, unit_name),
+            "location": {"x": event.x, "y": event.y}
+        }
+    
+    def _on_upgrade_complete(self, event, unit_registry):
+        """Track upgrades (no location data)."""
+        upgrade_name = event.upgrade_type_name
         
+        return {
+            "timestamp": event.second,
+            "type": "upgrade_complete",
+            "upgrade_name": upgrade_name,
+            "player": event.pid,
+            "priority": self._calculate_priority("upgrade_complete", event, upgrade_name),
+            "location": None  # Upgrades don't have location
+        }
+    
+    def _calculate_priority(self, event_type, event, unit_or_upgrade_name):
+        """Calculate event priority for camera direction (from the unit catalog)."""
+        if event_type == "unit_born":
+            return unit_catalog.lookup(unit_or_upgrade_name).born_priority
+        elif event_type == "unit_died":
+            return unit_catalog.lookup(unit_or_upgrade_name).died_priority
         elif event_type == "upgrade_complete":
-            # Filter out spray decals
-            if 'spray' in name:
-                return "low"
-            # High for critical upgrades
-            if any(x in name for x in ['speed', 'attack', 'armor', 'range']):
-                return "medium"
-            return "low"
-        
+            return unit_catalog.upgrade_priority(unit_or_upgrade_name)
         return "low"
     
     def categorize_events(self):
         """Categorize events by priority."""
-        high_priority = [e for e in self.events if e["priority"] == "high"]
-        medium_priority = [e for e in self.events if e["priority"] == "medium"]
-        low_priority = [e for e in self.events if e["priority"] == "low"]
+        high_priority = self.events[self.events.with_priority("high")]
+        medium_priority = self.events[self.events.with_priority("medium")]
+        low_priority = self.events[self.events.with_priority("low")]
         
         print(f"\n📊 Event Categories:")
         print(f"  High priority: {len(high_priority)}")
@@ -183,9 +227,9 @@ class EventExtractor:
         """Save events to JSON file."""
         output_data = {
             "replay_file": self.replay_path,
-            "game_length": str(self.replay.game_length) if self.replay.game_length else "Unknown",
+            "game_length": self.game_length or "Unknown",
             "total_events": len(self.events),
-            "events": self.events
+            "events": self.events.to_dicts()
         }
         
         output_path = Path(output_path)
@@ -210,8 +254,9 @@ def main():
             print(f"❌ No replays found!")
             return
     
-    # Extract events
-    extractor = EventExtractor(replay_path)
+    # Extract events (cached analysis skips sc2reader on repeat runs)
+    cache = ReplayCache()
+    extractor = EventExtractor(replay_path, cache=cache, load_memo=memo_for(cache.cache_dir))
     extractor.load_replay()
     extractor.extract_events()
     
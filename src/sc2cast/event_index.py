@@ -0,0 +1,112 @@
+"""
+Event Index - Sorted-array index over prioritized event and battle spans.
+
+Answers time-range questions without scanning every event:
+- overlapping(t0, t1): events whose span touches [t0, t1]
+- active_at(t): events in progress at time t
+- next_after(t): first event starting after t
+- histogram(): event counts per minute (or any bin size)
+
+Spans are closed intervals: a PrioritizedEvent covers
+[time_seconds, time_seconds + duration], a BattleEvent covers
+[start_time, end_time]. Event objects and their to_dict() forms both work.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def event_span(event) -> Tuple[int, int]:
+    """(start, end) seconds of a PrioritizedEvent or BattleEvent (object or dict)."""
+    if isinstance(event, dict):
+        if 'start_time' in event:
+            return event['start_time'], event['end_time']
+        return event['time_seconds'], event['time_seconds'] + event.get('duration', 0)
+    if hasattr(event, 'start_time'):
+        return event.start_time, event.end_time
+    return event.time_seconds, event.time_seconds + event.duration
+
+
+class EventIndex:
+    """
+    Events sorted by start time, with NumPy arrays of starts and ends.
+    
+    Range queries binary-search start arrays. Events are grouped by span
+    length in powers of two (0, 1, 2-3, 4-7, ... seconds) and each group is
+    only searched back by its own longest span, so one game-long span
+    doesn't widen the search for every short event. A query costs
+    O(log n) per group (at most ~log2 of the longest span groups) plus
+    the events near the window.
+    """
+    
+    def __init__(self, events: Sequence[Any]):
+        """
+        Build the index.
+        
+        Args:
+            events: PrioritizedEvent / BattleEvent objects or their dicts
+        """
+        spans = np.array([event_span(e) for e in events], dtype=np.int64).reshape(-1, 2)
+        order = np.argsort(spans[:, 0], kind='stable')
+        
+        self.events: List[Any] = [events[i] for i in order]
+        self.starts = spans[order, 0]
+        self.ends = spans[order, 1]
+        
+        # Span length class: 0 for 0, then floor(log2(length)) + 1
+        classes = np.frexp((self.ends - self.starts).clip(min=0))[1]
+        self._span_classes: List[Tuple[np.ndarray, np.ndarray, int]] = []
+        for c in np.unique(classes):
+            members = np.flatnonzero(classes == c)
+            max_span = int((self.ends[members] - self.starts[members]).max())
+            self._span_classes.append((members, self.starts[members], max_span))
+    
+    def __len__(self):
+        return len(self.events)
+    
+    def _overlapping_indices(self, t0: int, t1: int) -> np.ndarray:
+        found = []
+        for members, starts, max_span in self._span_classes:
+            # Events starting before t0 - max span of their class can't reach t0
+            lo = np.searchsorted(starts, t0 - max_span, side='left')
+            hi = np.searchsorted(starts, t1, side='right')
+            candidates = members[lo:hi]
+            found.append(candidates[self.ends[candidates] >= t0])
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        # Back to start order
+        return np.sort(np.concatenate(found), kind='stable')
+    
+    def overlapping(self, t0: int, t1: int) -> List[Any]:
+        """Events whose span overlaps [t0, t1], by start time."""
+        return [self.events[i] for i in self._overlapping_indices(t0, t1)]
+    
+    def active_at(self, t: int) -> List[Any]:
+        """Events in progress at time t."""
+        return self.overlapping(t, t)
+    
+    def next_after(self, t: int) -> Optional[Any]:
+        """First event starting strictly after t (None if there is none)."""
+        i = np.searchsorted(self.starts, t, side='right')
+        return self.events[i] if i < len(self.events) else None
+    
+    def histogram(self, predicate: Optional[Callable[[Any], bool]] = None, bin_seconds: int = 60) -> np.ndarray:
+        """
+        Count events by start time bin.
+        
+        Args:
+            predicate: Only count events it accepts (all events if None)
+            bin_seconds: Bin width (default one minute)
+        
+        Returns:
+            Counts per bin, from bin 0 through the bin of the last event
+        """
+        if not len(self.events):
+            return np.zeros(0, dtype=np.int64)
+        
+        bins = self.starts // bin_seconds
+        weights = None
+        if predicate is not None:
+            weights = np.fromiter((predicate(e) for e in self.events), dtype=float, count=len(self.events))
+        return np.bincount(bins, weights=weights, minlength=int(bins[-1]) + 1).astype(np.int64)
@@ -8,11 +8,38 @@ Takes raw events from event_extractor and:
 4. Produces timeline of camera-worthy moments
 """
 
+import bisect
 import json
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Optional
+from dataclasses import dataclass, asdict, field
+
+import numpy as np
+
+try:
+    from .event_store import EventStore, NO_PLAYER
+    from .battle_clustering import check_windows, cluster_labels, density_peak, IncrementalClusterer
+    from .event_index import EventIndex
+    from . import unit_catalog
+    from .player_stats import PlayerStats
+except ImportError:
+    from event_store import EventStore, NO_PLAYER
+    from battle_clustering import check_windows, cluster_labels, density_peak, IncrementalClusterer
+    from event_index import EventIndex
+    import unit_catalog
+    from player_stats import PlayerStats
+
+
+def value_by_player(players: np.ndarray, values: np.ndarray) -> Dict[int, float]:
+    """Sum values per player id (NO_PLAYER entries are skipped)."""
+    ids, index = np.unique(players, return_inverse=True)
+    totals = np.bincount(index, weights=values)
+    return {
+        int(player): round(float(value), 1)
+        for player, value in zip(ids, totals)
+        if player != NO_PLAYER
+    }
 
 
 @dataclass
@@ -24,18 +51,20 @@ class BattleEvent:
     deaths: List[Dict]        # List of death events in this battle
     army_value_lost: int      # Total army value lost
     priority: str             # "high", "medium", "low"
+    peak_time: Optional[int] = None   # Densest moment (seconds); midpoint if not given
+    kills_by_player: Dict[int, float] = field(default_factory=dict)  # Army value destroyed by each player
+    losses_by_player: Dict[int, float] = field(default_factory=dict)  # Army value each player lost
+    resources_lost: Optional[int] = None  # Army minerals + gas lost (from player stats, if available)
+    
+    def __post_init__(self):
+        if self.peak_time is None:
+            self.peak_time = (self.start_time + self.end_time) // 2
     
     @property
     def duration(self):
         """Battle duration in seconds."""
         return self.end_time - self.start_time
     
-    @property
-    def peak_time(self):
-        """Time of peak activity (most deaths)."""
-        # Use middle of battle as peak
-        return (self.start_time + self.end_time) // 2
-    
     def to_dict(self):
         """Convert to dictionary."""
         return {
@@ -46,11 +75,35 @@ class BattleEvent:
             'location': self.location,
             'death_count': len(self.deaths),
             'army_value_lost': self.army_value_lost,
+            'kills_by_player': self.kills_by_player,
+            'losses_by_player': self.losses_by_player,
+            'resources_lost': self.resources_lost,
             'priority': self.priority,
             'deaths': self.deaths
         }
 
 
+@dataclass(frozen=True)
+class BattleSettings:
+    """Battle clustering and priority thresholds (defaults are the tuned values)."""
+    time_window: int = 30       # Deaths within 30 seconds
+    space_window: int = 20      # Deaths within 20 map units
+    min_deaths: int = 3         # Need at least 3 deaths to be a battle
+    high_value: float = 20      # "high" at this army value lost...
+    high_deaths: int = 15       # ...or this many deaths
+    medium_value: float = 10    # "medium" at this army value lost...
+    medium_deaths: int = 8      # ...or this many deaths
+    high_resources: int = 2000  # With player stats: "high" at this many army resources lost...
+    medium_resources: int = 800 # ...and "medium" at this many
+    
+    def __post_init__(self):
+        check_windows(self.time_window, self.space_window)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return asdict(self)
+
+
 @dataclass
 class PrioritizedEvent:
     """A prioritized game event ready for camera script."""
@@ -70,65 +123,45 @@ class PrioritizedEvent:
 class EventPrioritizer:
     """Prioritize and cluster game events for intelligent camera control."""
     
-    # Army unit values (rough supply/importance)
-    UNIT_VALUES = {
-        # Terran
-        'marine': 1, 'marauder': 2, 'reaper': 1, 'hellion': 2, 'hellbat': 2,
-        'siegetank': 3, 'thor': 6, 'viking': 2, 'medivac': 2, 'liberator': 3,
-        'banshee': 3, 'raven': 2, 'battlecruiser': 6, 'ghost': 2,
-        
-        # Protoss
-        'zealot': 2, 'stalker': 2, 'sentry': 2, 'adept': 2, 'hightemplar': 2,
-        'darktemplar': 2, 'archon': 4, 'immortal': 4, 'colossus': 6, 'disruptor': 3,
-        'phoenix': 2, 'voidray': 4, 'oracle': 3, 'tempest': 5, 'carrier': 6,
-        'mothership': 8, 'observer': 1, 'warpprism': 2,
-        
-        # Zerg
-        'zergling': 0.5, 'baneling': 0.5, 'roach': 2, 'ravager': 3, 'hydralisk': 2,
-        'lurker': 3, 'infestor': 2, 'swarmhost': 3, 'ultralisk': 6, 'mutalisk': 2,
-        'corruptor': 2, 'viper': 3, 'broodlord': 4, 'queen': 2, 'overlord': 0,
-        
-        # Workers
-        'scv': 0, 'probe': 0, 'drone': 0,
-        
-        # Noise
-        'larva': 0, 'egg': 0, 'mineralfield': 0, 'mineralfield750': 0,
-        'labmineralfield': 0, 'labmineralfield750': 0,
-    }
-    
-    # Building values for expansion/tech tracking
-    BUILDING_VALUES = {
-        'commandcenter': 100, 'orbitalcommand': 100, 'planetaryfortress': 100,
-        'nexus': 100, 'hatchery': 100, 'lair': 100, 'hive': 100,
-        'barracks': 50, 'factory': 50, 'starport': 50,
-        'gateway': 50, 'roboticsfacility': 50, 'stargate': 50,
-        'spawningpool': 50, 'roachwarren': 50, 'hydraliskden': 50,
-        'spire': 75, 'greaterspire': 75, 'fleetbeacon': 75, 'templararchive': 75,
-    }
-    
-    def __init__(self):
-        """Initialize prioritizer."""
+    def __init__(self, settings: Optional[BattleSettings] = None, player_stats: Optional[PlayerStats] = None):
+        """
+        Initialize prioritizer.
+        
+        Args:
+            settings: Battle clustering and priority thresholds (defaults if None)
+            player_stats: Replay's player stats; if given, battles are scored
+                by the army resources actually lost instead of unit values
+        """
+        self.settings = settings or BattleSettings()
+        self.player_stats = player_stats if player_stats else None
         self.battles: List[BattleEvent] = []
         self.expansions: List[PrioritizedEvent] = []
         self.tech_events: List[PrioritizedEvent] = []
         self.all_priority_events: List[PrioritizedEvent] = []
+        
+        # Incremental mode (push / poll_closed)
+        self._clusterer = IncrementalClusterer(self.settings.time_window, self.settings.space_window)
+        self._closed: List[PrioritizedEvent] = []
     
-    def process_events(self, events: List[Dict]) -> List[PrioritizedEvent]:
+    def process_events(self, events: Iterable[Dict]) -> List[PrioritizedEvent]:
         """
         Process raw events and return prioritized timeline.
         
         Args:
-            events: List of raw events from event_extractor
-            
+            events: Raw events from event_extractor - an EventStore, a list of
+                dicts, or a stream such as StreamingEventExtractor.stream()
+                (consumed once)
+        
         Returns:
             List of prioritized events sorted by time
         """
-        print(f"📊 Processing {len(events)} raw events...")
+        store = EventStore.from_records(events)
+        print(f"📊 Processing {len(store)} raw events...")
         
-        # Separate events by type
-        deaths = [e for e in events if e['type'] == 'unit_died']
-        births = [e for e in events if e['type'] == 'unit_born']
-        upgrades = [e for e in events if e['type'] == 'upgrade_complete']
+        # Separate events by type (vectorized masks)
+        deaths = store[store.of_type('unit_died')]
+        births = store[store.of_type('unit_born')]
+        upgrades = store[store.of_type('upgrade_complete')]
         
         print(f"   Deaths: {len(deaths)}, Births: {len(births)}, Upgrades: {len(upgrades)}")
         
@@ -150,160 +183,160 @@ class EventPrioritizer:
         print(f"✅ Generated {len(self.all_priority_events)} prioritized events")
         return self.all_priority_events
     
-    def _cluster_battles(self, deaths: List[Dict]):
-        """Cluster death events into battles by time and location."""
+    def army_deaths(self, deaths: EventStore) -> EventStore:
+        """Deaths that can be part of a battle: army units with a location."""
         # Filter out noise (workers, larvae, minerals)
-        army_deaths = []
-        for death in deaths:
-            unit_name = death.get('unit_name', '').lower()
-            if unit_name in self.UNIT_VALUES and self.UNIT_VALUES[unit_name] > 0:
-                if death.get('location'):  # Must have location
-                    army_deaths.append(death)
+        return deaths[(unit_catalog.column(deaths, 'value') > 0) & deaths.has_location]
+    
+    def _cluster_battles(self, deaths: EventStore):
+        """Cluster death events into battles by time and location."""
+        army_deaths = self.army_deaths(deaths)
         
         print(f"   Army deaths (with locations): {len(army_deaths)}")
         
-        if not army_deaths:
+        if not len(army_deaths):
             return
         
         # Sort by time
-        army_deaths.sort(key=lambda e: e['timestamp'])
-        
-        # Cluster using time and space windows
-        TIME_WINDOW = 30  # Deaths within 30 seconds
-        SPACE_WINDOW = 20  # Deaths within 20 map units
-        
-        current_cluster = []
-        
-        for death in army_deaths:
-            if not current_cluster:
-                current_cluster.append(death)
-                continue
-            
-            # Check if death belongs to current cluster
-            last_death = current_cluster[-1]
-            time_diff = death['timestamp'] - last_death['timestamp']
-            
-            if time_diff <= TIME_WINDOW:
-                # Check spatial proximity
-                loc1 = death['location']
-                loc2 = last_death['location']
-                distance = ((loc1['x'] - loc2['x'])**2 + (loc1['y'] - loc2['y'])**2)**0.5
-                
-                if distance <= SPACE_WINDOW:
-                    # Add to current cluster
-                    current_cluster.append(death)
-                else:
-                    # Too far away, save current cluster and start new one
-                    self._save_battle_cluster(current_cluster)
-                    current_cluster = [death]
-            else:
-                # Too much time passed, save cluster and start new one
-                self._save_battle_cluster(current_cluster)
-                current_cluster = [death]
-        
-        # Save last cluster
-        if current_cluster:
-            self._save_battle_cluster(current_cluster)
-    
-    def _save_battle_cluster(self, cluster: List[Dict]):
+        army_deaths = army_deaths.sorted_by_time()
+        
+        # Deaths within both windows of each other are linked and a battle is
+        # a connected group of linked deaths, so concurrent fights in
+        # different places stay separate battles
+        data = army_deaths.data
+        labels = cluster_labels(data['timestamp'], data['x'], data['y'], self.settings.time_window, self.settings.space_window)
+        
+        # Labels are numbered by first death; group each battle's deaths in time order
+        order = np.argsort(labels, kind='stable')
+        sizes = np.bincount(labels)
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        for label in np.flatnonzero(sizes >= self.settings.min_deaths):
+            self._save_battle_cluster(army_deaths[order[bounds[label]:bounds[label + 1]]])
+    
+    def _save_battle_cluster(self, cluster: EventStore):
         """Save a battle cluster if it's significant enough."""
-        MIN_DEATHS = 3  # Need at least 3 deaths to be a battle
-        
-        if len(cluster) < MIN_DEATHS:
+        settings = self.settings
+        if len(cluster) < settings.min_deaths:
             return
         
-        # Calculate center location
-        avg_x = sum(d['location']['x'] for d in cluster) / len(cluster)
-        avg_y = sum(d['location']['y'] for d in cluster) / len(cluster)
+        values = unit_catalog.column(cluster, 'value')
+        data = cluster.data
+        
+        # Densest moment (value-weighted kernel density over death times);
+        # the location is the value-weighted centroid of deaths around it
+        peak_time, near_peak = density_peak(data['timestamp'], values)
+        weights = values * near_peak
+        center_x = np.average(data['x'], weights=weights)
+        center_y = np.average(data['y'], weights=weights)
         
         # Calculate army value lost
-        total_value = 0
-        for death in cluster:
-            unit_name = death.get('unit_name', '').lower()
-            value = self.UNIT_VALUES.get(unit_name, 1)
-            total_value += value
-        
-        # Determine priority based on value and death count
-        if total_value >= 20 or len(cluster) >= 15:
+        total_value = values.sum()
+        
+        # Army value destroyed by each killer and lost by each dead unit's owner
+        # (deaths without a known killer/owner are skipped)
+        kills_by_player = value_by_player(data['player'], values)
+        losses_by_player = value_by_player(data['owner'], values)
+        
+        timestamps = cluster.timestamps
+        
+        # Determine priority based on resources (or unit value) lost and death count
+        resources_lost = None
+        if self.player_stats is not None:
+            # Only the players who lost units here (everyone if owners are unknown)
+            participants = list(losses_by_player) or None
+            resources_lost = self.player_stats.resources_lost(int(timestamps[0]), int(timestamps[-1]), participants)
+            high = resources_lost >= settings.high_resources
+            medium = resources_lost >= settings.medium_resources
+        else:
+            high = total_value >= settings.high_value
+            medium = total_value >= settings.medium_value
+        
+        if high or len(cluster) >= settings.high_deaths:
             priority = "high"
-        elif total_value >= 10 or len(cluster) >= 8:
+        elif medium or len(cluster) >= settings.medium_deaths:
             priority = "medium"
         else:
             priority = "low"
         
         battle = BattleEvent(
-            start_time=cluster[0]['timestamp'],
-            end_time=cluster[-1]['timestamp'],
-            location={'x': int(avg_x), 'y': int(avg_y)},
-            deaths=cluster,
+            start_time=int(timestamps[0]),
+            end_time=int(timestamps[-1]),
+            location={'x': int(center_x), 'y': int(center_y)},
+            deaths=cluster.to_dicts(),
             army_value_lost=int(total_value),
-            priority=priority
+            priority=priority,
+            peak_time=peak_time,
+            kills_by_player=kills_by_player,
+            losses_by_player=losses_by_player,
+            resources_lost=resources_lost
         )
         
         self.battles.append(battle)
     
-    def _process_expansions(self, births: List[Dict]):
+    def _process_expansions(self, births: EventStore):
         """Extract expansion events."""
-        expansion_buildings = ['commandcenter', 'orbitalcommand', 'nexus', 'hatchery', 'lair', 'hive']
-        
-        for birth in births:
-            unit_name = birth.get('unit_name', '').lower()
-            if any(exp in unit_name for exp in expansion_buildings):
-                # Skip starting bases (time 0)
-                if birth['timestamp'] < 10:
-                    continue
-                
-                score = 100  # Expansions are always important
-                
-                self.expansions.append(PrioritizedEvent(
-                    time_seconds=birth['timestamp'],
-                    event_type='expansion',
-                    description=f"P{birth['player']} expands - {birth['unit_name']}",
-                    location=birth.get('location'),
-                    priority='high',
-                    score=score,
-                    duration=8  # Show expansions longer
-                ))
-    
-    def _process_tech(self, births: List[Dict]):
+        expansions = births[unit_catalog.column(births, 'is_expansion', dtype=bool)]
+        
+        # Skip starting bases (time 0)
+        expansions = expansions[expansions.timestamps >= 10]
+        
+        for birth in expansions:
+            self.expansions.append(self._expansion_event(birth))
+    
+    def _process_tech(self, births: EventStore):
         """Extract tech building events."""
-        tech_buildings = ['spire', 'greaterspire', 'fleetbeacon', 'templararchive', 
-                         'stargate', 'roboticsfacility', 'factory', 'starport', 'fusioncore']
-        
-        for birth in births:
-            unit_name = birth.get('unit_name', '').lower()
-            if any(tech in unit_name for tech in tech_buildings):
-                score = 60  # Tech is moderately important
-                
-                self.tech_events.append(PrioritizedEvent(
-                    time_seconds=birth['timestamp'],
-                    event_type='tech',
-                    description=f"P{birth['player']} builds {birth['unit_name']}",
-                    location=birth.get('location'),
-                    priority='medium',
-                    score=score,
-                    duration=5
-                ))
+        for birth in births[unit_catalog.column(births, 'is_tech', dtype=bool)]:
+            self.tech_events.append(self._tech_event(birth))
+    
+    def _expansion_event(self, birth) -> PrioritizedEvent:
+        return PrioritizedEvent(
+            time_seconds=birth['timestamp'],
+            event_type='expansion',
+            description=f"P{birth['player']} expands - {birth['unit_name']}",
+            location=birth['location'],
+            priority='high',
+            score=100,  # Expansions are always important
+            duration=8  # Show expansions longer
+        )
+    
+    def _tech_event(self, birth) -> PrioritizedEvent:
+        return PrioritizedEvent(
+            time_seconds=birth['timestamp'],
+            event_type='tech',
+            description=f"P{birth['player']} builds {birth['unit_name']}",
+            location=birth['location'],
+            priority='medium',
+            score=60,  # Tech is moderately important
+            duration=5
+        )
+    
+    def _battle_event(self, battle: BattleEvent) -> PrioritizedEvent:
+        if battle.resources_lost is not None:
+            score = battle.resources_lost // 25  # Same scale as value (~50 resources per supply)
+            lost = f"{battle.resources_lost} resources lost"
+        else:
+            score = battle.army_value_lost * 2  # Weight by value lost
+            lost = f"{battle.army_value_lost} value lost"
+        if battle.priority == 'high':
+            score += 50
+        elif battle.priority == 'medium':
+            score += 25
+        
+        return PrioritizedEvent(
+            time_seconds=battle.peak_time,
+            event_type='battle',
+            description=f"Battle: {len(battle.deaths)} deaths, {lost}",
+            location=battle.location,
+            priority=battle.priority,
+            score=score,
+            duration=min(10, battle.duration + 3)  # Show battle duration + buffer
+        )
     
     def _combine_events(self):
         """Combine all event types into single prioritized timeline."""
         # Add battles
         for battle in self.battles:
-            score = battle.army_value_lost * 2  # Weight by value lost
-            if battle.priority == 'high':
-                score += 50
-            elif battle.priority == 'medium':
-                score += 25
-            
-            self.all_priority_events.append(PrioritizedEvent(
-                time_seconds=battle.peak_time,
-                event_type='battle',
-                description=f"Battle: {len(battle.deaths)} deaths, {battle.army_value_lost} value lost",
-                location=battle.location,
-                priority=battle.priority,
-                score=score,
-                duration=min(10, battle.duration + 3)  # Show battle duration + buffer
-            ))
+            self.all_priority_events.append(self._battle_event(battle))
         
         # Add expansions
         self.all_priority_events.extend(self.expansions)
@@ -314,6 +347,64 @@ class EventPrioritizer:
         # Sort by time
         self.all_priority_events.sort(key=lambda e: e.time_seconds)
     
+    # --- Incremental API ---
+    
+    def push(self, event: Dict):
+        """
+        Feed one raw event while the game is still being read.
+        
+        Events must arrive in time order (as the tracker stream delivers
+        them). Expansions and tech are finalized immediately; a battle is
+        finalized once settings.time_window seconds pass without a death that could
+        join it. Collect finalized events with poll_closed().
+        
+        Args:
+            event: Raw event record (EventExtractor format)
+        """
+        now = event['timestamp']
+        for deaths in self._clusterer.pop_closed(now):
+            self._close_battle(deaths)
+        
+        event_type = event['type']
+        if event_type == 'unit_died':
+            location = event.get('location')
+            if location and unit_catalog.lookup(event.get('unit_name', 'Unknown')).value > 0:
+                self._clusterer.add(now, location['x'], location['y'], event)
+        
+        elif event_type == 'unit_born':
+            unit = unit_catalog.lookup(event.get('unit_name', 'Unknown'))
+            if unit.is_expansion and now >= 10:  # Skip starting bases
+                expansion = self._expansion_event(event)
+                self.expansions.append(expansion)
+                self._publish(expansion)
+            if unit.is_tech:
+                tech = self._tech_event(event)
+                self.tech_events.append(tech)
+                if tech.priority in ['high', 'medium']:
+                    self._publish(tech)
+    
+    def poll_closed(self) -> List[PrioritizedEvent]:
+        """Prioritized events finalized since the last call, sorted by time."""
+        closed, self._closed = self._closed, []
+        closed.sort(key=lambda e: e.time_seconds)
+        return closed
+    
+    def flush(self) -> List[PrioritizedEvent]:
+        """End of stream: finalize open battles and return the last events."""
+        for deaths in self._clusterer.close_all():
+            self._close_battle(deaths)
+        return self.poll_closed()
+    
+    def _close_battle(self, deaths: List[Dict]):
+        battle_count = len(self.battles)
+        self._save_battle_cluster(EventStore.from_records(deaths))
+        if len(self.battles) > battle_count:
+            self._publish(self._battle_event(self.battles[-1]))
+    
+    def _publish(self, event: PrioritizedEvent):
+        bisect.insort(self.all_priority_events, event, key=lambda e: e.time_seconds)
+        self._closed.append(event)
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of prioritized events."""
         return {
@@ -331,20 +422,19 @@ class EventPrioritizer:
     
     def _get_timeline(self) -> List[Dict]:
         """Get timeline breakdown by minute."""
+        index = EventIndex(self.all_priority_events)
+        counts = index.histogram()
+        high_priority = index.histogram(lambda e: e.priority == 'high')
+        battles = index.histogram(lambda e: e.event_type == 'battle')
+        
         timeline = []
-        max_time = max(e.time_seconds for e in self.all_priority_events) if self.all_priority_events else 0
-        
-        for minute in range((max_time // 60) + 1):
-            time_range = (minute * 60, (minute + 1) * 60)
-            events_in_range = [e for e in self.all_priority_events 
-                             if time_range[0] <= e.time_seconds < time_range[1]]
-            if events_in_range:
-                timeline.append({
-                    'time': f"{minute}:00-{minute}:59",
-                    'count': len(events_in_range),
-                    'high_priority': len([e for e in events_in_range if e.priority == 'high']),
-                    'battles': len([e for e in events_in_range if e.event_type == 'battle']),
-                })
+        for minute in np.flatnonzero(counts):
+            timeline.append({
+                'time': f"{minute}:00-{minute}:59",
+                'count': int(counts[minute]),
+                'high_priority': int(high_priority[minute]),
+                'battles': int(battles[minute]),
+            })
         
         return timeline
     
@@ -369,21 +459,36 @@ def main():
     print("EVENT PRIORITIZER")
     print("=" * 80)
     
-    # Load raw events
-    events_path = Path("output/replay_events.json")
-    if not events_path.exists():
-        print(f"❌ No events file found: {events_path}")
-        print("   Run event_extractor.py first!")
-        return
-    
-    with open(events_path, 'r') as f:
-        data = json.load(f)
-        raw_events = data['events']
+    # Load raw events - straight from a replay (through the analysis cache) if one is given
+    if len(sys.argv) > 1:
+        try:
+            from .event_extractor import EventExtractor
+            from .replay_cache import ReplayCache
+        except ImportError:
+            from event_extractor import EventExtractor
+            from replay_cache import ReplayCache
+        
+        extractor = EventExtractor(sys.argv[1], cache=ReplayCache())
+        extractor.load_replay()
+        extractor.extract_events()
+        raw_events = extractor.events
+        player_stats = extractor.player_stats
+    else:
+        events_path = Path("output/replay_events.json")
+        if not events_path.exists():
+            print(f"❌ No events file found: {events_path}")
+            print("   Run event_extractor.py first (or pass a replay path)!")
+            return
+        
+        with open(events_path, 'r') as f:
+            data = json.load(f)
+            raw_events = data['events']
+        player_stats = None  # The events file has no player stats: score battles by unit values
     
     print(f"\n📂 Loaded {len(raw_events)} raw events")
     
     # Prioritize events
-    prioritizer = EventPrioritizer()
+    prioritizer = EventPrioritizer(player_stats=player_stats)
     priority_events = prioritizer.process_events(raw_events)
     
     # Show summary
@@ -0,0 +1,254 @@
+"""
+Event Store - Columnar, array-backed storage for extracted game events.
+
+EventExtractor used to keep events as a list of dicts, each repeating its
+string keys and holding a nested location dict. EventStore keeps the same
+data in one NumPy structured array (16 bytes per event) plus an interned
+name table, so later stages can filter with vectorized masks instead of
+scanning Python dicts.
+
+Old callers can keep treating the store as a list of dicts: iterating or
+indexing it yields read-only dict-compatible views, and to_dicts() returns
+the original list-of-dicts format.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+# Code tables (index = code stored in the array)
+EVENT_TYPES = ("unit_born", "unit_died", "upgrade_complete")
+PRIORITIES = ("low", "medium", "high")
+
+UNIT_BORN, UNIT_DIED, UPGRADE_COMPLETE = range(len(EVENT_TYPES))
+LOW, MEDIUM, HIGH = range(len(PRIORITIES))
+
+EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITIES)}
+
+NO_PLAYER = -1      # Stored for player/owner=None (e.g. unit deaths without a killer)
+NO_LOCATION = -1    # Stored in x and y for events without a location
+
+EVENT_DTYPE = np.dtype([
+    ("timestamp", np.int32),
+    ("type", np.uint8),
+    ("name", np.int32),       # Index into EventStore.names (unit or upgrade name)
+    ("player", np.int8),      # Acting player (for deaths: the killer)
+    ("owner", np.int8),       # Deaths: the dead unit's owner (NO_PLAYER otherwise)
+    ("x", np.int16),
+    ("y", np.int16),
+    ("priority", np.uint8),
+])
+
+
+class EventView(Mapping):
+    """Read-only dict-compatible view of one event in an EventStore."""
+    
+    __slots__ = ("_store", "_index")
+    
+    def __init__(self, store: "EventStore", index: int):
+        self._store = store
+        self._index = index
+    
+    def _keys(self):
+        row_type = self._store.data["type"][self._index]
+        if row_type == UNIT_DIED:
+            return ("timestamp", "type", "unit_name", "player", "owner", "priority", "location")
+        name_key = "upgrade_name" if row_type == UPGRADE_COMPLETE else "unit_name"
+        return ("timestamp", "type", name_key, "player", "priority", "location")
+    
+    def __getitem__(self, key):
+        row = self._store.data[self._index]
+        if key == "timestamp":
+            return int(row["timestamp"])
+        if key == "type":
+            return EVENT_TYPES[row["type"]]
+        if key == "player":
+            return None if row["player"] == NO_PLAYER else int(row["player"])
+        if key == "owner" and row["type"] == UNIT_DIED:
+            return None if row["owner"] == NO_PLAYER else int(row["owner"])
+        if key == "priority":
+            return PRIORITIES[row["priority"]]
+        if key == "location":
+            if row["x"] == NO_LOCATION:
+                return None
+            return {"x": int(row["x"]), "y": int(row["y"])}
+        if key in self._keys():
+            return self._store.names[row["name"]]
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self._keys())
+    
+    def __len__(self):
+        return len(self._keys())
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class EventStore:
+    """
+    Events stored as columns of a NumPy structured array.
+    
+    Columns: timestamp, type (code), name (interned id), player, owner,
+    x, y, priority (code). Access columns with `store.data["timestamp"]` or the
+    shortcut properties, and filter with boolean masks: `store[mask]`.
+    """
+    
+    def __init__(self, data: Optional[np.ndarray] = None, names: Optional[List[str]] = None):
+        """
+        Initialize store.
+        
+        Args:
+            data: Structured array with EVENT_DTYPE (empty store if None)
+            names: Interned name table that data["name"] indexes into
+        """
+        if data is None:
+            data = np.empty(0, dtype=EVENT_DTYPE)
+        self._buffer = data
+        self._size = len(data)
+        self.names: List[str] = list(names) if names else []
+        self._name_ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "EventStore":
+        """Build a store from event dicts (a list or a one-shot stream)."""
+        if isinstance(records, EventStore):
+            return records
+        
+        store = cls()
+        for record in records:
+            store.append(record)
+        return store
+    
+    @property
+    def data(self) -> np.ndarray:
+        """The structured array of stored events."""
+        return self._buffer[:self._size]
+    
+    def intern(self, name: str) -> int:
+        """Return the id for a unit/upgrade name, adding it if new."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+    
+    def name_id(self, name: str) -> int:
+        """Return the id for a name, or -1 if no event uses it."""
+        return self._name_ids.get(name, -1)
+    
+    def append(self, record: Dict):
+        """Append one event dict (EventExtractor format)."""
+        if self._size == len(self._buffer):
+            # Grow geometrically so appends are amortized O(1)
+            grown = np.empty(max(1024, 2 * len(self._buffer)), dtype=EVENT_DTYPE)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        
+        if record["type"] == "upgrade_complete":
+            name = record.get("upgrade_name", "Unknown")
+        else:
+            name = record.get("unit_name", "Unknown")
+        
+        player = record.get("player")
+        owner = record.get("owner")
+        location = record.get("location")
+        if location:
+            x, y = location["x"], location["y"]
+        else:
+            x = y = NO_LOCATION
+        
+        self._buffer[self._size] = (
+            record["timestamp"],
+            EVENT_TYPE_CODES[record["type"]],
+            self.intern(name),
+            NO_PLAYER if player is None else player,
+            NO_PLAYER if owner is None else owner,
+            x,
+            y,
+            PRIORITY_CODES[record["priority"]],
+        )
+        self._size += 1
+    
+    # Column shortcuts
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.data["timestamp"]
+    
+    @property
+    def types(self) -> np.ndarray:
+        return self.data["type"]
+    
+    @property
+    def name_ids(self) -> np.ndarray:
+        return self.data["name"]
+    
+    @property
+    def players(self) -> np.ndarray:
+        return self.data["player"]
+    
+    @property
+    def owners(self) -> np.ndarray:
+        return self.data["owner"]
+    
+    @property
+    def priorities(self) -> np.ndarray:
+        return self.data["priority"]
+    
+    @property
+    def has_location(self) -> np.ndarray:
+        return self.data["x"] != NO_LOCATION
+    
+    def of_type(self, event_type: str) -> np.ndarray:
+        """Mask of events with the given type ("unit_died", ...)."""
+        return self.types == EVENT_TYPE_CODES[event_type]
+    
+    def with_priority(self, priority: str) -> np.ndarray:
+        """Mask of events with the given priority ("high", ...)."""
+        return self.priorities == PRIORITY_CODES[priority]
+    
+    def name_lookup(self, func, dtype=float) -> np.ndarray:
+        """
+        Evaluate func(name) once per interned name.
+        
+        Index the result with `store.name_ids` to get a per-event column,
+        e.g. `store.name_lookup(is_army)[store.name_ids]`.
+        """
+        return np.array([func(name) for name in self.names], dtype=dtype)
+    
+    def names_of(self) -> List[str]:
+        """Per-event unit/upgrade names."""
+        return [self.names[i] for i in self.name_ids]
+    
+    # List-of-dicts compatibility
+    
+    def __len__(self):
+        return self._size
+    
+    def __iter__(self) -> Iterator[EventView]:
+        for i in range(self._size):
+            yield EventView(self, i)
+    
+    def __getitem__(self, key):
+        """Int -> dict view; slice, mask or index array -> new EventStore."""
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self._size
+            if not 0 <= key < self._size:
+                raise IndexError("event index out of range")
+            return EventView(self, int(key))
+        return EventStore(self.data[key], self.names)
+    
+    def to_dicts(self) -> List[Dict]:
+        """Convert to the original list-of-dicts format."""
+        return [dict(view) for view in self]
+    
+    def sorted_by_time(self) -> "EventStore":
+        """Events in stable timestamp order."""
+        return self[np.argsort(self.timestamps, kind="stable")]
@@ -1,18 +1,18 @@
 """
 Game Clock - Synchronized time tracking for replay recording.
 
-Uses OCR to detect replay start/end and timestamp correlation for accurate timing.
+Uses OCR to detect replay start/end and an online rate estimate for accurate timing.
+The timer is read on a background TimerSampler thread; every sample feeds a
+ClockEstimator (offset + rate fit that detects pauses and speed changes), so the
+clock is fractional, right at any replay speed, and never waits on OCR.
 """
 
 import time
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-if __name__ == "__main__":
-    sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sc2cast.clock_estimator import ClockEstimate, ClockEstimator
+from sc2cast.clock_sampler import ClockSample, TimerSampler
 from sc2cast.timer_reader import GameTimerReader
 
 
@@ -21,81 +21,122 @@ class GameClock:
     Manages game time during replay recording.
     
     Strategy:
-    1. Poll OCR until timer appears (replay started)
-    2. Use timestamp correlation (real_time = game_time at normal speed)
-    3. Validate periodically with OCR (every 10-15 seconds)
+    1. Sample the timer in the background until it appears (replay started)
+    2. Fit game time = offset + rate * real time over the samples (ClockEstimator)
+    3. Validation reports the latest sample's distance from the fit (free - no OCR here)
     4. Detect end when timer reaches final time
     """
     
-    def __init__(self, replay_duration_seconds: int, speed_multiplier: float = 1.0):
+    # Samples older than this (seconds) don't count as current readings
+    SAMPLE_MAX_AGE = 1.0
+    
+    def __init__(self, replay_duration_seconds: int, speed_multiplier: float = 1.0,
+                 timer_reader: Optional[GameTimerReader] = None, sample_interval: float = 0.2):
         """
         Initialize game clock.
         
         Args:
             replay_duration_seconds: Total replay length (from replay metadata)
-            speed_multiplier: Playback speed multiplier (1.0 = normal, 2.0 = 2x speed)
+            speed_multiplier: Expected game seconds per real second (1.0 = "Faster");
+                only a prior - the actual rate is estimated from the timer
+            timer_reader: Timer reader for the sampler thread (created if None)
+            sample_interval: Seconds between background timer reads
         """
         self.replay_duration = replay_duration_seconds
         self.speed_multiplier = speed_multiplier
-        self.timer_reader = GameTimerReader()
+        self.timer_reader = timer_reader or GameTimerReader()
+        self.sampler = TimerSampler(self.timer_reader, interval=sample_interval)
+        self.estimator = ClockEstimator(prior_rate=speed_multiplier)
         
-        # State
-        self.game_start_time: Optional[float] = None
+        # State (times are time.monotonic())
         self.game_start_offset: int = 0  # If replay doesn't start at 0:00
         self.last_ocr_time: Optional[float] = None
         self.last_ocr_game_time: Optional[int] = None
+        self.last_validation_time: Optional[float] = None
         self.is_started = False
         self.is_ended = False
+        
+        self._ingested = 0              # Ring samples fed to the estimator
+        self._drift: Optional[float] = None  # Largest sample-vs-estimate distance since the last validation
+        self._recalibrated = False      # Regime change since the last validation
+    
+    def stop(self):
+        """Stop background timer sampling."""
+        self.sampler.stop()
+    
+    def _recent_samples(self, count: int = 3) -> List[ClockSample]:
+        """Up to count latest samples captured within SAMPLE_MAX_AGE (never blocks)."""
+        now = time.monotonic()
+        return [s for s in self.sampler.ring.latest(count) if now - s.capture_time <= self.SAMPLE_MAX_AGE]
+    
+    def _ingest(self):
+        """Feed samples published since the last call to the estimator."""
+        samples, self._ingested = self.sampler.ring.read_from(self._ingested)
+        for sample in samples:
+            event = self.estimator.add(sample.capture_time, sample.game_seconds, sample.confidence)
+            self.last_ocr_time = sample.capture_time
+            self.last_ocr_game_time = sample.game_seconds
+            
+            if event != "outlier" and self.estimator.last_residual is not None:
+                self._drift = max(self._drift or 0.0, abs(self.estimator.last_residual))
+            
+            if event in ("speed_change", "pause", "resume"):
+                self._recalibrated = True
+                estimate = self.estimator.estimate(sample.capture_time)
+                print(f"⏯️  Clock {event.replace('_', ' ')} at {self._format(sample.game_seconds)} "
+                      f"(rate: {estimate.rate:.2f}x)")
+    
+    @staticmethod
+    def _consensus(samples: List[ClockSample]) -> ClockSample:
+        """Median sample by game time, for robustness."""
+        return sorted(samples, key=lambda s: s.game_seconds)[len(samples) // 2]
+    
+    @staticmethod
+    def _format(seconds: float) -> str:
+        seconds = int(seconds)
+        return f"{seconds // 60}:{seconds % 60:02d}"
     
     def wait_for_replay_start(self, timeout: float = 60.0, poll_interval: float = 2.0) -> bool:
         """
-        Poll OCR until timer appears (replay has started).
+        Sample the timer until it appears (replay has started).
         
         Uses 3 consecutive readings to confirm start.
         
         Args:
             timeout: Max seconds to wait
-            poll_interval: Seconds between OCR checks
+            poll_interval: Seconds between checks of the latest samples
             
         Returns:
             True if started, False if timeout
         """
         print("⏳ Waiting for replay to start...")
-        start_wait = time.time()
+        self.sampler.start()
+        start_wait = time.monotonic()
         
-        while time.time() - start_wait < timeout:
-            # Try to read timer 3 times for validation
-            readings = []
-            for i in range(3):
-                result = self.timer_reader.read_timer()
-                if result:
-                    clean_time, raw_text = result
-                    if clean_time:
-                        game_seconds = self.timer_reader.time_to_seconds(clean_time)
-                        if game_seconds is not None:
-                            readings.append((game_seconds, clean_time))
-                if i < 2:
-                    time.sleep(0.2)
+        while time.monotonic() - start_wait < timeout:
+            readings = self._recent_samples(3)
             
             # If we got at least 2 consistent readings, replay might be starting
             if len(readings) >= 2:
-                # Use median for robustness
-                readings.sort(key=lambda x: x[0])
-                median_idx = len(readings) // 2
-                game_seconds, clean_time = readings[median_idx]
+                sample = self._consensus(readings)
+                clean_time = self._format(sample.game_seconds)
                 
                 # Wait for timer to advance past 0:00 to ensure game loaded
                 # (loading screen can show 0:00 before game starts)
-                if game_seconds < 3:
+                if sample.game_seconds < 3:
                     print(f"⏳ Timer detected at {clean_time}, waiting for game to fully load...")
                     time.sleep(3)  # Wait a bit more
                     continue
                 
-                self.game_start_time = time.time()
-                self.game_start_offset = game_seconds
+                # Start estimating from these readings (earlier ones may be the loading screen)
+                self.estimator = ClockEstimator(prior_rate=self.speed_multiplier)
+                self._ingested = self.sampler.ring.written - len(readings)
+                self._ingest()
+                self._drift = None
+                
+                self.game_start_offset = sample.game_seconds
                 self.is_started = True
-                self.last_ocr_time = self.game_start_time
-                self.last_ocr_game_time = game_seconds
+                self.last_validation_time = time.monotonic()
                 
                 print(f"✅ Replay started! First timer reading: {clean_time}")
                 print(f"   Validated with {len(readings)}/3 readings")
@@ -106,122 +147,94 @@ class GameClock:
             time.sleep(poll_interval)
         
         print(f"❌ Timeout waiting for replay start after {timeout}s")
+        self.sampler.stop()
         return False
     
-    def get_current_game_time(self) -> int:
+    def set_expected_rate(self, speed_multiplier: float):
         """
-        Get current game time in seconds.
+        Tell the clock the replay speed was just changed.
         
-        Uses timestamp correlation: game_time = start_offset + (now - start_time) * speed_multiplier
+        Re-anchors at the current estimate with the new rate as a prior (the
+        estimator would also detect the change from the timer, a few samples later).
+        """
+        self._ingest()
+        self.speed_multiplier = speed_multiplier
+        self.estimator.set_rate(speed_multiplier, time.monotonic())
+    
+    def game_time_at(self, when: float) -> float:
+        """Estimated game time in seconds at a time.monotonic() instant."""
+        if not self.is_started:
+            return 0.0
+        self._ingest()
+        return self.estimator.game_time(when)
+    
+    def get_game_time(self) -> float:
+        """Get current game time in seconds (fractional)."""
+        return self.game_time_at(time.monotonic())
+    
+    def get_estimate(self) -> ClockEstimate:
+        """Current game time with its rate, uncertainty and pause state."""
+        self._ingest()
+        return self.estimator.estimate(time.monotonic())
+    
+    def get_current_game_time(self) -> int:
+        """
+        Get current game time in whole seconds.
         
         Returns:
             Current game time in seconds
         """
-        if not self.is_started or self.game_start_time is None:
-            return 0
-        
-        elapsed = time.time() - self.game_start_time
-        current_time = self.game_start_offset + int(elapsed * self.speed_multiplier)
-        
-        return current_time
+        return int(self.get_game_time())
     
     def get_current_game_time_formatted(self) -> str:
         """Get current game time as MM:SS string."""
-        seconds = self.get_current_game_time()
-        minutes = seconds // 60
-        secs = seconds % 60
-        return f"{minutes}:{secs:02d}"
+        return self._format(self.get_game_time())
     
-    def validate_sync(self) -> Tuple[bool, Optional[int]]:
+    def validate_sync(self) -> Tuple[bool, Optional[float]]:
         """
-        Validate clock sync with OCR.
+        Check clock sync against the latest timer samples.
         
-        Reads timer via OCR 3 times and uses consensus for reliability.
-        Auto-corrects if drift detected.
+        Every sample already corrects the estimate as it arrives. This reports
+        how far the samples since the last validation were from the estimate
+        (misreads excluded), and whether a pause or speed change re-anchored
+        the clock meanwhile. Never waits for OCR.
         
         Returns:
-            (is_valid, drift_seconds) - drift is None if OCR failed
+            (is_valid, drift_seconds) - drift is None if there are no new samples
         """
-        # Read timer 3 times over 0.6 seconds (3 frames at 30fps = 0.1s apart)
-        readings = []
-        for i in range(3):
-            result = self.timer_reader.read_timer()
-            if result:
-                clean_time, raw_text = result
-                if clean_time:
-                    ocr_seconds = self.timer_reader.time_to_seconds(clean_time)
-                    if ocr_seconds is not None:
-                        readings.append((ocr_seconds, clean_time))
-            if i < 2:  # Don't sleep after last reading
-                time.sleep(0.2)
+        self._ingest()
+        self.last_validation_time = time.monotonic()
         
-        if not readings:
-            return True, None  # All OCR failed, assume OK
-        
-        # Use median value for robustness
-        readings.sort(key=lambda x: x[0])
-        median_idx = len(readings) // 2
-        ocr_seconds, clean_time = readings[median_idx]
-        
-        # Compare with our timestamp-based time
-        our_time = self.get_current_game_time()
-        drift = abs(ocr_seconds - our_time)
-        
-        self.last_ocr_time = time.time()
-        self.last_ocr_game_time = ocr_seconds
-        
-        # If drift > 3 seconds, auto-correct
-        if drift > 3:
-            print(f"⚠️  Clock drift detected: {drift}s (OCR: {clean_time}, Clock: {self.get_current_game_time_formatted()})")
-            print(f"   Validated with {len(readings)}/3 readings")
-            print(f"   Auto-correcting...")
-            
-            # Recalibrate: set new start time based on OCR reading
-            self.game_start_time = time.time()
-            self.game_start_offset = ocr_seconds
-            
-            print(f"   ✅ Recalibrated to: {clean_time}")
-            return False, drift
-        
-        return True, drift
+        drift, self._drift = self._drift, None
+        is_valid, self._recalibrated = not self._recalibrated, False
+        if drift is None:
+            return True, None  # Nothing new read, assume OK
+        return is_valid, round(drift, 1)
     
     def check_if_ended(self) -> bool:
         """
         Check if replay has ended.
         
-        Uses OCR to detect when timer reaches end time.
-        Validates with 3 consecutive readings for reliability.
+        Uses the latest timer samples to detect when timer reaches end time.
+        Needs 2 of the last 3 readings for reliability.
         """
         if not self.is_started:
             return False
         
-        current_time = self.get_current_game_time()
+        current_time = self.get_game_time()
         
         # Check if we've reached expected duration
         if current_time >= self.replay_duration - 30:
-            # Near the end - verify with 3 OCR readings
-            readings = []
-            for i in range(3):
-                result = self.timer_reader.read_timer()
-                if result:
-                    clean_time, _ = result
-                    if clean_time:
-                        ocr_seconds = self.timer_reader.time_to_seconds(clean_time)
-                        if ocr_seconds is not None:
-                            readings.append((ocr_seconds, clean_time))
-                if i < 2:
-                    time.sleep(0.2)
+            # Near the end - verify with the latest samples
+            readings = self._recent_samples(3)
             
             if len(readings) >= 2:
-                # Use median
-                readings.sort(key=lambda x: x[0])
-                median_idx = len(readings) // 2
-                ocr_seconds, clean_time = readings[median_idx]
+                sample = self._consensus(readings)
                 
                 # Check if we're at or past the end
-                if ocr_seconds >= self.replay_duration - 5:
+                if sample.game_seconds >= self.replay_duration - 5:
                     if not self.is_ended:
-                        print(f"🏁 Replay ended! Duration: {clean_time}")
+                        print(f"🏁 Replay ended! Duration: {self._format(sample.game_seconds)}")
                         print(f"   Validated with {len(readings)}/3 readings")
                         self.is_ended = True
                     return True
@@ -237,7 +250,7 @@ class GameClock:
     
     def should_validate_now(self, validation_interval: float = 15.0) -> bool:
         """
-        Check if it's time for periodic OCR validation.
+        Check if it's time for periodic validation.
         
         Args:
             validation_interval: Seconds between validations
@@ -245,10 +258,10 @@ class GameClock:
         Returns:
             True if validation is due
         """
-        if not self.is_started or self.last_ocr_time is None:
+        if not self.is_started or self.last_validation_time is None:
             return False
         
-        elapsed_since_last = time.time() - self.last_ocr_time
+        elapsed_since_last = time.monotonic() - self.last_validation_time
         return elapsed_since_last >= validation_interval
 
 
@@ -282,31 +295,33 @@ def main():
     validation_count = 0
     
     while not clock.check_if_ended():
-        current_time = clock.get_current_game_time_formatted()
-        
         # Print every 5 seconds
         if time.time() - last_print >= 5.0:
-            print(f"⏱️  Game time: {current_time}")
+            estimate = clock.get_estimate()
+            print(f"⏱️  Game time: {estimate.game_time:.1f}s ± {estimate.uncertainty:.2f}s "
+                  f"(rate: {estimate.rate:.2f}x{', paused' if estimate.paused else ''})")
             last_print = time.time()
         
-        # Periodic validation
-        if clock.should_validate_now(validation_interval=15.0):
+        # Periodic validation (free: it only reads the sampler's latest samples)
+        if clock.should_validate_now(validation_interval=1.0):
             is_valid, drift = clock.validate_sync()
             validation_count += 1
             
-            if drift is not None:
-                if is_valid:
-                    print(f"✅ Validation #{validation_count}: Sync OK (drift: {drift}s)")
-                else:
-                    print(f"⚠️  Validation #{validation_count}: Recalibrated (drift was: {drift}s)")
+            if drift is not None and not is_valid:
+                print(f"⚠️  Validation #{validation_count}: Recalibrated (drift was: {drift}s)")
         
         time.sleep(0.5)
     
+    clock.stop()
     print()
     print("-" * 80)
     print("✅ Clock test complete!")
     print(f"   Final time: {clock.get_current_game_time_formatted()}")
     print(f"   Validations performed: {validation_count}")
+    print(f"   Timer samples: {clock.sampler.reads} ({clock.sampler.failures} failed, "
+          f"{clock.timer_reader.gate_hit_rate:.0%} unchanged crops served from cache)")
+    print(f"   Speed changes: {clock.estimator.speed_changes}, pauses: {clock.estimator.pauses}, "
+          f"outliers: {clock.estimator.outliers}")
     print()
 
 
@@ -0,0 +1,188 @@
+"""
+Glyph Reader - Template-matching reader for the in-game timer.
+
+The replay timer is drawn in a fixed font at a fixed place, so full OCR
+(EasyOCR's text detector plus recognizer, on torch) is far more than it
+needs. GlyphReader reads the timer crop with NumPy alone:
+
+1. Binarize: grayscale, threshold halfway between background and text
+2. Segment: runs of columns containing ink are glyphs
+3. Match: each glyph, scaled to the text height and centered in a fixed
+   cell, is compared against stored 0-9, ':' and '/' templates
+
+A read takes well under a millisecond and comes with a confidence (the
+worst glyph's match score), so callers can fall back to EasyOCR when it
+is low. Templates are learned from those fallback reads: every confident
+EasyOCR result labels the glyphs of its crop (see GlyphTemplates.learn).
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .paths import DATA_DIR
+except ImportError:
+    from paths import DATA_DIR
+
+
+GLYPHS = "0123456789:/"
+GLYPH_SHAPE = (12, 10)  # Template cell (rows, columns)
+
+DEFAULT_TEMPLATES_PATH = DATA_DIR / "timer_glyphs.npz"  # Learned per user, not per checkout
+
+MIN_CONTRAST = 40       # Gray levels between background and text (less: no text)
+MIN_CONFIDENCE = 0.85   # Below this, callers should fall back to OCR
+
+
+@dataclass
+class GlyphReading:
+    """Timer read by template matching."""
+    text: str           # Matched glyphs, e.g. "3:37/9:28"
+    confidence: float   # Worst glyph's match score (0-1: 1 - mismatched / total ink)
+
+
+def binarize(img: np.ndarray) -> np.ndarray:
+    """Text mask of an RGB (or gray) crop; all False if there is no text."""
+    gray = img.astype(np.float32)
+    if gray.ndim == 3:
+        gray = gray[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    low, high = float(gray.min()), float(gray.max())
+    if high - low < MIN_CONTRAST:
+        return np.zeros(gray.shape, dtype=bool)
+    return gray > (low + high) / 2
+
+
+def segment(mask: np.ndarray) -> np.ndarray:
+    """
+    Glyph cells of a text mask, left to right: (glyphs, *GLYPH_SHAPE) array.
+    
+    Glyphs are runs of inked columns, cropped to the rows of the whole line
+    (so ':' keeps its height) and scaled to GLYPH_SHAPE keeping aspect ratio.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return np.zeros((0, *GLYPH_SHAPE), dtype=np.float32)
+    line = mask[rows[0]:rows[-1] + 1]
+    
+    inked = np.concatenate(([0], line.any(axis=0).astype(np.int8), [0]))
+    edges = np.diff(inked)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    
+    height, width = GLYPH_SHAPE
+    scale = height / line.shape[0]
+    row_index = np.minimum((np.arange(height) / scale).astype(np.int64), line.shape[0] - 1)
+    
+    # Source column of every cell column, for all glyphs at once (-1 = padding)
+    lengths = ends - starts
+    glyph_widths = np.clip(np.round(lengths * scale).astype(np.int64), 1, width)
+    offsets = np.arange(width)[None, :] - ((width - glyph_widths) // 2)[:, None]
+    inside = (offsets >= 0) & (offsets < glyph_widths[:, None])
+    col_index = starts[:, None] + np.minimum((np.maximum(offsets, 0) / scale).astype(np.int64), (lengths - 1)[:, None])
+    
+    cells = line[row_index][:, col_index].transpose(1, 0, 2) & inside[:, None, :]
+    return cells.astype(np.float32)
+
+
+class GlyphTemplates:
+    """Per-glyph templates: the mean of every cell learned for that glyph."""
+    
+    def __init__(self, sums: Optional[Dict[str, np.ndarray]] = None, counts: Optional[Dict[str, int]] = None):
+        self.sums = sums or {}
+        self.counts = counts or {}
+        self._matrix: Optional[Tuple[str, np.ndarray]] = None
+    
+    def __bool__(self):
+        return bool(self.counts)
+    
+    @property
+    def complete(self) -> bool:
+        """True once every digit and ':' has a template."""
+        return all(glyph in self.counts for glyph in GLYPHS[:11])
+    
+    def learn(self, img: np.ndarray, text: str) -> bool:
+        """
+        Add the glyphs of a crop whose text is known (e.g. from OCR).
+        
+        Returns:
+            False (nothing learned) if the crop doesn't segment into len(text) glyphs
+        """
+        text = text.replace(' ', '')
+        cells = segment(binarize(img))
+        if len(cells) != len(text) or any(glyph not in GLYPHS for glyph in text):
+            return False
+        for glyph, cell in zip(text, cells):
+            self.sums[glyph] = self.sums.get(glyph, 0) + cell
+            self.counts[glyph] = self.counts.get(glyph, 0) + 1
+        self._matrix = None
+        return True
+    
+    def matrix(self) -> Tuple[str, np.ndarray]:
+        """Known glyphs and their flattened templates (one row each)."""
+        if self._matrix is None:
+            glyphs = "".join(g for g in GLYPHS if g in self.counts)
+            rows = [(self.sums[g] / self.counts[g]).ravel() for g in glyphs]
+            self._matrix = (glyphs, np.array(rows, dtype=np.float32).reshape(len(glyphs), -1))
+        return self._matrix
+    
+    def save(self, path: Path):
+        """Save templates (learned sums and counts) to .npz."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        glyphs = "".join(g for g in GLYPHS if g in self.counts)
+        np.savez(
+            path,
+            glyphs=np.array(glyphs),
+            sums=np.array([self.sums[g] for g in glyphs], dtype=np.float32).reshape(len(glyphs), *GLYPH_SHAPE),
+            counts=np.array([self.counts[g] for g in glyphs], dtype=np.int64),
+        )
+    
+    @classmethod
+    def load(cls, path: Path) -> "GlyphTemplates":
+        """Load templates saved by save() (empty if the file doesn't exist)."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with np.load(path) as data:
+            glyphs = str(data["glyphs"])
+            if data["sums"].shape[1:] != GLYPH_SHAPE:
+                return cls()  # Saved with another cell size
+            sums = {g: data["sums"][i] for i, g in enumerate(glyphs)}
+            counts = {g: int(data["counts"][i]) for i, g in enumerate(glyphs)}
+        return cls(sums, counts)
+
+
+class GlyphReader:
+    """
+    Read the timer crop by matching glyph templates.
+    
+    Example:
+        reader = GlyphReader(GlyphTemplates.load(DEFAULT_TEMPLATES_PATH))
+        reading = reader.read(img)
+        if reading and reading.confidence >= MIN_CONFIDENCE: ...
+    """
+    
+    def __init__(self, templates: Optional[GlyphTemplates] = None):
+        self.templates = templates if templates is not None else GlyphTemplates()
+    
+    def read(self, img: np.ndarray) -> Optional[GlyphReading]:
+        """Matched text and confidence, or None (no text, or no templates yet)."""
+        if not self.templates:
+            return None
+        cells = segment(binarize(img))
+        if not len(cells):
+            return None
+        
+        glyphs, matrix = self.templates.matrix()
+        cells = cells.reshape(len(cells), -1)
+        
+        # Score = 1 - mismatched ink / total ink, for every (cell, template)
+        mismatch = np.abs(cells[:, None, :] - matrix[None, :, :]).sum(axis=2)
+        ink = cells.sum(axis=1)[:, None] + matrix.sum(axis=1)[None, :]
+        scores = 1.0 - mismatch / np.maximum(ink, 1.0)
+        best = scores.argmax(axis=1)
+        text = "".join(glyphs[i] for i in best)
+        confidence = float(scores[np.arange(len(best)), best].min())
+        return GlyphReading(text, confidence)
@@ -0,0 +1,50 @@
+"""
+Lazy Imports - Defer heavy optional backends until first use.
+
+pyautogui (GUI automation) and easyocr (which pulls in torch) take seconds
+to import and are only needed while recording. Modules that use them bind
+a LazyModule instead, so analysis-only code paths (batch workers, event
+prioritization, script generation) never pay for them - and still work on
+machines where those packages aren't installed.
+"""
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+    
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+    
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+    
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Return a module that is imported on first use.
+    
+    Example:
+        pyautogui = lazy_import("pyautogui")
+        pyautogui.press("p")  # Imported here
+    
+    Missing packages raise ImportError at first use instead of at import.
+    """
+    return LazyModule(name)
@@ -4,10 +4,16 @@ Minimap camera controller for SC2 replays.
 Controls camera by clicking on minimap to jump to different map locations.
 """
 
-import pyautogui
 import time
 from typing import Tuple, List
 
+try:
+    from .lazy_import import lazy_import
+except ImportError:
+    from lazy_import import lazy_import
+
+pyautogui = lazy_import("pyautogui")
+
 
 class MinimapCameraController:
     """Control SC2 camera by clicking on minimap."""
@@ -5,11 +5,17 @@ All hotkeys for controlling stats panels, camera, and UI during replay observati
 Source: https://liquipedia.net/starcraft2/Hotkeys
 """
 
-import pyautogui
 import time
 from enum import Enum
 from typing import Optional
 
+try:
+    from .lazy_import import lazy_import
+except ImportError:
+    from lazy_import import lazy_import
+
+pyautogui = lazy_import("pyautogui")
+
 
 class StatPanel(Enum):
     """Available statistics comparison panels."""
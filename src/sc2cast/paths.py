@@ -0,0 +1,27 @@
+"""
+Paths - Where sc2cast keeps data that outlives one run.
+
+Caches and learned data (analysis cache, load level memo, timer glyph
+templates) used to default to paths relative to the current directory, so
+running from anywhere but the repository root silently started over and
+left output/ folders behind. They now default to one per-user directory:
+
+- $SC2CAST_DATA_DIR, if set
+- %LOCALAPPDATA%\\sc2cast on Windows
+- $XDG_CACHE_HOME/sc2cast (~/.cache/sc2cast) elsewhere
+"""
+
+import os
+from pathlib import Path
+
+
+def data_dir() -> Path:
+    """Per-user directory for sc2cast's caches and learned data."""
+    override = os.environ.get("SC2CAST_DATA_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "sc2cast"
+
+
+DATA_DIR = data_dir()
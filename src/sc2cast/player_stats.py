@@ -0,0 +1,214 @@
+"""
+Player Stats - Per-player economy and army time series from PlayerStatsEvent.
+
+The tracker stream carries a PlayerStatsEvent for every player at a fixed
+interval (every 160 game loops, i.e. every 10 replay seconds): income,
+army value, supply, resources lost and killed. PlayerStats keeps them as
+one NumPy column per stat and player, at that native sample rate.
+
+- value_at(player, column, t): last sample at or before t - O(1) through a
+  precomputed per-second sample index
+- army_swings() / income_spikes() / supply_blocks(): vectorized detection
+  of economic moments worth showing a stat panel for
+- resources_lost(t0, t1, players): army resources players lost in a window,
+  used to score battles by what their participants actually lost
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# Column -> PlayerStatsEvent attributes summed into it
+STAT_COLUMNS = {
+    'minerals': ('minerals_current',),
+    'vespene': ('vespene_current',),
+    'mineral_income': ('minerals_collection_rate',),
+    'vespene_income': ('vespene_collection_rate',),
+    'workers': ('workers_active_count',),
+    'army_value': ('minerals_used_current_army', 'vespene_used_current_army'),
+    'army_lost': ('minerals_lost_army', 'vespene_lost_army'),
+    'army_killed': ('minerals_killed_army', 'vespene_killed_army'),
+    'resources_lost': ('minerals_lost', 'vespene_lost'),
+    'supply_used': ('food_used',),
+    'supply_made': ('food_made',),
+}
+
+MAX_SUPPLY = 200
+
+# Detection defaults
+ARMY_SWING_MIN_LOSS = 400       # Army resources lost within one sample
+INCOME_SPIKE_MIN_GAIN = 300     # Income (per minute) gained...
+INCOME_SPIKE_RATIO = 0.25       # ...and at least this fraction of the earlier income
+INCOME_SPIKE_SAMPLES = 3        # ...over this many samples
+
+
+def stats_record(event) -> Dict:
+    """Flat record (cacheable) from an sc2reader PlayerStatsEvent."""
+    record = {'timestamp': event.second, 'player': event.pid}
+    for column, attributes in STAT_COLUMNS.items():
+        record[column] = sum(getattr(event, attribute, 0) or 0 for attribute in attributes)
+    return record
+
+
+@dataclass
+class EconomicEvent:
+    """A moment in one player's economy worth a stat panel."""
+    time_seconds: int
+    player: int
+    kind: str           # "army_swing", "income_spike", "supply_block"
+    amount: float       # Resources lost / income gained / supply at the block
+    duration: int = 0   # Seconds (supply blocks)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+class PlayerSeries:
+    """One player's samples: sorted times plus one array per stat column."""
+    
+    def __init__(self, times: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.times = times
+        self.columns = columns
+        
+        # Sample interval (the last sample, at game end, is usually off-grid)
+        steps = np.diff(times)
+        self.step = int(np.median(steps)) if len(steps) else 0
+        
+        # Sample index for every second of the game: lookups are one array index
+        self._start = int(times[0]) if len(times) else 0
+        span = int(times[-1]) - self._start + 1 if len(times) else 0
+        self._index = np.searchsorted(times, self._start + np.arange(span), side='right') - 1
+    
+    def __len__(self):
+        return len(self.times)
+    
+    def index_at(self, t):
+        """Index of the last sample at or before t (-1 if none); t may be an array."""
+        offset = np.asarray(t, dtype=np.int64) - self._start
+        index = self._index[np.clip(offset, 0, max(len(self._index) - 1, 0))] if len(self._index) else np.full_like(offset, -1)
+        return np.where(offset < 0, -1, index)
+    
+    def value_at(self, column: str, t):
+        """Column value at time t (0 before the first sample); t may be an array."""
+        index = self.index_at(t)
+        values = self.columns[column]
+        return np.where(index >= 0, values[np.maximum(index, 0)], 0)
+
+
+class PlayerStats:
+    """
+    PlayerStatsEvent time series for every player in a replay.
+    
+    Example:
+        stats = extractor.player_stats
+        stats.value_at(1, 'army_value', 300)
+        for event in stats.economic_events(): ...
+    """
+    
+    def __init__(self, series: Optional[Dict[int, PlayerSeries]] = None):
+        self.series: Dict[int, PlayerSeries] = series or {}
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "PlayerStats":
+        """Build from stats_record() dicts (any order)."""
+        by_player: Dict[int, List[Dict]] = {}
+        for record in records:
+            by_player.setdefault(record['player'], []).append(record)
+        
+        series = {}
+        for player, rows in by_player.items():
+            rows.sort(key=lambda r: r['timestamp'])
+            times = np.array([r['timestamp'] for r in rows], dtype=np.int64)
+            columns = {c: np.array([r[c] for r in rows], dtype=np.float64) for c in STAT_COLUMNS}
+            series[player] = PlayerSeries(times, columns)
+        return cls(series)
+    
+    def to_records(self) -> List[Dict]:
+        """Flat records (round-trips through from_records, e.g. for the cache)."""
+        records = []
+        for player, series in self.series.items():
+            for i, t in enumerate(series.times):
+                record = {'timestamp': int(t), 'player': player}
+                record.update({c: float(values[i]) for c, values in series.columns.items()})
+                records.append(record)
+        return records
+    
+    def __bool__(self):
+        return bool(self.series)
+    
+    @property
+    def players(self) -> List[int]:
+        return sorted(self.series)
+    
+    def value_at(self, player: int, column: str, t):
+        """A player's stat at time t (last sample at or before t)."""
+        return self.series[player].value_at(column, t)
+    
+    def resources_lost(self, t0: int, t1: int, players: Optional[Iterable[int]] = None) -> int:
+        """
+        Army resources lost between t0 and t1 by the given players (all if None).
+        
+        Cumulative losses are only sampled every few seconds, so the window
+        is widened to the last sample before t0 and the first sample after t1.
+        Samples aren't per location: a player's losses elsewhere inside that
+        window are counted too. Passing a battle's participants keeps other
+        players' fights out, but two battles between the same players within
+        one sample interval each count both battles' losses.
+        """
+        total = 0.0
+        selected = self.series if players is None else {p: self.series[p] for p in players if p in self.series}
+        for series in selected.values():
+            lost = series.columns['army_lost']
+            start = int(series.index_at(t0 - 1))
+            end = min(int(series.index_at(t1)) + 1, len(series) - 1)
+            total += lost[end] - (lost[start] if start >= 0 else 0)
+        return int(total)
+    
+    def army_swings(self, min_loss: float = ARMY_SWING_MIN_LOSS) -> List[EconomicEvent]:
+        """Samples where a player lost at least min_loss army resources."""
+        events = []
+        for player, series in self.series.items():
+            losses = np.diff(series.columns['army_lost'], prepend=0)
+            for i in np.flatnonzero(losses >= min_loss):
+                events.append(EconomicEvent(int(series.times[i]), player, 'army_swing', float(losses[i])))
+        return events
+    
+    def income_spikes(self, min_gain: float = INCOME_SPIKE_MIN_GAIN, ratio: float = INCOME_SPIKE_RATIO,
+                      samples: int = INCOME_SPIKE_SAMPLES) -> List[EconomicEvent]:
+        """Where a player's income starts rising sharply (e.g. a new base saturating)."""
+        events = []
+        for player, series in self.series.items():
+            income = series.columns['mineral_income'] + series.columns['vespene_income']
+            if len(income) <= samples:
+                continue
+            earlier = income[:-samples]
+            gain = income[samples:] - earlier
+            spiking = (gain >= min_gain) & (gain >= ratio * earlier)
+            starts = np.flatnonzero(spiking & ~np.concatenate(([False], spiking[:-1])))
+            for i in starts:
+                events.append(EconomicEvent(int(series.times[i + samples]), player, 'income_spike', float(gain[i])))
+        return events
+    
+    def supply_blocks(self) -> List[EconomicEvent]:
+        """Stretches where a player's supply is capped below the maximum."""
+        events = []
+        for player, series in self.series.items():
+            used, made = series.columns['supply_used'], series.columns['supply_made']
+            blocked = (used >= made) & (made > 0) & (made < MAX_SUPPLY)
+            edges = np.diff(np.concatenate(([0], blocked.astype(np.int8), [0])))
+            starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            for start, end in zip(starts, ends):
+                events.append(EconomicEvent(
+                    int(series.times[start]), player, 'supply_block', float(made[start]),
+                    duration=int(series.times[end - 1] - series.times[start]) + series.step,
+                ))
+        return events
+    
+    def economic_events(self) -> List[EconomicEvent]:
+        """Army swings, income spikes and supply blocks of all players, by time."""
+        events = self.army_swings() + self.income_spikes() + self.supply_blocks()
+        events.sort(key=lambda e: (e.time_seconds, e.player))
+        return events
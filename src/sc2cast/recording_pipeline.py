@@ -6,23 +6,22 @@ Orchestrates: replay launch, clock sync, camera director, FFmpeg recording.
 
 import subprocess
 import time
+import warnings
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 import os
 import glob
 import sys
-
-# Add parent directory to path for imports
-if __name__ == "__main__":
-    sys.path.insert(0, str(Path(__file__).parent.parent))
+from functools import lru_cache
 
 from sc2cast.game_clock import GameClock
 from sc2cast.camera_director import CameraDirector
-from sc2cast import replay_parser
+from sc2cast.replay_session import ReplaySession
 
 
+@lru_cache(maxsize=None)
 def find_ffmpeg() -> Optional[Path]:
-    """Find FFmpeg executable."""
+    """Find FFmpeg executable (searched once per process)."""
     # Check WinGet packages directory
     winget_path = Path(os.path.expanduser("~")) / "AppData" / "Local" / "Microsoft" / "WinGet" / "Packages"
     
@@ -58,31 +57,43 @@ class RecordingPipeline:
     9. Stop recording
     """
     
-    def __init__(self, replay_path: Path, camera_script: List[Dict[str, Any]], output_path: Path, replay_speed: str = "normal"):
+    def __init__(self, replay: Union[ReplaySession, Path, None] = None, camera_script: Optional[List[Dict[str, Any]]] = None,
+                 output_path: Optional[Path] = None, replay_speed: str = "normal", replay_path: Optional[Path] = None):
         """
         Initialize recording pipeline.
         
         Args:
-            replay_path: Path to .SC2Replay file
+            replay: ReplaySession shared with earlier stages (or a .SC2Replay path)
             camera_script: Camera script (list of shot dicts)
             output_path: Output video file path
             replay_speed: Playback speed ("normal", "fast", "faster", "fastest")
+            replay_path: Deprecated name for replay (a .SC2Replay path)
         """
-        self.replay_path = replay_path
+        if replay_path is not None:
+            if replay is not None:
+                raise TypeError("RecordingPipeline() got both replay and replay_path")
+            warnings.warn("RecordingPipeline(replay_path=...) is deprecated, use replay=...", DeprecationWarning, stacklevel=2)
+            replay = replay_path
+        if replay is None or camera_script is None or output_path is None:
+            raise TypeError("RecordingPipeline() needs replay, camera_script and output_path")
+        
+        self.session = ReplaySession.of(replay)
+        self.replay_path = self.session.replay_path
         self.camera_script = camera_script
         self.output_path = output_path
         self.replay_speed = replay_speed
         
-        # Speed multipliers for clock sync
-        # NOTE: At high speeds, we rely on OCR more than timestamp correlation
-        # because the game can lag/pause during fast playback
+        # Expected game seconds per real second, for clock sync
+        # NOTE: Only a prior - the clock estimates the actual rate from the
+        # timer (the game can lag or pause during fast playback). Speeds
+        # set_replay_speed() has no key presses for stay at "Faster".
         self.speed_multipliers = {
-            "normal": 1.0,      # Slow motion
+            "normal": 1.0,      # No presses: stays at Faster
             "faster": 1.0,      # Real-time (default)
-            "fastest": 1.0,     # Use OCR-based timing
-            "fast_x2": 1.0,     # Use OCR-based timing
-            "fast_x4": 1.0,     # Use OCR-based timing
-            "fast_x8": 1.0,     # Use OCR-based timing
+            "fastest": 2.0,
+            "fast_x2": 4.0,
+            "fast_x4": 8.0,     # Max speed
+            "fast_x8": 1.0,     # No presses: stays at Faster
         }
         
         # Components
@@ -96,52 +107,28 @@ class RecordingPipeline:
     
     def parse_replay_metadata(self) -> bool:
         """
-        Parse replay file to get metadata (duration).
+        Get replay metadata (duration) from the session.
         
         Returns:
             True if successful
         """
         print("📋 Parsing replay metadata...")
         
-        # Hardcoded durations for known replays (parser has issues with these files)
-        if "4323200_changeling_Mike" in str(self.replay_path):
-            print("   ⚠️  Using hardcoded duration for demo replay")
-            self.replay_duration = 310  # 5:10 = 310 seconds
-            print(f"   Duration: 5:10 (310s)")
-            print(f"   Map: MagannathaAIE_v2")
-            return True
-        elif "4323395_Mike_SpeedlingBot" in str(self.replay_path):
-            print("   ⚠️  Using hardcoded duration for speedling replay")
-            self.replay_duration = 378  # 6:18 = 378 seconds
-            print(f"   Duration: 6:18 (378s)")
-            print(f"   Map: UltraloveAIE_v2")
-            return True
-        
         try:
-            metadata = replay_parser.parse_replay(self.replay_path)
-            
-            # Get duration in seconds
-            self.replay_duration = metadata.get("game_length_seconds", 0)
-            
-            # Fallback: parse from formatted string if seconds not available
-            if self.replay_duration == 0:
-                duration_str = metadata.get("game_length_formatted", "0:00")
-                if ":" in duration_str:
-                    parts = duration_str.split(":")
-                    self.replay_duration = int(parts[0]) * 60 + int(parts[1])
-            
-            if self.replay_duration == 0:
-                print("   ❌ Could not determine replay duration!")
-                return False
-            
-            print(f"   Duration: {metadata.get('game_length_formatted', f'{self.replay_duration//60}:{self.replay_duration%60:02d}')} ({self.replay_duration}s)")
-            print(f"   Map: {metadata.get('map_name', 'Unknown')}")
-            
-            return True
-        
+            metadata = self.session.metadata
         except Exception as e:
             print(f"❌ Failed to parse replay: {e}")
             return False
+        
+        self.replay_duration = self.session.duration
+        if self.replay_duration == 0:
+            print("   ❌ Could not determine replay duration!")
+            return False
+        
+        print(f"   Duration: {self.session.duration_formatted} ({self.replay_duration}s)")
+        print(f"   Map: {metadata.get('map_name', 'Unknown')}")
+        
+        return True
     
     def launch_replay(self) -> bool:
         """
@@ -328,6 +315,51 @@ class RecordingPipeline:
         print(f"      You may need to close SC2 manually")
         return False
     
+    def run_director_loop(self, poll_interval: float = 0.2) -> int:
+        """
+        Drive the camera director from the game clock until the replay ends.
+        
+        Args:
+            poll_interval: Seconds between director updates
+        
+        Returns:
+            Number of clock validations run
+        """
+        last_print = time.time()
+        validation_count = 0
+        
+        try:
+            while not self.clock.check_if_ended():
+                current_time = self.clock.get_game_time()
+                
+                # Update camera director
+                self.director.update(current_time)
+                
+                # Print status every 10 seconds
+                if time.time() - last_print >= 10.0:
+                    print(f"⏱️  {self.clock.get_current_game_time_formatted()} / {self.replay_duration//60}:{self.replay_duration%60:02d} | {self.director.get_progress()}")
+                    last_print = time.time()
+                
+                # Sync validation only reads the clock sampler's latest samples, so run it every second
+                if self.clock.should_validate_now(validation_interval=1.0):
+                    is_valid, drift = self.clock.validate_sync()
+                    validation_count += 1
+                    
+                    if drift is not None and not is_valid:
+                        estimate = self.clock.get_estimate()
+                        print(f"   ⚠️  Clock recalibrated (drift was: {drift}s, rate now {estimate.rate:.2f}x ± {estimate.uncertainty:.2f}s)")
+                
+                time.sleep(poll_interval)
+        
+        except KeyboardInterrupt:
+            print()
+            print("⚠️  Recording interrupted by user")
+        
+        finally:
+            self.clock.stop()
+        
+        return validation_count
+    
     def run(self) -> bool:
         """
         Run the complete recording pipeline.
@@ -349,7 +381,8 @@ class RecordingPipeline:
         # Step 2: Initialize components
         print("🔧 Initializing components...")
         speed_mult = self.speed_multipliers.get(self.replay_speed, 1.0)
-        self.clock = GameClock(replay_duration_seconds=self.replay_duration, speed_multiplier=speed_mult)
+        # The replay starts at the default speed; set_replay_speed() changes it after start
+        self.clock = GameClock(replay_duration_seconds=self.replay_duration, speed_multiplier=self.speed_multipliers["faster"])
         self.director = CameraDirector()
         self.director.load_script(self.camera_script)
         print(f"   Speed: {self.replay_speed} (multiplier: {speed_mult}x)")
@@ -375,11 +408,13 @@ class RecordingPipeline:
         
         # Step 4.5: Set replay speed (AFTER replay has started)
         self.set_replay_speed()
+        self.clock.set_expected_rate(speed_mult)
         time.sleep(2)  # Give SC2 time to adjust speed
         print()
         
         # Step 5: Start recording
         if not self.start_recording():
+            self.clock.stop()
             return False
         
         print()
@@ -388,35 +423,7 @@ class RecordingPipeline:
         print()
         
         # Step 6: Run camera director until replay ends
-        last_print = time.time()
-        validation_count = 0
-        
-        try:
-            while not self.clock.check_if_ended():
-                current_time = self.clock.get_current_game_time()
-                
-                # Update camera director
-                self.director.update(current_time)
-                
-                # Print status every 10 seconds
-                if time.time() - last_print >= 10.0:
-                    print(f"⏱️  {self.clock.get_current_game_time_formatted()} / {self.replay_duration//60}:{self.replay_duration%60:02d} | {self.director.get_progress()}")
-                    last_print = time.time()
-                
-                # Periodic sync validation (more frequent at high speeds)
-                validation_interval = 5.0 if self.replay_speed != "faster" else 15.0
-                if self.clock.should_validate_now(validation_interval=validation_interval):
-                    is_valid, drift = self.clock.validate_sync()
-                    validation_count += 1
-                    
-                    if drift is not None and not is_valid:
-                        print(f"   ⚠️  Clock recalibrated (drift was: {drift}s)")
-                
-                time.sleep(0.2)
-        
-        except KeyboardInterrupt:
-            print()
-            print("⚠️  Recording interrupted by user")
+        validation_count = self.run_director_loop()
         
         # Step 7: Stop recording
         print()
@@ -490,7 +497,7 @@ def main():
     
     # Run pipeline with Fast x4 speed (3x + presses = 8x speed)
     pipeline = RecordingPipeline(
-        replay_path=replay_path,
+        replay=ReplaySession(replay_path),
         camera_script=camera_script,
         output_path=output_path,
         replay_speed="fast_x4"  # Fast x4 (8x speed) for faster recording
@@ -0,0 +1,126 @@
+"""
+Replay Cache - Content-addressed on-disk cache for replay analysis.
+
+Parsing a replay through sc2reader is the largest fixed cost before recording.
+Entries are keyed by the replay file's content hash plus the extractor version,
+so recording the same replay again (e.g. while tuning the camera) skips
+sc2reader entirely. The cache is size-bounded with least-recently-used eviction.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+try:
+    from .paths import DATA_DIR
+except ImportError:
+    from paths import DATA_DIR
+
+
+DEFAULT_CACHE_DIR = DATA_DIR / "cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of replay contents already in memory."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_replay(replay_path) -> str:
+    """Return the SHA-256 hex digest of a replay file's contents."""
+    digest = hashlib.sha256()
+    with open(replay_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ReplayCache:
+    """
+    Persistent cache of extracted replay analysis.
+
+    Each entry is one JSON file named after its key. Reading an entry bumps its
+    modification time, so eviction (oldest mtime first) is least-recently-used.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_bytes: Total size budget; oldest entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key_for(self, replay_path, version: int, data: Optional[bytes] = None) -> str:
+        """Build the cache key for a replay file (or its contents) and extractor version."""
+        digest = hash_bytes(data) if data is not None else hash_replay(replay_path)
+        return f"{digest}-v{version}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cache entry.
+
+        Returns:
+            Cached data, or None on a miss (or unreadable entry)
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Corrupt or half-written entry - drop it and treat as a miss
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark as recently used
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: Dict[str, Any]):
+        """Store a cache entry, then evict old entries beyond the size budget."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(key)
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+        self._evict(keep=path)
+
+    def _evict(self, keep: Optional[Path] = None):
+        """Delete least-recently-used entries until under the size budget."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted concurrently
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove all cache entries."""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
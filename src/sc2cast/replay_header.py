@@ -0,0 +1,164 @@
+"""
+Replay Header Reader - Fast metadata without sc2reader's full load.
+
+Memory-maps the .SC2Replay MPQ archive and decodes only the user data header
+(build, game loops), replay.details (map, players) and replay.initData
+(map size, game speed). No event streams are touched, so this takes a few
+milliseconds per file and works on AI-arena replays that trip up
+sc2reader's load_level=2 player loading. Suitable for indexing thousands
+of files.
+"""
+
+import io
+import mmap
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Iterable, Iterator, Tuple, Optional
+
+import mpyq
+from sc2reader.decoders import BitPackedDecoder
+from sc2reader.readers import InitDataReader
+
+
+# Game loops per second at "Faster"; LotV (build 34784+) runs at 1.4x the old rate
+GAME_FPS = 16.0
+LOTV_BUILD = 34784
+
+RESULTS = {1: "Win", 2: "Loss", 3: "Tie"}
+CONTROL_HUMAN = 2
+
+# Windows FILETIME epoch offset (100ns intervals between 1601 and 1970)
+FILETIME_UNIX_OFFSET = 116444736000000000
+
+
+def game_loops_to_seconds(loops: int, build: int) -> int:
+    """Convert header game loops to game seconds (same rule as sc2reader)."""
+    fps = GAME_FPS * 1.4 if build >= LOTV_BUILD else GAME_FPS
+    return int(loops / fps)
+
+
+def _decode_header(header_content: bytes) -> Tuple[list, int]:
+    """Decode the user data header into (version numbers, game loops)."""
+    header = BitPackedDecoder(header_content).read_struct()
+    return list(header[1].values()), header[3]
+
+
+def read_build_numbers(data: bytes) -> Tuple[int, int]:
+    """Read (build, base_build) from replay file contents (header only)."""
+    archive = mpyq.MPQArchive(io.BytesIO(data), listfile=False)
+    versions, _ = _decode_header(archive.header["user_data_header"]["content"])
+    return versions[4], versions[5]
+
+
+def read_replay_metadata(replay_path) -> Dict[str, Any]:
+    """
+    Read replay metadata from the header, details and initData only.
+    
+    Args:
+        replay_path: Path to .SC2Replay file
+    
+    Returns:
+        dict with the same core keys as replay_parser.parse_replay
+        (map_name, game_length_seconds, game_length_formatted, date,
+        game_version, players) plus build, base_build, game_loops and map_size
+    """
+    with open(replay_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            archive = mpyq.MPQArchive(mm, listfile=False)
+            header_content = archive.header["user_data_header"]["content"]
+            details_data = archive.read_file("replay.details")
+            init_data = archive.read_file("replay.initData")
+    
+    # Header: version struct and game loop count
+    versions, game_loops = _decode_header(header_content)
+    build, base_build = versions[4], versions[5]
+    seconds = game_loops_to_seconds(game_loops, build)
+    
+    metadata = {
+        "file": str(replay_path),
+        "map_name": "Unknown",
+        "game_length_seconds": seconds,
+        "game_length_formatted": f"{seconds // 60}:{seconds % 60:02d}",
+        "game_loops": game_loops,
+        "date": None,
+        "game_version": "{}.{}.{}.{}".format(*versions[1:5]),
+        "build": build,
+        "base_build": base_build,
+        "map_size": None,
+        "game_speed": None,
+        "players": [],
+    }
+    
+    # Details: map name, players, file time (plain struct, no version quirks needed)
+    if details_data:
+        details = BitPackedDecoder(details_data).read_struct()
+        metadata["map_name"] = details[1].decode("utf8")
+        metadata["players"] = [
+            {
+                "name": p[0].decode("utf8"),
+                "race": p[2].decode("utf8"),
+                "result": RESULTS.get(p[8], "Unknown"),
+                "is_human": p[4] == CONTROL_HUMAN,
+            }
+            for p in details[0]
+            if p[7] == 0  # Skip observers
+        ]
+        
+        file_time, utc_adjustment = details[5], details[6]
+        if file_time:
+            unix_time = (file_time - utc_adjustment - FILETIME_UNIX_OFFSET) / 10**7
+            metadata["date"] = datetime.fromtimestamp(unix_time, tz=timezone.utc).replace(tzinfo=None).isoformat()
+    
+    # initData: map size and game speed (decoder only needs the build numbers)
+    if init_data:
+        version_info = SimpleNamespace(build=build, base_build=base_build, versions=versions)
+        game_description = InitDataReader()(init_data, version_info)["game_description"]
+        metadata["map_size"] = (game_description["map_size_x"], game_description["map_size_y"])
+        metadata["game_speed"] = game_description["game_speed"]
+    
+    return metadata
+
+
+def read_metadata_many(replay_paths: Iterable) -> Iterator[Tuple[Path, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Read metadata for many replays, one at a time.
+    
+    Yields:
+        (path, metadata, error) - metadata is None if the file couldn't be read
+    """
+    for replay_path in replay_paths:
+        try:
+            yield Path(replay_path), read_replay_metadata(replay_path), None
+        except Exception as e:
+            yield Path(replay_path), None, e
+
+
+def main():
+    """Read metadata for every replay in a directory and report timing."""
+    import sys
+    
+    replay_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "replays")
+    replay_paths = sorted(replay_dir.glob("*.SC2Replay"))
+    if not replay_paths:
+        print(f"❌ No replays found in: {replay_dir}")
+        return
+    
+    start = time.perf_counter()
+    failures = 0
+    for path, metadata, error in read_metadata_many(replay_paths):
+        if error:
+            failures += 1
+            print(f"  ❌ {path.name}: {error}")
+            continue
+        players = " vs ".join(f"{p['name']} ({p['race']})" for p in metadata["players"])
+        print(f"  {path.name}: {metadata['game_length_formatted']} on {metadata['map_name']} - {players} [build {metadata['build']}]")
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {len(replay_paths) - failures}/{len(replay_paths)} replays in {elapsed * 1000:.1f} ms "
+          f"({elapsed * 1000 / len(replay_paths):.2f} ms/file)")
+
+
+if __name__ == "__main__":
+    main()
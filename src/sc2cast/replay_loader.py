@@ -5,54 +5,135 @@ The replays we have are from AI matches and lack cache_handles data,
 which causes sc2reader to crash. This module provides a workaround.
 """
 
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
 import sc2reader
+from sc2reader import utils
 from sc2reader.resources import Replay
 import types
 
+try:
+    from .replay_cache import DEFAULT_CACHE_DIR
+    from .replay_header import read_build_numbers
+    from .tracker_events import iter_tracker_events
+except ImportError:
+    from replay_cache import DEFAULT_CACHE_DIR
+    from replay_header import read_build_numbers
+    from tracker_events import iter_tracker_events
+
+
+def _details_lack_cache_handles(replay) -> bool:
+    """True if the replay's details have no cache_handles (AI-arena replays)."""
+    details = replay.raw_data.get("replay.details") or replay.raw_data.get("replay.details.backup")
+    return details is not None and not details.get("cache_handles")
+
 
 def create_patched_load_details(original_method):
     """Create a patched version of load_details."""
     def patched_load_details(self):
-        """Call original but handle cache_handles error."""
+        """Call original, falling back only for replays without cache_handles."""
+        if not _details_lack_cache_handles(self):
+            return original_method(self)
         try:
             return original_method(self)
-        except IndexError as e:
-            if "cache_handles" in str(e) or "list index out of range" in str(e):
-                # Manually set default region for AI games
-                self.region = "unknown"
-                print("   ℹ️  Patched: Set region='unknown' (AI game)")
-            else:
-                raise
+        except IndexError:
+            # Manually set default region for AI games
+            self.region = "unknown"
+            print("   ℹ️  Patched: Set region='unknown' (AI game)")
     return patched_load_details
 
 
-# Apply the patch
-if hasattr(Replay, 'load_details'):
-    original_load_details = Replay.load_details
-    Replay.load_details = create_patched_load_details(original_load_details)
-    print("🔧 Applied sc2reader patch for cache_handles bug")
+def apply_sc2reader_patch():
+    """
+    Patch Replay.load_details for the cache_handles bug.
+    
+    Applied on first load rather than at import time, so importing this
+    module (e.g. in batch worker processes) has no side effects. Safe to
+    call repeatedly - the patch is only applied once per process.
+    """
+    if not hasattr(Replay, 'load_details'):
+        return
+    if getattr(Replay.load_details, '_sc2cast_patched', False):
+        return
+    
+    patched = create_patched_load_details(Replay.load_details)
+    patched._sc2cast_patched = True
+    Replay.load_details = patched
 
 
-def load_replay_safe(replay_path: str, load_level: int = 4):
+def load_tracker_only(replay_path: str):
+    """
+    Load replay details/init data plus the tracker event stream only.
+    
+    Loads at level 1 (header, details, initData) and decodes
+    replay.tracker.events directly, so message events, player loading (the
+    level 2 steps that break on AI-arena replays), game events and the
+    sc2reader engine plugins are all skipped. Tracker events carry
+    everything we extract (unit type names, pids, locations) in their own
+    fields, so none of that work is needed.
+    
+    Args:
+        replay_path: Path to .SC2Replay file
+        
+    Returns:
+        Replay object with `tracker_events` populated (`events` stays empty)
+    """
+    apply_sc2reader_patch()
+    replay = sc2reader.load_replay(
+        replay_path,
+        load_level=1,
+        load_map=False,
+        engine=None
+    )
+    
+    data = utils.extract_data_file("replay.tracker.events", replay.archive)
+    replay.tracker_events = list(iter_tracker_events(data, replay.build)) if data else []
+    
+    return replay
+
+
+def _replay_source(replay_path, data: Optional[bytes]):
+    """File name or, when the bytes are already in memory, a fresh buffer over them."""
+    if data is None:
+        return replay_path
+    buffer = io.BytesIO(data)
+    buffer.name = str(replay_path)  # sc2reader takes the replay's filename from here
+    return buffer
+
+
+def load_replay_safe(replay_path: str, load_level: int = 4, tracker_only: bool = False, data: Optional[bytes] = None):
     """
     Load replay with our patched version.
     
     Args:
         replay_path: Path to .SC2Replay file
         load_level: How much data to load (0-4)
+        tracker_only: Decode only details/init data and tracker events
+            (ignores load_level)
+        data: Replay file contents, if already read (skips reading the file)
         
     Returns:
         Replay object with events
     """
     print(f"📂 Loading replay: {replay_path}")
-    print(f"   Load level: {load_level}")
+    print(f"   Load level: {'tracker-only' if tracker_only else load_level}")
+    
+    apply_sc2reader_patch()
+    source = _replay_source(replay_path, data)
     
     try:
-        replay = sc2reader.load_replay(
-            replay_path,
-            load_level=load_level,
-            load_map=False
-        )
+        if tracker_only:
+            replay = load_tracker_only(source)
+        else:
+            replay = sc2reader.load_replay(
+                source,
+                load_level=load_level,
+                load_map=False
+            )
         print(f"✅ Replay loaded successfully!")
         print(f"   Duration: {replay.game_length}")
         print(f"   Region: {getattr(replay, 'region', 'N/A')}")
@@ -72,6 +153,134 @@ def load_replay_safe(replay_path: str, load_level: int = 4):
         raise
 
 
+# Load attempts from most to least complete; "tracker" is load_tracker_only
+LOAD_LADDER = ("tracker", 3, 2, 0)
+
+# The memo lives in a cache directory, in a subdirectory so the cache's
+# eviction and clear() (which glob *.json entries) leave it alone
+MEMO_FILE = Path("memo") / "load_levels.json"
+DEFAULT_MEMO_PATH = DEFAULT_CACHE_DIR / MEMO_FILE
+
+# A level is skipped for a build once it has failed this often and never worked
+SKIP_AFTER_FAILURES = 2
+
+
+class LoadLevelMemo:
+    """
+    Persistent record of which load levels work for each replay base build.
+    
+    Replays from the same client build fail the same way (e.g. AI-arena
+    replays whose player loading breaks at level 2+), so after a level has
+    failed repeatedly for a build - and never succeeded - later replays of
+    that build skip it. A level that fails on a single corrupt file is not
+    skipped, so one bad replay can't degrade every replay of its build.
+    """
+    
+    def __init__(self, path: Path = DEFAULT_MEMO_PATH):
+        """
+        Initialize memo.
+        
+        Args:
+            path: JSON file holding the memo (shared across runs and processes)
+        """
+        self.path = Path(path)
+        self.outcomes = self._read()
+    
+    def _read(self) -> Dict[str, Dict[str, List[int]]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def ladder_for(self, base_build) -> List[Union[str, int]]:
+        """Load levels worth attempting for a build, most complete first."""
+        outcomes = self.outcomes.get(str(base_build), {})
+        ladder = []
+        for level in LOAD_LADDER:
+            successes, failures = outcomes.get(str(level), (0, 0))
+            if successes == 0 and failures >= SKIP_AFTER_FAILURES:
+                continue
+            ladder.append(level)
+        # Never leave a build with nothing to try
+        return ladder or [LOAD_LADDER[-1]]
+    
+    def record(self, base_build, level, success: bool):
+        """Record one load attempt and persist the memo (if it adds anything)."""
+        known = self.outcomes.get(str(base_build), {}).get(str(level), (0, 0))
+        if success and known[0] > 0:
+            return  # Already known to work - nothing new to persist
+        
+        # Merge with the file first - other processes may have written to it
+        self.outcomes = self._read()
+        outcomes = self.outcomes.setdefault(str(base_build), {})
+        counts = outcomes.setdefault(str(level), [0, 0])
+        counts[0 if success else 1] += 1
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.outcomes, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def memo_for(cache_dir: Optional[Path]) -> Optional[LoadLevelMemo]:
+    """The load level memo kept in a cache directory (None: no cache, no memo)."""
+    return LoadLevelMemo(Path(cache_dir) / MEMO_FILE) if cache_dir else None
+
+
+def load_replay_ladder(replay_path, data: Optional[bytes] = None, memo: Optional[LoadLevelMemo] = None) -> Tuple[Replay, Union[str, int]]:
+    """
+    Load a replay at the most complete level that works.
+    
+    The file is read once and every attempt parses the same in-memory
+    bytes. With a memo, levels known to fail for the replay's build are
+    skipped without an attempt.
+    
+    Args:
+        replay_path: Path to .SC2Replay file
+        data: Replay file contents, if already read
+        memo: Optional LoadLevelMemo to consult and update
+    
+    Returns:
+        (replay, level) - level is an entry of LOAD_LADDER
+    """
+    if data is None:
+        data = Path(replay_path).read_bytes()
+    
+    base_build = None
+    ladder = list(LOAD_LADDER)
+    if memo is not None:
+        try:
+            _, base_build = read_build_numbers(data)
+            ladder = memo.ladder_for(base_build)
+        except Exception as e:
+            print(f"   ⚠️  Could not read replay build: {e}")
+    
+    skipped = [level for level in LOAD_LADDER if level not in ladder]
+    if skipped:
+        print(f"   ⏭️  Skipping load levels known to fail on build {base_build}: {skipped}")
+    
+    for i, level in enumerate(ladder):
+        last_attempt = i == len(ladder) - 1
+        try:
+            if level == "tracker":
+                replay = load_replay_safe(replay_path, load_level=3, tracker_only=True, data=data)
+            else:
+                replay = load_replay_safe(replay_path, load_level=level, data=data)
+        except Exception as e:
+            if base_build is not None:
+                memo.record(base_build, level, success=False)
+            if last_attempt:
+                raise
+            print(f"   ⚠️  Load level {level} failed: {e}")
+            continue
+        
+        if base_build is not None:
+            memo.record(base_build, level, success=True)
+        return replay, level
+
+
 def main():
     """Test the patched loader."""
     import sys
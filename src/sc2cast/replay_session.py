@@ -0,0 +1,120 @@
+"""
+Replay Session - One replay, parsed once, shared by every pipeline stage.
+
+The event-based flow used to load a replay through EventExtractor and then
+parse it again in RecordingPipeline for its duration (or fall back to
+hardcoded values). A ReplaySession owns the replay for a whole job:
+metadata comes from the header reader, events from a single extractor run
+(through the analysis cache), and every stage reads the same duration.
+Everything is computed on first access.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+try:
+    from .event_extractor import EventExtractor
+    from .event_store import EventStore
+    from .player_stats import PlayerStats
+    from .replay_cache import ReplayCache
+    from .replay_header import read_replay_metadata
+    from .replay_loader import LoadLevelMemo
+except ImportError:
+    from event_extractor import EventExtractor
+    from event_store import EventStore
+    from player_stats import PlayerStats
+    from replay_cache import ReplayCache
+    from replay_header import read_replay_metadata
+    from replay_loader import LoadLevelMemo
+
+
+class ReplaySession:
+    """
+    Lazily parsed replay shared across pipeline stages.
+    
+    Example:
+        session = ReplaySession(replay_path, cache=ReplayCache())
+        prioritizer.process_events(session.events)
+        RecordingPipeline(session, camera_script, output_path).run()
+    """
+    
+    def __init__(self, replay_path, cache: Optional[ReplayCache] = None, load_memo: Optional[LoadLevelMemo] = None):
+        """
+        Initialize session (nothing is read until first use).
+        
+        Args:
+            replay_path: Path to .SC2Replay file
+            cache: Optional analysis cache for extracted events
+            load_memo: Optional per-build load level memo
+        """
+        self.replay_path = Path(replay_path)
+        self.cache = cache
+        self.load_memo = load_memo
+        
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._extractor: Optional[EventExtractor] = None
+    
+    @classmethod
+    def of(cls, replay: Union["ReplaySession", str, Path]) -> "ReplaySession":
+        """Return replay itself if it is a session, else a new session for the path."""
+        if isinstance(replay, ReplaySession):
+            return replay
+        return cls(replay)
+    
+    @property
+    def extractor(self) -> EventExtractor:
+        """EventExtractor with events extracted (loads the replay on first access)."""
+        if self._extractor is None:
+            extractor = EventExtractor(self.replay_path, cache=self.cache, load_memo=self.load_memo)
+            extractor.load_replay()
+            extractor.extract_events()
+            self._extractor = extractor
+        return self._extractor
+    
+    @property
+    def events(self) -> EventStore:
+        """Extracted game events."""
+        return self.extractor.events
+    
+    @property
+    def player_stats(self) -> PlayerStats:
+        """Per-player economy and army time series."""
+        return self.extractor.player_stats
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Replay metadata (map, players, duration, build).
+        
+        Read from the replay header; if that fails, built from the
+        extractor's load so the replay is still parsed only once.
+        """
+        if self._metadata is None:
+            try:
+                self._metadata = read_replay_metadata(self.replay_path)
+            except Exception as e:
+                print(f"   ⚠️  Header read failed ({e}), using the full replay load...")
+                self._metadata = self._metadata_from_extractor()
+        return self._metadata
+    
+    def _metadata_from_extractor(self) -> Dict[str, Any]:
+        extractor = self.extractor
+        seconds = extractor.game_length_seconds or 0
+        replay = extractor.replay
+        return {
+            "file": str(self.replay_path),
+            "map_name": getattr(replay, "map_name", None) or "Unknown",
+            "game_length_seconds": seconds,
+            "game_length_formatted": f"{seconds // 60}:{seconds % 60:02d}",
+            "players": [],
+        }
+    
+    @property
+    def duration(self) -> int:
+        """Game length in seconds (0 if unknown) - the one value every stage uses."""
+        return self.metadata.get("game_length_seconds") or 0
+    
+    @property
+    def duration_formatted(self) -> str:
+        """Game length as M:SS."""
+        return f"{self.duration // 60}:{self.duration % 60:02d}"
@@ -6,13 +6,20 @@ Takes prioritized events and generates CameraShot sequences for the director.
 
 import json
 from pathlib import Path
-from typing import List, Dict, Any
-import sys
-
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from typing import List, Dict, Any, Optional
 
 from sc2cast.camera_director import CameraShot, ShotType
+from sc2cast.event_index import EventIndex
+from sc2cast.artifacts import ArtifactReader
+from sc2cast.player_stats import EconomicEvent
+
+
+# Stat panel for each kind of economic event
+ECONOMIC_PANELS = {
+    'income_spike': 'income',
+    'army_swing': 'units_lost',
+    'supply_block': 'production',
+}
 
 
 class ScriptGenerator:
@@ -21,14 +28,18 @@ class ScriptGenerator:
     def __init__(self):
         """Initialize script generator."""
         self.shots: List[CameraShot] = []
+        self.stat_panels_from_economy = False
     
-    def generate_from_events(self, prioritized_events: List[Dict], replay_duration: int) -> List[CameraShot]:
+    def generate_from_events(self, prioritized_events: List[Dict], replay_duration: int,
+                             economic_events: Optional[List[EconomicEvent]] = None) -> List[CameraShot]:
         """
         Generate camera script from prioritized events.
         
         Args:
             prioritized_events: List of events from event_prioritizer
             replay_duration: Total replay duration in seconds
+            economic_events: Optional PlayerStats.economic_events(); if given,
+                stat panels are timed to these instead of fixed offsets
             
         Returns:
             List of CameraShot objects ready for execution
@@ -36,6 +47,7 @@ class ScriptGenerator:
         print(f"🎬 Generating camera script from {len(prioritized_events)} events...")
         
         self.shots = []
+        self.stat_panels_from_economy = economic_events is not None
         
         # Add opening shot
         self._add_opening_shots()
@@ -44,6 +56,10 @@ class ScriptGenerator:
         for event in prioritized_events:
             self._process_event(event)
         
+        # Show stat panels when the economy actually moves
+        if economic_events is not None:
+            self._add_economic_shots(economic_events, replay_duration)
+        
         # Add periodic overview shots between events
         self._add_overview_shots(prioritized_events, replay_duration)
         
@@ -63,11 +79,12 @@ class ScriptGenerator:
         ))
         
         # Show income stats early
-        self.shots.append(CameraShot(
-            time_seconds=15,
-            shot_type=ShotType.STAT_PANEL,
-            params={'panel': 'income'}
-        ))
+        if not self.stat_panels_from_economy:
+            self.shots.append(CameraShot(
+                time_seconds=15,
+                shot_type=ShotType.STAT_PANEL,
+                params={'panel': 'income'}
+            ))
         
         # Switch to Player 2
         self.shots.append(CameraShot(
@@ -93,7 +110,8 @@ class ScriptGenerator:
             priority = event.get('priority', 'medium')
         
         # Add arrival buffer - move camera before event peaks
-        ARRIVAL_BUFFER = 3  # seconds before event
+        # (battle times are the densest moment of the fight, not its midpoint)
+        ARRIVAL_BUFFER = 2  # seconds before event
         arrival_time = max(5, event_time - ARRIVAL_BUFFER)
         
         if event_type == 'battle' and location:
@@ -109,7 +127,7 @@ class ScriptGenerator:
             ))
             
             # Show army stats during battle
-            if priority in ['high', 'medium']:
+            if priority in ['high', 'medium'] and not self.stat_panels_from_economy:
                 self.shots.append(CameraShot(
                     time_seconds=event_time,
                     shot_type=ShotType.STAT_PANEL,
@@ -129,11 +147,12 @@ class ScriptGenerator:
             ))
             
             # Show income stats for expansion
-            self.shots.append(CameraShot(
-                time_seconds=event_time + 2,
-                shot_type=ShotType.STAT_PANEL,
-                params={'panel': 'income'}
-            ))
+            if not self.stat_panels_from_economy:
+                self.shots.append(CameraShot(
+                    time_seconds=event_time + 2,
+                    shot_type=ShotType.STAT_PANEL,
+                    params={'panel': 'income'}
+                ))
         
         elif event_type == 'tech' and location:
             # For tech buildings, quick look
@@ -147,19 +166,31 @@ class ScriptGenerator:
                 }
             ))
     
+    def _add_economic_shots(self, economic_events: List[EconomicEvent], replay_duration: int):
+        """Add a stat panel at each economic event (income spike, army swing, supply block)."""
+        MIN_GAP = 15  # Minimum seconds between stat panels
+        
+        last_panel_time = None
+        for event in sorted(economic_events, key=lambda e: e.time_seconds):
+            panel = ECONOMIC_PANELS.get(event.kind)
+            if panel is None or not 5 <= event.time_seconds < replay_duration:
+                continue
+            if last_panel_time is not None and event.time_seconds - last_panel_time < MIN_GAP:
+                continue
+            
+            self.shots.append(CameraShot(
+                time_seconds=event.time_seconds,
+                shot_type=ShotType.STAT_PANEL,
+                params={'panel': panel}
+            ))
+            last_panel_time = event.time_seconds
+    
     def _add_overview_shots(self, events, replay_duration: int):
         """Add periodic player overview shots between events."""
         MIN_GAP = 20  # Minimum gap between events to add overview
         
-        # Get event times - handle both dict and object formats
-        event_times = []
-        for e in events:
-            if hasattr(e, 'time_seconds'):
-                event_times.append(e.time_seconds)
-            else:
-                event_times.append(e['time_seconds'])
-        
-        event_times = sorted(event_times)
+        # Event times in order (the index handles both dict and object formats)
+        event_times = EventIndex(events).starts.tolist()
         
         # Add player alternating shots in gaps
         current_player = 1
@@ -213,6 +244,25 @@ class ScriptGenerator:
             json.dump(output_data, f, indent=2)
         
         print(f"💾 Saved camera script to: {output_path}")
+    
+    @staticmethod
+    def load_script(script_path: Path) -> List[CameraShot]:
+        """Load a camera script from an analysis artifact (.npz) or a save_script JSON file."""
+        script_path = Path(script_path)
+        if script_path.suffix == '.npz':
+            shots = ArtifactReader(script_path).shots()
+        else:
+            with open(script_path, 'r', encoding='utf-8') as f:
+                shots = json.load(f)['shots']
+        
+        return [
+            CameraShot(
+                time_seconds=shot['time_seconds'],
+                shot_type=ShotType(shot['shot_type']),
+                params=shot['params']
+            )
+            for shot in shots
+        ]
 
 
 def main():
@@ -0,0 +1,231 @@
+"""
+Parameter Sweep - Tune battle clustering thresholds across a replay corpus.
+
+Usage:
+    poetry run python -m sc2cast.sweep replays/ --time-windows 20,30,45 --space-windows 15,20,30 --min-deaths 3,5 --high-deaths 10,15
+
+Events are extracted once per replay (through the analysis cache) and every
+setting in the grid is run on the same in-memory events, so a sweep costs
+one extraction per replay plus cheap prioritizer runs. Replays are processed
+in parallel. The result is a table of battle counts and coverage per setting:
+
+- battles: battles found across the corpus (and how many are high priority)
+- death coverage: share of army deaths that ended up in a battle
+- time coverage: share of game time spent inside a battle (simultaneous
+  battles in different places count once)
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sc2cast.event_extractor import EventExtractor
+from sc2cast.event_prioritizer import BattleEvent, BattleSettings, EventPrioritizer
+from sc2cast.event_store import EventStore
+from sc2cast.replay_cache import ReplayCache, DEFAULT_CACHE_DIR
+from sc2cast.replay_loader import memo_for
+from sc2cast.batch import find_replays
+
+
+SETTING_FIELDS = ["time_window", "space_window", "min_deaths", "high_value", "high_deaths", "medium_value", "medium_deaths"]
+
+
+def settings_grid(**axes: List) -> List[BattleSettings]:
+    """
+    Every combination of the given BattleSettings values.
+    
+    Example:
+        settings_grid(time_window=[20, 30], min_deaths=[3, 5])  # 4 settings
+    """
+    names = list(axes)
+    return [BattleSettings(**dict(zip(names, values))) for values in itertools.product(*axes.values())]
+
+
+def covered_seconds(battles: List[BattleEvent]) -> int:
+    """Seconds of game time inside at least one battle (overlapping battles count once)."""
+    total, covered_until = 0, float("-inf")
+    for start, end in sorted((b.start_time, b.end_time) for b in battles):
+        total += max(0, end - max(start, covered_until))
+        covered_until = max(covered_until, end)
+    return total
+
+
+def replay_metrics(events: EventStore, settings: BattleSettings, game_seconds: int) -> Dict[str, Any]:
+    """Run the prioritizer with one setting and measure its battles."""
+    prioritizer = EventPrioritizer(settings)
+    prioritizer.process_events(events)
+    
+    army_deaths = len(prioritizer.army_deaths(events[events.of_type('unit_died')]))
+    battle_deaths = sum(len(b.deaths) for b in prioritizer.battles)
+    battle_seconds = covered_seconds(prioritizer.battles)
+    
+    return {
+        "battles": len(prioritizer.battles),
+        "high_battles": sum(1 for b in prioritizer.battles if b.priority == "high"),
+        "army_deaths": army_deaths,
+        "battle_deaths": battle_deaths,
+        "battle_seconds": battle_seconds,
+        "game_seconds": game_seconds,
+    }
+
+
+def sweep_replay(replay_path: Path, grid: List[BattleSettings], cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> List[Dict[str, Any]]:
+    """
+    Extract one replay's events once and run every setting on them.
+    
+    Runs in a worker process; stage output is discarded.
+    
+    Returns:
+        One metrics dict per setting (same order as grid)
+    """
+    cache = ReplayCache(cache_dir) if cache_dir else None
+    
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        extractor = EventExtractor(replay_path, cache=cache, load_memo=memo_for(cache_dir))
+        extractor.load_replay()
+        extractor.extract_events()
+        
+        events = extractor.events
+        game_seconds = extractor.game_length_seconds or 0
+        return [replay_metrics(events, settings, game_seconds) for settings in grid]
+
+
+def summarize(grid: List[BattleSettings], per_replay: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Aggregate per-replay metrics into one table row per setting."""
+    rows = []
+    for i, settings in enumerate(grid):
+        metrics = [replay[i] for replay in per_replay]
+        total = {key: sum(m[key] for m in metrics) for key in metrics[0]} if metrics else {}
+        
+        row = {name: getattr(settings, name) for name in SETTING_FIELDS}
+        row.update({
+            "battles": total.get("battles", 0),
+            "high_battles": total.get("high_battles", 0),
+            "battles_per_replay": round(total.get("battles", 0) / len(metrics), 2) if metrics else 0.0,
+            "death_coverage": round(total["battle_deaths"] / total["army_deaths"], 3) if total.get("army_deaths") else 0.0,
+            "time_coverage": round(total["battle_seconds"] / total["game_seconds"], 3) if total.get("game_seconds") else 0.0,
+        })
+        rows.append(row)
+    return rows
+
+
+def run_sweep(replay_dir: Path, grid: List[BattleSettings], jobs: int = 1, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> List[Dict[str, Any]]:
+    """
+    Run a settings grid over every replay in a directory.
+    
+    Args:
+        replay_dir: Directory of .SC2Replay files
+        grid: Settings to evaluate
+        jobs: Number of worker processes
+        cache_dir: Analysis cache and load level memo directory (None disables both)
+    
+    Returns:
+        One table row per setting
+    """
+    replays = find_replays(replay_dir)
+    print(f"📂 {len(replays)} replays in {replay_dir}, {len(grid)} settings, {jobs} workers")
+    
+    start = time.perf_counter()
+    per_replay, failed = [], []
+    
+    if jobs <= 1:
+        for replay_path in replays:
+            try:
+                per_replay.append(sweep_replay(replay_path, grid, cache_dir))
+            except Exception as e:
+                failed.append(replay_path)
+                print(f"  ❌ {replay_path.name}: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(sweep_replay, r, grid, cache_dir): r for r in replays}
+            for future in as_completed(futures):
+                try:
+                    per_replay.append(future.result())
+                except Exception as e:
+                    failed.append(futures[future])
+                    print(f"  ❌ {futures[future].name}: {e}")
+    
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(per_replay)} replays x {len(grid)} settings in {elapsed:.2f}s ({len(failed)} failed)")
+    
+    return summarize(grid, per_replay)
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    """Print sweep results as an aligned table."""
+    columns = SETTING_FIELDS + ["battles", "high_battles", "battles_per_replay", "death_coverage", "time_coverage"]
+    headers = ["time", "space", "min", "high$", "high#", "med$", "med#", "battles", "high", "per replay", "death cov", "time cov"]
+    widths = [max(len(h), 7) for h in headers]
+    
+    print()
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in rows:
+        print("  ".join(str(row[c]).rjust(w) for c, w in zip(columns, widths)))
+
+
+def save_csv(rows: List[Dict[str, Any]], output_path: Path):
+    """Save sweep results to CSV."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else SETTING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"💾 Saved sweep results to: {output_path}")
+
+
+def _number_list(cast, positive: bool = False):
+    def parse(text: str) -> List:
+        values = [cast(value) for value in text.split(",") if value.strip()]
+        if positive and any(value <= 0 for value in values):
+            raise argparse.ArgumentTypeError(f"values must be positive: {text}")
+        return values
+    return parse
+
+
+def main(argv=None):
+    """Sweep battle settings over a replay directory."""
+    defaults = BattleSettings()
+    parser = argparse.ArgumentParser(description="Sweep battle clustering thresholds over a replay corpus")
+    parser.add_argument("replay_dir", type=Path, nargs="?", default=Path("replays"), help="Directory of .SC2Replay files")
+    parser.add_argument("--time-windows", type=_number_list(int, positive=True), default=[defaults.time_window], help="Comma-separated seconds")
+    parser.add_argument("--space-windows", type=_number_list(int, positive=True), default=[defaults.space_window], help="Comma-separated map units")
+    parser.add_argument("--min-deaths", type=_number_list(int), default=[defaults.min_deaths], help="Comma-separated death counts")
+    parser.add_argument("--high-values", type=_number_list(float), default=[defaults.high_value], help="Comma-separated army values")
+    parser.add_argument("--high-deaths", type=_number_list(int), default=[defaults.high_deaths], help="Comma-separated death counts")
+    parser.add_argument("--medium-values", type=_number_list(float), default=[defaults.medium_value], help="Comma-separated army values")
+    parser.add_argument("--medium-deaths", type=_number_list(int), default=[defaults.medium_deaths], help="Comma-separated death counts")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--out", type=Path, default=Path("output/sweep.csv"), help="CSV output path")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse replays")
+    args = parser.parse_args(argv)
+    
+    if not args.replay_dir.is_dir():
+        print(f"❌ Replay directory not found: {args.replay_dir}")
+        return 1
+    
+    grid = settings_grid(
+        time_window=args.time_windows,
+        space_window=args.space_windows,
+        min_deaths=args.min_deaths,
+        high_value=args.high_values,
+        high_deaths=args.high_deaths,
+        medium_value=args.medium_values,
+        medium_deaths=args.medium_deaths,
+    )
+    
+    rows = run_sweep(args.replay_dir, grid, jobs=args.jobs, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
+    print_table(rows)
+    save_csv(rows, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
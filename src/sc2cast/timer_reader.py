@@ -1,22 +1,146 @@
 """
-Robust game timer reader using EasyOCR with cleanup logic.
+Robust game timer reader: glyph templates first, EasyOCR with cleanup logic as fallback.
+
+The timer changes once per game second but is polled several times a second:
+a crop whose pixels haven't changed since the last read returns that reading
+from cache (see fingerprint()).
 """
 
 import re
-import pyautogui
+import time
+from dataclasses import dataclass, replace
 from pathlib import Path
-import easyocr
+from typing import Any, Dict, Optional
 import numpy as np
 
+try:
+    from .glyph_reader import DEFAULT_TEMPLATES_PATH, MIN_CONFIDENCE, GlyphReader, GlyphTemplates, binarize
+    from .lazy_import import lazy_import
+except ImportError:
+    from glyph_reader import DEFAULT_TEMPLATES_PATH, MIN_CONFIDENCE, GlyphReader, GlyphTemplates, binarize
+    from lazy_import import lazy_import
+
+# Heavy backends (easyocr imports torch) load on first use
+pyautogui = lazy_import("pyautogui")
+easyocr = lazy_import("easyocr")
+
+
+# Glyph samples learned per character from OCR reads (then templates are left alone)
+LEARN_SAMPLES = 20
+
+# Whole timer text (current / total), as OCR must read it to label glyphs
+TIMER_TEXT = re.compile(r'\d{1,2}:\d{2}(/\d{1,2}:\d{2})?')
+
+# EasyOCR paths: "readtext" (CRAFT text detection + recognizer) or
+# "recognize" (recognizer only, on the whole fixed timer crop). readtext is the
+# default until recognize is measured on real captures (measure_ocr_latency)
+OCR_MODES = ("readtext", "recognize")
+OCR_ALLOWLIST = "0123456789:/"
+RECOGNIZER_HEIGHT = 64  # EasyOCR's recognizer input height (imgH)
+
+# Pixel-change gate
+GATE_BLOCK = 5              # Fingerprint block size (pixels)
+GATE_THRESHOLD = 12.0       # Largest block mean change (gray levels) still "unchanged"
+GATE_MAX_AGE = 2.0          # Re-read an unchanged crop at least this often (seconds)
+
+
+def fingerprint(img: np.ndarray) -> np.ndarray:
+    """
+    Cheap crop fingerprint: mean brightness of GATE_BLOCK x GATE_BLOCK blocks.
+    
+    Two crops show the same text if no block mean differs by GATE_THRESHOLD
+    or more (a changed digit moves several blocks by far more; capture noise
+    averages out).
+    """
+    gray = img[..., 1] if img.ndim == 3 else img  # Green: the text is light in every channel
+    rows, cols = gray.shape[0] // GATE_BLOCK, gray.shape[1] // GATE_BLOCK
+    blocks = gray[:rows * GATE_BLOCK, :cols * GATE_BLOCK].reshape(rows, GATE_BLOCK, cols, GATE_BLOCK)
+    return blocks.sum(axis=(1, 3), dtype=np.int32) / (GATE_BLOCK * GATE_BLOCK)
+
+
+def preprocess_for_recognizer(img: np.ndarray) -> np.ndarray:
+    """
+    Timer crop as the recognizer's input: grayscale, thresholded to black
+    text on white, upscaled (nearest neighbour) to RECOGNIZER_HEIGHT.
+    """
+    text = binarize(img)
+    gray = np.where(text, 0, 255).astype(np.uint8)
+    scale = RECOGNIZER_HEIGHT / gray.shape[0]
+    rows = (np.arange(RECOGNIZER_HEIGHT) / scale).astype(np.int64)
+    cols = (np.arange(round(gray.shape[1] * scale)) / scale).astype(np.int64)
+    return gray[rows][:, cols]
+
+
+@dataclass
+class TimerReading:
+    """One timer read."""
+    clean_time: Optional[str]   # "MM:SS", or None if the text didn't parse
+    raw_text: str
+    confidence: float           # Glyph match score or OCR confidence (0-1)
+    source: str                 # "glyph" or "ocr"
+    cached: bool = False        # True: the crop was unchanged, this is the earlier read
+    since: float = 0.0          # time.monotonic() when this text was first read
+    
+    def extrapolated_seconds(self, now: Optional[float] = None, rate: float = 1.0) -> Optional[float]:
+        """
+        Game time now, assuming the game ran at rate since the text first appeared.
+        
+        Stays below the next displayed second (the crop would have changed).
+        """
+        seconds = GameTimerReader.time_to_seconds(self.clean_time)
+        if seconds is None:
+            return None
+        elapsed = (time.monotonic() if now is None else now) - self.since
+        return seconds + min(max(elapsed, 0.0) * rate, 0.999)
+
 
 class GameTimerReader:
-    """Read game timer from screen with OCR and cleanup."""
+    """Read game timer from screen with glyph templates (OCR fallback) and cleanup."""
+    
+    def __init__(self, templates_path: Optional[Path] = DEFAULT_TEMPLATES_PATH,
+                 min_confidence: float = MIN_CONFIDENCE, ocr_mode: str = "readtext", gate: bool = True):
+        """
+        Initialize reader.
+        
+        Args:
+            templates_path: Learned glyph templates (.npz, created on first use); None to not persist them
+            min_confidence: Glyph reads below this fall back to EasyOCR
+            ocr_mode: EasyOCR path for fallback reads (see OCR_MODES)
+            gate: Return the cached reading for crops whose pixels haven't changed
+        """
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode: {ocr_mode} (expected one of {', '.join(OCR_MODES)})")
+        self.ocr_mode = ocr_mode
+        self.templates_path = Path(templates_path) if templates_path else None
+        templates = GlyphTemplates.load(self.templates_path) if self.templates_path else GlyphTemplates()
+        self.glyph_reader = GlyphReader(templates)
+        self.min_confidence = min_confidence
+        
+        # Read counters by source
+        self.glyph_reads = 0
+        self.ocr_reads = 0
+        
+        # Pixel-change gate: last read crop's fingerprint and reading
+        self.gate = gate
+        self.gate_hits = 0
+        self.gate_misses = 0
+        self._last_fingerprint: Optional[np.ndarray] = None
+        self._last_reading: Optional[TimerReading] = None
+        self._last_read_time = 0.0
+        
+        # EasyOCR is only the fallback: load it now unless the templates cover every glyph
+        self._reader = None
+        if not templates.complete:
+            self.reader
     
-    def __init__(self):
-        """Initialize EasyOCR reader."""
-        print("🔧 Initializing OCR reader...")
-        self.reader = easyocr.Reader(['en'], gpu=False)
-        print("✅ OCR ready!")
+    @property
+    def reader(self):
+        """EasyOCR reader (initialized on first use)."""
+        if self._reader is None:
+            print("🔧 Initializing OCR reader...")
+            self._reader = easyocr.Reader(['en'], gpu=False)
+            print("✅ OCR ready!")
+        return self._reader
     
     def capture_timer(self):
         """Capture timer region (1572, 590, 200x25)."""
@@ -50,31 +174,144 @@ class GameTimerReader:
         
         return None
     
-    def read_timer(self):
+    def read(self, img: Optional[np.ndarray] = None) -> Optional[TimerReading]:
         """
-        Capture and read game timer.
+        Read game timer: glyph templates, or EasyOCR if they aren't confident.
         
+        Args:
+            img: Timer crop (captured if None)
+            
         Returns:
-            str: Time in "MM:SS" format, or None if read failed
+            TimerReading, or None if nothing was read
         """
-        # Capture screen
-        img = self.capture_timer()
+        if img is None:
+            img = self.capture_timer()
+        
+        now = time.monotonic()
+        if not self.gate:
+            self._last_reading = self._read_uncached(img, now)
+            return self._last_reading
+        
+        # Unchanged pixels: same text as the last read (no glyph matching or OCR)
+        current = fingerprint(img)
+        last = self._last_fingerprint
+        if (last is not None and last.shape == current.shape and now - self._last_read_time < GATE_MAX_AGE
+                and np.abs(current - last).max() < GATE_THRESHOLD):
+            self.gate_hits += 1
+            return replace(self._last_reading, cached=True) if self._last_reading else None
+        
+        self.gate_misses += 1
+        reading = self._read_uncached(img, now)
+        self._last_fingerprint = current
+        self._last_reading = reading
+        self._last_read_time = now
+        return reading
+    
+    def _read_uncached(self, img: np.ndarray, now: float) -> Optional[TimerReading]:
+        """Glyph templates, then OCR; since carries over while the text stays the same."""
+        reading = self._read_glyphs_or_ocr(img)
+        if reading is not None:
+            previous = self._last_reading
+            same_text = previous is not None and previous.clean_time == reading.clean_time
+            reading.since = previous.since if same_text else now
+        return reading
+    
+    @property
+    def gate_hit_rate(self) -> float:
+        """Fraction of reads answered from cache by the pixel-change gate."""
+        total = self.gate_hits + self.gate_misses
+        return self.gate_hits / total if total else 0.0
+    
+    def _read_glyphs_or_ocr(self, img: np.ndarray) -> Optional[TimerReading]:
+        glyphs = self.glyph_reader.read(img)
+        if glyphs and glyphs.confidence >= self.min_confidence:
+            clean_time = self.clean_time_string(glyphs.text)
+            if clean_time:
+                self.glyph_reads += 1
+                return TimerReading(clean_time, glyphs.text, glyphs.confidence, "glyph")
         
-        # OCR
-        results = self.reader.readtext(img, detail=0)
+        return self._read_ocr(img)
+    
+    def _read_ocr(self, img: np.ndarray) -> Optional[TimerReading]:
+        """EasyOCR fallback; clean reads also teach the glyph templates."""
+        self.ocr_reads += 1
+        results = self._ocr(img, self.ocr_mode)
         
         if not results:
             return None
         
         # Combine all text
-        raw_text = ' '.join(results)
+        raw_text = ' '.join(text for _, text, _ in results)
+        confidence = float(min(conf for _, _, conf in results))
         
         # Clean and parse
         clean_time = self.clean_time_string(raw_text)
         
-        return clean_time, raw_text
+        if clean_time:
+            self._learn(img, raw_text)
+        
+        return TimerReading(clean_time, raw_text, confidence, "ocr")
+    
+    def _ocr(self, img: np.ndarray, mode: str):
+        """EasyOCR results [(box, text, confidence), ...] through the given path."""
+        if mode == "recognize":
+            # The timer is the whole crop: skip detection, recognize one known box
+            gray = preprocess_for_recognizer(img)
+            height, width = gray.shape
+            return self.reader.recognize(
+                gray, horizontal_list=[[0, width, 0, height]], free_list=[],
+                allowlist=OCR_ALLOWLIST, detail=1,
+            )
+        return self.reader.readtext(img, detail=1)
+    
+    def measure_ocr_latency(self, img: Optional[np.ndarray] = None, repeats: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-read latency (ms) and text of every OCR path on the same crop.
+        
+        Returns:
+            {mode: {'ms': mean latency, 'text': last text read}}
+        """
+        if img is None:
+            img = self.capture_timer()
+        self._ocr(img, self.ocr_mode)  # Warm up (model load, first inference)
+        
+        latency = {}
+        for mode in OCR_MODES:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                results = self._ocr(img, mode)
+            latency[mode] = {
+                'ms': (time.perf_counter() - start) / repeats * 1000,
+                'text': ' '.join(text for _, text, _ in results),
+            }
+        return latency
+    
+    def _learn(self, img: np.ndarray, raw_text: str):
+        """Label the crop's glyphs with an OCR read that is exactly a timer."""
+        text = raw_text.replace(' ', '')
+        templates = self.glyph_reader.templates
+        if not TIMER_TEXT.fullmatch(text):
+            return
+        if all(templates.counts.get(glyph, 0) >= LEARN_SAMPLES for glyph in text):
+            return
+        if templates.learn(img, text) and self.templates_path:
+            templates.save(self.templates_path)
+    
+    def read_timer(self):
+        """
+        Capture and read game timer.
+        
+        Returns:
+            (clean_time, raw_text) - clean_time in "MM:SS" format (None if
+            unparseable) - or None if read failed
+        """
+        reading = self.read()
+        if reading is None:
+            return None
+        return reading.clean_time, reading.raw_text
     
-    def time_to_seconds(self, time_str):
+    @staticmethod
+    def time_to_seconds(time_str):
         """Convert MM:SS to total seconds."""
         if not time_str or ':' not in time_str:
             return None
@@ -90,7 +327,6 @@ class GameTimerReader:
 
 def main():
     """Test the timer reader."""
-    import time
     import subprocess
     
     replay_path = Path("replays/4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay")
@@ -114,13 +350,14 @@ def main():
     print("-" * 80)
     
     for i in range(10):
-        result = timer_reader.read_timer()
+        reading = timer_reader.read()
         
-        if result:
-            clean_time, raw_text = result
+        if reading:
+            clean_time, raw_text = reading.clean_time, reading.raw_text
             if clean_time:
                 seconds = timer_reader.time_to_seconds(clean_time)
-                print(f"Sample {i+1:2d} | Clean: {clean_time:>5s} | Seconds: {seconds:>3d} | Raw: {raw_text}")
+                print(f"Sample {i+1:2d} | Clean: {clean_time:>5s} | Seconds: {seconds:>3d} | Raw: {raw_text} "
+                      f"| {reading.source} ({reading.confidence:.2f})")
             else:
                 print(f"Sample {i+1:2d} | ⚠️  Parse failed | Raw: {raw_text}")
         else:
@@ -132,6 +369,13 @@ def main():
     print()
     print("=" * 80)
     print("✅ Test complete!")
+    print(f"   Glyph reads: {timer_reader.glyph_reads}, OCR reads: {timer_reader.ocr_reads}, "
+          f"unchanged crops: {timer_reader.gate_hits}/{timer_reader.gate_hits + timer_reader.gate_misses}")
+    print()
+    
+    print("⚡ OCR latency per read (same crop):")
+    for mode, result in timer_reader.measure_ocr_latency(repeats=10).items():
+        print(f"   {mode:10s} {result['ms']:7.1f} ms | {result['text']}")
     print()
     print("📋 Analysis:")
     print("   - Check if times increment correctly")
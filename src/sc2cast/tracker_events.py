@@ -0,0 +1,76 @@
+"""
+Tracker Events - Decode replay.tracker.events one event at a time.
+
+sc2reader's TrackerEventsReader decodes the whole stream into a list and has
+no way to skip event types, so this module walks the same framing itself.
+Each event is a versioned struct:
+
+    03 <choice> 09 <frame delta>   game loops since the previous event
+    09 <event type>                TrackerEventsReader.EVENT_DISPATCH key
+    <struct>                       event fields
+
+03 and 09 are the versioned encoding's choice and int tags. They are
+checked on every event: if sc2reader or the replay protocol ever frames
+events differently, decoding stops with an error instead of silently
+misreading the rest of the stream.
+"""
+
+from typing import Any, Collection, Iterator, Optional, Tuple
+
+from sc2reader.decoders import BitPackedDecoder
+from sc2reader.readers import TrackerEventsReader
+
+
+# Event type id -> sc2reader event class
+EVENT_CLASSES = TrackerEventsReader().EVENT_DISPATCH
+
+CHOICE_TAG = 0x03
+INT_TAG = 0x09
+
+
+def iter_tracker_records(data: bytes) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Undecoded tracker events: (frame, event type id, event struct).
+    
+    Raises:
+        ValueError: The stream isn't framed as expected
+    """
+    decoder = BitPackedDecoder(data)
+    frame = 0
+    while not decoder.done():
+        position = decoder.tell()
+        try:
+            head = decoder.read_aligned_bytes(3)
+            if head[0] != CHOICE_TAG or head[2] != INT_TAG:
+                raise ValueError(f"Unexpected tracker event header {head.hex()} at byte {position}")
+            frame += decoder.read_vint()
+            
+            if decoder.read_aligned_bytes(1)[0] != INT_TAG:
+                raise ValueError(f"Unexpected tracker event type tag at byte {decoder.tell() - 1}")
+            etype = decoder.read_vint()
+            event_data = decoder.read_struct()
+        except (IndexError, KeyError, TypeError) as e:
+            # The decoder ran off the end or into garbage
+            raise ValueError(f"Truncated or misframed tracker event at byte {position}: {e}") from e
+        yield frame, etype, event_data
+
+
+def iter_tracker_events(data: bytes, build: int, classes: Optional[Collection[type]] = None) -> Iterator:
+    """
+    sc2reader tracker event objects, one at a time.
+    
+    Args:
+        data: Decompressed replay.tracker.events
+        build: Replay build (event classes decode some fields per build)
+        classes: Only build events of these classes (others are decoded to
+            advance the stream, then dropped); None for all
+    
+    Example:
+        for event in iter_tracker_events(data, replay.build, {UnitBornEvent}): ...
+    """
+    for frame, etype, event_data in iter_tracker_records(data):
+        event_class = EVENT_CLASSES.get(etype)
+        if event_class is None:
+            raise ValueError(f"Unknown tracker event type {etype} at frame {frame}")
+        if classes is None or event_class in classes:
+            yield event_class(frame, event_data, build)
@@ -0,0 +1,279 @@
+"""
+Unit Catalog - One table of what every unit and building is worth.
+
+EventExtractor and EventPrioritizer used to classify units separately, by
+substring chains over lowercased names ('hatchery' in name or 'lair' in
+name ...), which also let lookalikes through: a Lair or Hive counted as an
+expansion, a FactoryTechLab as a tech building. The catalog keys every
+known unit type by its normalized name and precomputes its category,
+army value, supply, cost and camera priorities, so classifying an event
+is one dict lookup (or one array index per EventStore name id).
+
+Categories:
+- army: combat units (value > 0 means they count towards battles)
+- worker: SCV, Probe, Drone
+- townhall: CommandCenter/Nexus/Hatchery (new bases, `is_expansion`) and
+  their in-place morphs (OrbitalCommand, PlanetaryFortress, Lair, Hive)
+- tech: buildings that unlock a tech path (`is_tech`)
+- production: other army production buildings
+- structure: remaining buildings
+- neutral: minerals, larva, eggs, ...
+- unknown: anything not in the catalog
+
+Camera priorities follow from the category and army value:
+- born: town halls and tech buildings high, production medium, rest low
+- died: town halls and army units worth 4+ high, other army medium, rest low
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class UnitInfo:
+    """Static facts about one unit type."""
+    name: str                   # Normalized name (catalog key)
+    race: str                   # "terran", "protoss", "zerg" or "neutral"
+    category: str               # See module docstring
+    value: float = 0            # Army value (rough supply/importance), 0 = not army
+    supply: float = 0
+    minerals: int = 0
+    gas: int = 0
+    is_expansion: bool = False  # Founds a new base
+    is_tech: bool = False       # Unlocks a tech path
+    
+    @property
+    def born_priority(self) -> str:
+        """Camera priority when this unit/building appears."""
+        if self.category in ("townhall", "tech"):
+            return "high"
+        if self.category == "production":
+            return "medium"
+        return "low"
+    
+    @property
+    def died_priority(self) -> str:
+        """Camera priority when this unit/building dies."""
+        if self.category == "townhall" or self.value >= 4:
+            return "high"
+        if self.value > 0:
+            return "medium"
+        return "low"
+
+
+def _army(race, value, supply, minerals, gas):
+    return dict(race=race, category="army", value=value, supply=supply, minerals=minerals, gas=gas)
+
+
+def _building(race, category, minerals, gas=0, **flags):
+    return dict(race=race, category=category, minerals=minerals, gas=gas, **flags)
+
+
+# Normalized name -> facts (costs are totals, including morphed-from units)
+_UNITS: Dict[str, dict] = {
+    # Terran army
+    'marine': _army("terran", 1, 1, 50, 0),
+    'marauder': _army("terran", 2, 2, 100, 25),
+    'reaper': _army("terran", 1, 1, 50, 50),
+    'ghost': _army("terran", 2, 2, 150, 125),
+    'hellion': _army("terran", 2, 2, 100, 0),
+    'hellbat': _army("terran", 2, 2, 100, 0),
+    'widowmine': _army("terran", 2, 2, 75, 25),
+    'cyclone': _army("terran", 3, 3, 150, 100),
+    'siegetank': _army("terran", 3, 3, 150, 125),
+    'thor': _army("terran", 6, 6, 300, 200),
+    'viking': _army("terran", 2, 2, 150, 75),
+    'medivac': _army("terran", 2, 2, 100, 100),
+    'liberator': _army("terran", 3, 3, 150, 150),
+    'banshee': _army("terran", 3, 3, 150, 100),
+    'raven': _army("terran", 2, 2, 100, 150),
+    'battlecruiser': _army("terran", 6, 6, 400, 300),
+    
+    # Protoss army
+    'zealot': _army("protoss", 2, 2, 100, 0),
+    'stalker': _army("protoss", 2, 2, 125, 50),
+    'sentry': _army("protoss", 2, 2, 50, 100),
+    'adept': _army("protoss", 2, 2, 100, 25),
+    'hightemplar': _army("protoss", 2, 2, 50, 150),
+    'darktemplar': _army("protoss", 2, 2, 125, 125),
+    'archon': _army("protoss", 4, 4, 100, 300),
+    'immortal': _army("protoss", 4, 4, 275, 100),
+    'colossus': _army("protoss", 6, 6, 300, 200),
+    'disruptor': _army("protoss", 3, 3, 150, 150),
+    'phoenix': _army("protoss", 2, 2, 150, 100),
+    'voidray': _army("protoss", 4, 4, 250, 150),
+    'oracle': _army("protoss", 3, 3, 150, 150),
+    'tempest': _army("protoss", 5, 5, 250, 175),
+    'carrier': _army("protoss", 6, 6, 350, 250),
+    'mothership': _army("protoss", 8, 8, 400, 400),
+    'observer': _army("protoss", 1, 1, 25, 75),
+    'warpprism': _army("protoss", 2, 2, 250, 0),
+    
+    # Zerg army
+    'zergling': _army("zerg", 0.5, 0.5, 25, 0),
+    'baneling': _army("zerg", 0.5, 0.5, 50, 25),
+    'roach': _army("zerg", 2, 2, 75, 25),
+    'ravager': _army("zerg", 3, 3, 100, 100),
+    'hydralisk': _army("zerg", 2, 2, 100, 50),
+    'lurker': _army("zerg", 3, 3, 150, 150),
+    'infestor': _army("zerg", 2, 2, 100, 150),
+    'swarmhost': _army("zerg", 3, 3, 100, 75),
+    'ultralisk': _army("zerg", 6, 6, 275, 200),
+    'mutalisk': _army("zerg", 2, 2, 100, 100),
+    'corruptor': _army("zerg", 2, 2, 150, 100),
+    'viper': _army("zerg", 3, 3, 100, 200),
+    'broodlord': _army("zerg", 4, 4, 300, 250),
+    'queen': _army("zerg", 2, 2, 150, 0),
+    'overlord': dict(race="zerg", category="army", minerals=100),
+    'overseer': dict(race="zerg", category="army", minerals=150, gas=50),
+    
+    # Workers
+    'scv': dict(race="terran", category="worker", supply=1, minerals=50),
+    'probe': dict(race="protoss", category="worker", supply=1, minerals=50),
+    'drone': dict(race="zerg", category="worker", supply=1, minerals=50),
+    
+    # Town halls (only the founding building is an expansion)
+    'commandcenter': _building("terran", "townhall", 400, is_expansion=True),
+    'orbitalcommand': _building("terran", "townhall", 550),
+    'planetaryfortress': _building("terran", "townhall", 550, 150),
+    'nexus': _building("protoss", "townhall", 400, is_expansion=True),
+    'hatchery': _building("zerg", "townhall", 300, is_expansion=True),
+    'lair': _building("zerg", "townhall", 450, 100),
+    'hive': _building("zerg", "townhall", 650, 250),
+    
+    # Tech paths
+    'factory': _building("terran", "tech", 150, 100, is_tech=True),
+    'starport': _building("terran", "tech", 150, 100, is_tech=True),
+    'fusioncore': _building("terran", "tech", 150, 150, is_tech=True),
+    'stargate': _building("protoss", "tech", 150, 150, is_tech=True),
+    'roboticsfacility': _building("protoss", "tech", 150, 100, is_tech=True),
+    'roboticsbay': _building("protoss", "tech", 150, 150, is_tech=True),
+    'fleetbeacon': _building("protoss", "tech", 300, 200, is_tech=True),
+    'templararchive': _building("protoss", "tech", 150, 200, is_tech=True),
+    'spire': _building("zerg", "tech", 200, 200, is_tech=True),
+    'greaterspire': _building("zerg", "tech", 300, 350, is_tech=True),
+    
+    # Production
+    'barracks': _building("terran", "production", 150),
+    'gateway': _building("protoss", "production", 150),
+    'warpgate': _building("protoss", "production", 150),
+    'spawningpool': _building("zerg", "production", 200),
+    'roachwarren': _building("zerg", "production", 150),
+    'hydraliskden': _building("zerg", "production", 100, 100),
+    
+    # Other buildings
+    'supplydepot': _building("terran", "structure", 100),
+    'refinery': _building("terran", "structure", 75),
+    'engineeringbay': _building("terran", "structure", 125),
+    'bunker': _building("terran", "structure", 100),
+    'missileturret': _building("terran", "structure", 100),
+    'barrackstechlab': _building("terran", "structure", 50, 25),
+    'factorytechlab': _building("terran", "structure", 50, 25),
+    'starporttechlab': _building("terran", "structure", 50, 25),
+    'barracksreactor': _building("terran", "structure", 50, 50),
+    'factoryreactor': _building("terran", "structure", 50, 50),
+    'starportreactor': _building("terran", "structure", 50, 50),
+    'pylon': _building("protoss", "structure", 100),
+    'assimilator': _building("protoss", "structure", 75),
+    'forge': _building("protoss", "structure", 150),
+    'cyberneticscore': _building("protoss", "structure", 150),
+    'twilightcouncil': _building("protoss", "structure", 150, 100),
+    'photoncannon': _building("protoss", "structure", 150),
+    'shieldbattery': _building("protoss", "structure", 100),
+    'extractor': _building("zerg", "structure", 25),
+    'evolutionchamber': _building("zerg", "structure", 75),
+    'banelingnest': _building("zerg", "structure", 100, 50),
+    'spinecrawler': _building("zerg", "structure", 100),
+    'sporecrawler': _building("zerg", "structure", 75),
+    'infestationpit': _building("zerg", "structure", 100, 100),
+    'ultraliskcavern': _building("zerg", "structure", 150, 200),
+    
+    # Noise
+    'larva': dict(race="zerg", category="neutral"),
+    'egg': dict(race="zerg", category="neutral"),
+    'banelingcocoon': dict(race="zerg", category="neutral"),
+    'broodlordcocoon': dict(race="zerg", category="neutral"),
+    'ravagercocoon': dict(race="zerg", category="neutral"),
+    'lurkermpegg': dict(race="zerg", category="neutral"),
+    'creeptumor': dict(race="zerg", category="neutral"),
+    'mineralfield': dict(race="neutral", category="neutral"),
+    'mineralfield750': dict(race="neutral", category="neutral"),
+    'labmineralfield': dict(race="neutral", category="neutral"),
+    'labmineralfield750': dict(race="neutral", category="neutral"),
+    'richmineralfield': dict(race="neutral", category="neutral"),
+    'richmineralfield750': dict(race="neutral", category="neutral"),
+    'vespenegeyser': dict(race="neutral", category="neutral"),
+}
+
+# Mode/state variants sc2reader reports under their own type names
+_ALIASES = {
+    'siegetanksieged': 'siegetank',
+    'vikingfighter': 'viking',
+    'vikingassault': 'viking',
+    'helliontank': 'hellbat',
+    'liberatorag': 'liberator',
+    'thorap': 'thor',
+    'cycloneburrowed': 'cyclone',
+    'observersiegemode': 'observer',
+    'overseersiegemode': 'overseer',
+    'warpprismphasing': 'warpprism',
+    'lurkermp': 'lurker',
+    'swarmhostmp': 'swarmhost',
+    'swarmhostburrowedmp': 'swarmhost',
+    'adeptphaseshift': 'adept',
+    'commandcenterflying': 'commandcenter',
+    'orbitalcommandflying': 'orbitalcommand',
+    'barracksflying': 'barracks',
+    'factoryflying': 'factory',
+    'starportflying': 'starport',
+    'supplydepotlowered': 'supplydepot',
+    'spinecrawleruprooted': 'spinecrawler',
+    'sporecrawleruprooted': 'sporecrawler',
+}
+
+CATALOG: Dict[str, UnitInfo] = {name: UnitInfo(name=name, **facts) for name, facts in _UNITS.items()}
+
+
+@lru_cache(maxsize=None)
+def normalize(name: str) -> str:
+    """Catalog key for a unit type name ('SiegeTankSieged' -> 'siegetank')."""
+    key = name.lower().replace(" ", "")
+    if key.endswith("burrowed") and key not in _ALIASES:
+        key = key[:-len("burrowed")]
+    return _ALIASES.get(key, key)
+
+
+@lru_cache(maxsize=None)
+def lookup(name: str) -> UnitInfo:
+    """Catalog entry for a unit type name (category 'unknown' if not listed)."""
+    key = normalize(name)
+    info = CATALOG.get(key)
+    if info is None:
+        info = UnitInfo(name=key, race="neutral", category="unknown")
+    return info
+
+
+def column(store, field: str, dtype=float) -> np.ndarray:
+    """
+    Per-event catalog field for an EventStore (looked up once per interned name).
+    
+    Example:
+        values = column(deaths, "value")
+        is_tech = column(births, "is_tech", dtype=bool)
+    """
+    per_name = store.name_lookup(lambda name: getattr(lookup(name), field), dtype=dtype)
+    return per_name[store.name_ids]
+
+
+@lru_cache(maxsize=None)
+def upgrade_priority(name: str) -> str:
+    """Camera priority of a completed upgrade."""
+    key = name.lower()
+    if 'spray' in key:  # Spray decals
+        return "low"
+    if any(x in key for x in ['speed', 'attack', 'armor', 'range']):
+        return "medium"
+    return "low"
@@ -0,0 +1,340 @@
+"""
+Watch Mode - Analyze replays as they arrive in a folder.
+
+Usage:
+    poetry run python -m sc2cast.watch replays/ --out output/batch --jobs 4
+
+New .SC2Replay files are detected with inotify (Linux) or, where that
+isn't available, by polling the directory. A file is only analyzed once it
+has stopped changing for --settle seconds, so replays still being copied
+aren't picked up half-written. Settled files run through the batch
+analysis (extract → prioritize → camera script) on a bounded process pool:
+at most --max-pending replays are in flight, later arrivals wait in a
+queue instead of piling up work in the pool. The waiting queue needs no
+bound of its own: it holds paths, never the same path twice, so it is at
+most one entry per replay in the directory.
+
+A replay overwritten under the same name is analyzed again (the batch
+summary records its content hash), including one overwritten while its
+analysis is running.
+
+Artifacts land in the same per-replay directories as sc2cast.batch, so
+EventBasedPipeline(..., artifacts_dir=...) can start recording straight
+from a prepared camera script.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from sc2cast.batch import analyze_replay, find_replays, is_done
+from sc2cast.replay_cache import DEFAULT_CACHE_DIR
+
+
+REPLAY_SUFFIX = ".SC2Replay"
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class PollingWatcher:
+    """Detect new or changed replays by rescanning the directory."""
+    
+    def __init__(self, replay_dir: Path, interval: float = 2.0):
+        self.replay_dir = replay_dir
+        self.interval = interval
+        self._seen: Dict[Path, Tuple[int, float]] = {}
+        self._next_scan = 0.0
+    
+    def changes(self, timeout: float) -> Set[Path]:
+        """Replays that appeared or changed since the last call (waits up to timeout)."""
+        delay = self._next_scan - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            if delay > timeout:
+                return set()
+        self._next_scan = time.monotonic() + self.interval
+        
+        changed = set()
+        current = {}
+        for path in find_replays(self.replay_dir):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            current[path] = (stat.st_size, stat.st_mtime)
+            if self._seen.get(path) != current[path]:
+                changed.add(path)
+        self._seen = current
+        return changed
+    
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detect new or changed replays through Linux inotify (no polling)."""
+    
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    
+    def __init__(self, replay_dir: Path):
+        """Raises OSError where inotify isn't available."""
+        self.replay_dir = replay_dir
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+        
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(replay_dir), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {replay_dir}")
+    
+    def changes(self, timeout: float) -> Set[Path]:
+        """Replays written, created or moved in (waits up to timeout)."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        
+        changed = set()
+        try:
+            while True:
+                buffer = os.read(self.fd, 64 * 1024)
+                offset = 0
+                while offset < len(buffer):
+                    _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                    offset += EVENT_HEADER.size
+                    name = buffer[offset:offset + length].rstrip(b"\0")
+                    offset += length
+                    if mask & IN_Q_OVERFLOW:
+                        # Kernel queue overflowed: fall back to a full scan
+                        changed.update(find_replays(self.replay_dir))
+                    elif name.endswith(os.fsencode(REPLAY_SUFFIX)):
+                        changed.add(self.replay_dir / os.fsdecode(name))
+        except BlockingIOError:
+            pass
+        return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(replay_dir: Path, poll_interval: float = 2.0, use_inotify: bool = True):
+    """inotify watcher where available, polling otherwise."""
+    if use_inotify:
+        try:
+            return InotifyWatcher(replay_dir)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), polling every {poll_interval}s")
+    return PollingWatcher(replay_dir, poll_interval)
+
+
+class Debouncer:
+    """
+    Hold files until they stop changing.
+    
+    A file is settled once two consecutive checks see the same size and
+    mtime and it was last modified at least settle_seconds ago.
+    """
+    
+    def __init__(self, settle_seconds: float = 2.0):
+        self.settle_seconds = settle_seconds
+        self._pending: Dict[Path, Optional[Tuple[int, float]]] = {}
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    def touch(self, path: Path):
+        """A file was created or written."""
+        self._pending[path] = None
+    
+    def settled(self, now: Optional[float] = None) -> Set[Path]:
+        """Remove and return the files that stopped changing."""
+        now = time.time() if now is None else now
+        ready = set()
+        for path, previous in list(self._pending.items()):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                del self._pending[path]  # Moved away or deleted mid-write
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            if signature == previous and stat.st_size > 0 and now - stat.st_mtime >= self.settle_seconds:
+                ready.add(path)
+                del self._pending[path]
+            else:
+                self._pending[path] = signature
+        return ready
+
+
+class WatchDaemon:
+    """
+    Watch a replay directory and analyze settled replays on a bounded pool.
+    
+    Example:
+        WatchDaemon(Path("replays"), Path("output/batch"), jobs=4).run()
+    """
+    
+    def __init__(self, replay_dir: Path, out_dir: Path, jobs: int = 2, max_pending: Optional[int] = None,
+                 settle_seconds: float = 2.0, poll_interval: float = 2.0, use_inotify: bool = True,
+                 cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
+        """
+        Initialize daemon.
+        
+        Args:
+            replay_dir: Directory to watch
+            out_dir: Artifact directory (same layout as sc2cast.batch)
+            jobs: Worker processes
+            max_pending: Replays submitted to the pool at once (default 2 x jobs)
+            settle_seconds: How long a file must be unchanged before analysis
+            poll_interval: Directory scan interval when polling
+            use_inotify: Try inotify before falling back to polling
+            cache_dir: Analysis cache and load level memo directory (None disables both)
+        """
+        self.replay_dir = replay_dir
+        self.out_dir = out_dir
+        self.jobs = jobs
+        self.max_pending = max_pending or 2 * jobs
+        self.cache_dir = cache_dir
+        
+        self.watcher = make_watcher(replay_dir, poll_interval, use_inotify)
+        self.debouncer = Debouncer(settle_seconds)
+        self.queue: deque = deque()  # Settled replays waiting for a worker (each path at most once)
+        self._queued: Set[Path] = set()
+        self.in_flight: Dict = {}    # future -> replay path
+        self.stats = {"analyzed": 0, "failed": 0, "skipped": 0}
+    
+    def _enqueue(self, path: Path):
+        if path in self._queued:
+            return
+        if path in self.in_flight.values():
+            # Written again while being analyzed: look again once that job is done
+            self.debouncer.touch(path)
+            return
+        if is_done(path, self.out_dir):
+            self.stats["skipped"] += 1
+            return
+        self.queue.append(path)
+        self._queued.add(path)
+    
+    def _submit(self, pool: ProcessPoolExecutor):
+        """Fill free pool slots from the queue (the rest waits: backpressure)."""
+        while self.queue and len(self.in_flight) < self.max_pending:
+            path = self.queue.popleft()
+            self._queued.discard(path)
+            self.in_flight[pool.submit(analyze_replay, path, self.out_dir, self.cache_dir)] = path
+    
+    def _collect(self, timeout: float):
+        """Report finished jobs (waits up to timeout for one)."""
+        if not self.in_flight:
+            return
+        done, _ = wait(self.in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            path = self.in_flight.pop(future)
+            try:
+                summary = future.result()
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"  ❌ {path.name}: {e}")
+                continue
+            self.stats["analyzed"] += 1
+            print(f"  ✅ {path.name}: {summary['battles']} battles, {summary['camera_shots']} shots "
+                  f"({summary['seconds']:.2f}s) - {len(self.queue)} queued")
+    
+    @property
+    def idle(self) -> bool:
+        return not (len(self.debouncer) or self.queue or self.in_flight)
+    
+    def run(self, exit_when_idle: bool = False, tick: float = 0.5):
+        """
+        Watch until interrupted (or until idle, with exit_when_idle).
+        
+        Replays already in the directory without artifacts are analyzed first.
+        """
+        print(f"👀 Watching {self.replay_dir} ({type(self.watcher).__name__}, {self.jobs} workers, "
+              f"{self.max_pending} in flight max)")
+        for path in find_replays(self.replay_dir):
+            if is_done(path, self.out_dir):
+                self.stats["skipped"] += 1
+            else:
+                self.debouncer.touch(path)
+        
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        pool = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            while True:
+                # Don't block on the watcher while jobs are running or files are settling
+                busy = self.in_flight or len(self.debouncer)
+                for path in self.watcher.changes(timeout=0 if busy else tick):
+                    self.debouncer.touch(path)
+                for path in sorted(self.debouncer.settled()):
+                    self._enqueue(path)
+                self._submit(pool)
+                self._collect(timeout=tick if busy else 0)
+                
+                if exit_when_idle and self.idle:
+                    break
+                if len(self.debouncer) and not self.in_flight:
+                    time.sleep(tick)
+        except KeyboardInterrupt:
+            print("\n⏹️  Stopping (finishing running jobs)...")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.watcher.close()
+        
+        print(f"📊 Analyzed: {self.stats['analyzed']} | Already done: {self.stats['skipped']} | "
+              f"Failed: {self.stats['failed']}")
+        return self.stats
+
+
+def main(argv=None):
+    """Watch a replay directory and prepare artifacts for new replays."""
+    parser = argparse.ArgumentParser(description="Analyze replays as they arrive (extract → prioritize → camera script)")
+    parser.add_argument("replay_dir", type=Path, nargs="?", default=Path("replays"), help="Directory to watch")
+    parser.add_argument("--out", type=Path, default=Path("output/batch"), help="Artifact output directory")
+    parser.add_argument("--jobs", "-j", type=int, default=2, help="Worker processes")
+    parser.add_argument("--max-pending", type=int, help="Replays in flight at once (default 2 x jobs)")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a file must be unchanged before analysis")
+    parser.add_argument("--poll", type=float, default=2.0, help="Scan interval when inotify is unavailable")
+    parser.add_argument("--no-inotify", action="store_true", help="Always poll")
+    parser.add_argument("--once", action="store_true", help="Exit when nothing is left to analyze")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse replays")
+    args = parser.parse_args(argv)
+    
+    if not args.replay_dir.is_dir():
+        print(f"❌ Replay directory not found: {args.replay_dir}")
+        return 1
+    
+    daemon = WatchDaemon(
+        args.replay_dir, args.out, jobs=args.jobs, max_pending=args.max_pending,
+        settle_seconds=args.settle, poll_interval=args.poll, use_inotify=not args.no_inotify,
+        cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR,
+    )
+    stats = daemon.run(exit_when_idle=args.once)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
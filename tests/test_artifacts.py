@@ -0,0 +1,79 @@
+"""
+Binary analysis artifacts: lossless round trip and lazy, memory-mapped columns.
+
+Run: poetry run python -m pytest tests/test_artifacts.py
+"""
+
+import contextlib
+import io
+import random
+
+import numpy as np
+
+from sc2cast.artifacts import ArtifactReader, delta_decode, delta_encode, narrow, write_artifact
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.event_store import EventStore
+from sc2cast.script_generator import ScriptGenerator
+
+
+UNIT_NAMES = ['Marine', 'Stalker', 'Zergling', 'Roach', 'SCV', 'Hatchery', 'Nexus', 'Spire', 'Colossus']
+
+
+def random_events(count, seed=0):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        event_type = rng.choice(['unit_born', 'unit_died', 'unit_died', 'upgrade_complete'])
+        event = {
+            'timestamp': rng.randint(0, 900),
+            'type': event_type,
+            'player': rng.choice([1, 2, None] if event_type == 'unit_died' else [1, 2]),
+            'priority': rng.choice(['low', 'medium', 'high']),
+            'location': {'x': rng.randint(0, 60), 'y': rng.randint(0, 60)} if event_type != 'upgrade_complete' else None,
+        }
+        if event_type == 'unit_died':
+            event['owner'] = rng.choice([1, 2, None])
+        event['upgrade_name' if event_type == 'upgrade_complete' else 'unit_name'] = (
+            'ZerglingMovementSpeed' if event_type == 'upgrade_complete' else rng.choice(UNIT_NAMES)
+        )
+        events.append(event)
+    events.sort(key=lambda e: e['timestamp'])
+    return events
+
+
+def test_encoding_helpers():
+    values = [0, 5, 5, 300, 70000]
+    assert delta_decode(delta_encode(values)).tolist() == values
+    assert narrow([1, -3, 100]).dtype == np.int8
+    assert narrow([1, 40000]).dtype == np.int32
+
+
+def test_round_trip(tmp_path):
+    store = EventStore.from_records(random_events(3000))
+    prioritizer = EventPrioritizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(store)
+        generator = ScriptGenerator()
+        shots = generator.generate_from_events(prioritizer.all_priority_events, 900)
+    assert prioritizer.battles
+
+    path = tmp_path / "analysis.npz"
+    write_artifact(path, store, prioritizer, shots, meta={"replay_file": "game.SC2Replay"})
+    artifact = ArtifactReader(path)
+
+    assert isinstance(artifact.column("events.x"), np.memmap)
+    assert artifact.meta["replay_file"] == "game.SC2Replay"
+    assert artifact.meta["summary"]["battles"] == len(prioritizer.battles)
+    assert artifact.events().to_dicts() == store.to_dicts()
+    assert artifact.priority_events() == [e.to_dict() for e in prioritizer.all_priority_events]
+    assert artifact.battles() == [b.to_dict() for b in prioritizer.battles]
+    assert [(s.time_seconds, s.shot_type, s.params) for s in ScriptGenerator.load_script(path)] == \
+        [(s.time_seconds, s.shot_type, s.params) for s in shots]
+
+
+def test_partial_artifact(tmp_path):
+    path = tmp_path / "events_only.npz"
+    write_artifact(path, EventStore())
+    artifact = ArtifactReader(path)
+    assert len(artifact.events()) == 0
+    assert artifact.priority_events() == [] and artifact.battles() == [] and artifact.shots() == []
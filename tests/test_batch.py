@@ -0,0 +1,86 @@
+"""
+Batch analysis: per-replay artifacts, resume and failure handling.
+
+Run: poetry run python -m pytest tests/test_batch.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+from pathlib import Path
+
+from sc2cast.batch import SUMMARY_FILE, is_done, main, run_batch
+from sc2cast.replay_cache import hash_replay
+
+
+REPLAY = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+def quiet_batch(replay_dir, out_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return run_batch(replay_dir, out_dir, jobs=1, cache_dir=None, **kwargs)
+
+
+def test_overwritten_replay_is_analyzed_again(tmp_path):
+    replays, out = tmp_path / "replays", tmp_path / "out"
+    replays.mkdir()
+    replay = replays / "game.SC2Replay"
+    shutil.copy(REPLAY, replay)
+
+    assert quiet_batch(replays, out)["analyzed"] == 1
+    summary = json.loads((out / "game" / SUMMARY_FILE).read_text(encoding="utf-8"))
+    assert summary["hash"] == hash_replay(REPLAY)
+
+    # Touched but identical: still done
+    os.utime(replay, (0, 0))
+    assert is_done(replay, out)
+
+    # Different contents under the same name: not done any more
+    replay.write_bytes(b"not the replay that was analyzed")
+    assert not is_done(replay, out)
+    assert quiet_batch(replays, out)["skipped"] == 0
+
+
+def test_second_run_resumes(tmp_path):
+    replays, out = tmp_path / "replays", tmp_path / "out"
+    replays.mkdir()
+    shutil.copy(REPLAY, replays / "a.SC2Replay")
+
+    first = quiet_batch(replays, out)
+    assert (first["replays"], first["analyzed"], first["skipped"], first["failed"]) == (1, 1, 0, [])
+
+    summary = json.loads((out / "a" / SUMMARY_FILE).read_text(encoding="utf-8"))
+    assert summary["game_length_seconds"] == 310 and summary["battles"] == 1
+    assert summary["raw_events"] > 0 and summary["camera_shots"] > 0 and not summary["from_cache"]
+    assert (out / "a" / "analysis.npz").exists() and (out / "a" / "analysis.log").exists()
+
+    # A new replay arrives: only it is analyzed
+    shutil.copy(REPLAY, replays / "b.SC2Replay")
+    second = quiet_batch(replays, out, json_debug=True)
+    assert (second["replays"], second["analyzed"], second["skipped"]) == (2, 1, 1)
+    assert (out / "b" / "generated_camera_script.json").exists()
+
+    # A run that crashed before writing a's summary redoes a
+    (out / "a" / SUMMARY_FILE).unlink()
+    assert quiet_batch(replays, out)["analyzed"] == 1
+
+
+def test_failures_are_reported_not_fatal(tmp_path):
+    replays, out = tmp_path / "replays", tmp_path / "out"
+    replays.mkdir()
+    shutil.copy(REPLAY, replays / "good.SC2Replay")
+    (replays / "broken.SC2Replay").write_bytes(b"\0" * 64)
+
+    for jobs in (1, 2):  # In-process and worker-process error paths
+        shutil.rmtree(out, ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            result = run_batch(replays, out, jobs=jobs, cache_dir=None)
+        assert result["analyzed"] == 1
+        assert result["failed"] == [str(replays / "broken.SC2Replay")]
+        assert not is_done(replays / "broken.SC2Replay", out)
+
+    # The CLI exits non-zero when a replay failed
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        assert main([str(replays), "--out", str(out), "--jobs", "1", "--no-cache"]) == 1
@@ -0,0 +1,159 @@
+"""
+Battle clustering: correctness and scaling benchmark.
+
+The old clustering compared each death only with the previous one, so two
+fights at the same time in different places chopped each other into tiny
+clusters. cluster_labels links every pair of deaths within the time and
+space windows (grid-hashed), so concurrent battles stay intact.
+
+Run: poetry run python tests/test_battle_clustering.py
+"""
+
+import contextlib
+import io
+import time
+
+import numpy as np
+import pytest
+
+from sc2cast import unit_catalog
+from sc2cast.battle_clustering import IncrementalClusterer, cluster_labels, density_peak
+from sc2cast.event_prioritizer import BattleSettings, EventPrioritizer
+from sc2cast.event_store import EventStore
+
+
+TIME_WINDOW = 30
+SPACE_WINDOW = 20
+BENCHMARK_SIZES = (10**5, 10**6)
+
+
+def brute_force_labels(t, x, y, time_window, space_window):
+    """O(n^2) reference: union every linked pair, label by first appearance."""
+    n = len(t)
+    parent = list(range(n))
+
+    def root(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if abs(t[i] - t[j]) <= time_window and (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= space_window ** 2:
+                a, b = root(i), root(j)
+                parent[max(a, b)] = min(a, b)
+
+    numbering = {}
+    return np.array([numbering.setdefault(root(i), len(numbering)) for i in range(n)])
+
+
+def previous_death_labels(t, x, y, time_window, space_window):
+    """The old rule: a cluster ends where the next death is too late or too far."""
+    breaks = (np.diff(t) > time_window) | (np.hypot(np.diff(x), np.diff(y)) > space_window)
+    return np.concatenate(([0], np.cumsum(breaks)))
+
+
+def synthetic_deaths(n, seed=0, deaths_per_battle=50):
+    """Deaths from many overlapping battles on a 200x200 map (time-sorted)."""
+    rng = np.random.default_rng(seed)
+    battles = max(1, n // deaths_per_battle)
+    centers = rng.uniform(10, 190, (battles, 2))
+    starts = rng.uniform(0, n * 0.5, battles)
+
+    battle = rng.integers(0, battles, n)
+    t = np.floor(starts[battle] + rng.exponential(8, n))
+    xy = np.clip(np.round(centers[battle] + rng.normal(0, 5, (n, 2))), 0, 200)
+
+    order = np.argsort(t, kind="stable")
+    return t[order], xy[order, 0], xy[order, 1]
+
+
+def test_matches_brute_force():
+    """Grid-hashed clustering links exactly the pairs the O(n^2) reference does."""
+    rng = np.random.default_rng(42)
+    for _ in range(50):
+        n = int(rng.integers(1, 120))
+        t = np.sort(rng.integers(0, 300, n)).astype(float)
+        x = rng.integers(0, 120, n).astype(float)
+        y = rng.integers(0, 120, n).astype(float)
+
+        expected = brute_force_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW)
+        assert (cluster_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW) == expected).all()
+
+
+def test_concurrent_battles_stay_whole():
+    """Two simultaneous fights far apart are two battles, not many fragments."""
+    t = np.repeat(np.arange(100, 120), 2).astype(float)
+    x = np.tile([20.0, 150.0], 20)
+    y = np.tile([30.0, 140.0], 20)
+
+    labels = cluster_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW)
+
+    assert labels.max() + 1 == 2
+    assert (labels[0::2] == 0).all() and (labels[1::2] == 1).all()
+    # The old rule breaks between every death
+    assert previous_death_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW).max() + 1 == 40
+
+
+def test_density_peak_finds_the_burst():
+    """The peak is the burst of valuable deaths, not the battle's midpoint."""
+    t = np.array([100, 140, 141, 141, 142, 160])
+    values = np.array([1.0, 3.0, 6.0, 6.0, 2.0, 1.0])
+
+    peak, near_peak = density_peak(t, values)
+
+    assert peak == 141
+    assert near_peak[2] == 1.0 and near_peak[0] < 1e-6
+
+
+def test_battle_splits_value_by_killer_and_owner():
+    """Losses are charged to the dead unit's owner, kills to the killer."""
+    deaths = [('Marine', 1, 2)] * 4 + [('Stalker', 2, 1)] * 2 + [('Zealot', None, 1)]
+    records = [
+        {'timestamp': 100 + i, 'type': 'unit_died', 'unit_name': name, 'player': killer, 'owner': owner,
+         'priority': 'medium', 'location': {'x': 50, 'y': 50}}
+        for i, (name, owner, killer) in enumerate(deaths)
+    ]
+    prioritizer = EventPrioritizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(EventStore.from_records(records))
+
+    marine, stalker, zealot = (unit_catalog.lookup(name).value for name in ('Marine', 'Stalker', 'Zealot'))
+    battle = prioritizer.battles[0]
+    assert battle.losses_by_player == {1: round(4 * marine, 1), 2: round(2 * stalker, 1)}
+    assert battle.kills_by_player == {2: round(4 * marine, 1), 1: round(2 * stalker + zealot, 1)}
+    assert battle.to_dict()['deaths'][-1]['owner'] is None
+
+
+@pytest.mark.parametrize("time_window, space_window", [(0, 20), (30, 0), (-5, 20), (30, -1)])
+def test_windows_must_be_positive(time_window, space_window):
+    t, x, y = np.array([0.0, 1.0]), np.array([0.0, 1.0]), np.array([0.0, 1.0])
+    with pytest.raises(ValueError):
+        cluster_labels(t, x, y, time_window, space_window)
+    with pytest.raises(ValueError):
+        IncrementalClusterer(time_window, space_window)
+    with pytest.raises(ValueError):
+        BattleSettings(time_window=time_window, space_window=space_window)
+
+
+def main():
+    """Benchmark clustering on synthetic deaths."""
+    print("⏱️  BATTLE CLUSTERING BENCHMARK")
+    print("=" * 60)
+
+    for n in BENCHMARK_SIZES:
+        t, x, y = synthetic_deaths(n)
+
+        start = time.perf_counter()
+        labels = cluster_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW)
+        elapsed = time.perf_counter() - start
+
+        sizes = np.bincount(labels)
+        old_sizes = np.bincount(previous_death_labels(t, x, y, TIME_WINDOW, SPACE_WINDOW))
+        print(f"  {n:>9,} deaths: {elapsed:6.2f}s ({elapsed / n * 1e6:.2f} µs/death)")
+        print(f"      {'Grid-hashed:':<22}{(sizes >= 3).sum():>7,} battles of 3+ deaths")
+        print(f"      {'Previous-death rule:':<22}{(old_sizes >= 3).sum():>7,} battles of 3+ deaths")
+
+
+if __name__ == "__main__":
+    main()
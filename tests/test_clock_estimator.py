@@ -0,0 +1,137 @@
+"""
+Rate-estimating game clock on synthetic timer readings.
+
+Run: poetry run python -m pytest tests/test_clock_estimator.py
+"""
+
+import math
+
+from sc2cast.clock_estimator import ClockEstimator
+
+
+def feed(estimator, game_time, start, end, interval=0.2, misreads=()):
+    """Feed floor(game_time(t)) sampled every interval; return the events."""
+    events = []
+    t = start
+    while t < end:
+        value = math.floor(game_time(t))
+        if round(t, 3) in misreads:
+            value += 40
+        event = estimator.add(t, value)
+        if event:
+            events.append((round(t, 3), event))
+        t += interval
+    return events
+
+
+def test_fits_rate_and_fractional_time():
+    estimator = ClockEstimator(prior_rate=1.0)
+    # The prior is wrong: the first samples re-anchor the fit once
+    events = feed(estimator, lambda t: 100 + 8 * t, 0, 10)
+    assert [event for _, event in events] in ([], ["outlier", "speed_change"])
+
+    estimate = estimator.estimate(10.0)
+    assert abs(estimate.rate - 8) < 0.1
+    assert abs(estimate.game_time - 180) < 0.5
+    assert estimate.uncertainty < 0.5 and not estimate.paused
+
+    # Further out, the prediction gets less certain
+    assert estimator.uncertainty(20.0) > estimator.uncertainty(10.0)
+
+
+def test_single_misread_is_ignored():
+    estimator = ClockEstimator()
+    events = feed(estimator, lambda t: 30 + t, 0, 10, misreads={5.0})
+    assert events == [(5.0, "outlier")]
+    assert abs(estimator.game_time(10.0) - 40) < 0.5
+
+
+def test_speed_change_is_detected_and_refit():
+    def game_time(t):
+        return 50 + t if t < 5 else 55 + 8 * (t - 5)
+
+    estimator = ClockEstimator(prior_rate=1.0)
+    events = feed(estimator, game_time, 0, 12)
+    # The first sample off the line could be a misread; the second confirms the change
+    assert [event for _, event in events] == ["outlier", "speed_change"]
+    assert 5 < events[1][0] < 6 and estimator.outliers == 0
+
+    assert abs(estimator.rate - 8) < 0.3
+    assert abs(estimator.game_time(12.0) - game_time(12.0)) < 1.0
+
+
+def test_expected_rate_prior():
+    estimator = ClockEstimator(prior_rate=1.0)
+    feed(estimator, lambda t: 20 + t, 0, 5)
+    estimator.set_rate(4.0, 5.0)
+    assert not estimator.rate_fitted
+    assert abs(estimator.game_time(6.0) - 29) < 0.5
+
+
+def test_pause_and_resume():
+    def game_time(t):
+        if t < 5:
+            return 10 + t
+        if t < 10:
+            return 15.5   # Paused
+        return 15.5 + (t - 10)
+
+    estimator = ClockEstimator(prior_rate=1.0)
+    events = feed(estimator, game_time, 0, 15)
+    assert [event for _, event in events] == ["pause", "resume"]
+    pause_time = events[0][0]
+    assert 6.5 < pause_time < 8.5
+
+    estimate = estimator.estimate(15.0)
+    assert not estimate.paused and abs(estimate.game_time - game_time(15.0)) < 1.0
+
+    paused = ClockEstimator(prior_rate=1.0)
+    feed(paused, game_time, 0, 9)
+    estimate = paused.estimate(9.0)
+    assert estimate.paused and estimate.rate == 0 and abs(estimate.game_time - 15.5) <= 0.5
+
+
+def test_pause_at_high_speed():
+    """At 8x a stuck timer is a pause within a few samples, not a string of speed changes."""
+    def game_time(t):
+        if t < 5:
+            return 100 + 8 * t
+        if t < 9:
+            return 140.3  # Paused
+        return 140.3 + 8 * (t - 9)
+
+    estimator = ClockEstimator(prior_rate=8.0)
+    events = feed(estimator, game_time, 0, 9)
+    assert [event for _, event in events] == ["outlier", "pause"]
+    assert events[1][0] < 6 and estimator.speed_changes == 0
+    assert abs(estimator.game_time(9.0) - 140.3) <= 0.5
+
+    # A long stall was a real pause: the game resumes at its old speed
+    events = feed(estimator, game_time, 9.2, 14)
+    assert [event for _, event in events] == ["resume"]
+    assert abs(estimator.rate - 8) < 0.3 and abs(estimator.game_time(14.0) - game_time(14.0)) < 1.0
+
+
+def test_slowdown_is_not_a_series_of_pauses():
+    def game_time(t):
+        return 100 + 8 * t if t < 5 else 140 + (t - 5)
+
+    estimator = ClockEstimator(prior_rate=8.0)
+    events = feed(estimator, game_time, 0, 15)
+    # The first stall can't be told from a pause; after it the samples set the rate
+    assert [event for _, event in events] == ["outlier", "pause", "resume"]
+    assert abs(estimator.rate - 1) < 0.1
+    assert abs(estimator.game_time(15.0) - game_time(15.0)) < 0.5
+
+
+def test_regime_start_blends_with_prior():
+    """Two samples straddling a tick 0.2s apart don't make the rate 5."""
+    estimator = ClockEstimator(prior_rate=1.0)
+    estimator.add(0.0, 100)
+    estimator.add(0.2, 101)
+    assert estimator.rate_fitted and abs(estimator.rate - 1) < 0.1
+
+    # Samples over a few ticks take over from the prior
+    fitted = ClockEstimator(prior_rate=1.0)
+    feed(fitted, lambda t: 100.9 + 1.5 * t, 0, 6)
+    assert abs(fitted.rate - 1.5) < 0.1
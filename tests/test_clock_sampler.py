@@ -0,0 +1,129 @@
+"""
+Background timer sampling: lock-free ring buffer and non-blocking clock sync.
+
+Run: poetry run python -m pytest tests/test_clock_sampler.py
+"""
+
+import threading
+import time
+
+from sc2cast.clock_sampler import ClockSample, SampleRing
+from sc2cast.game_clock import GameClock
+from sc2cast.timer_reader import TimerReading
+
+
+class FakeTimer:
+    """Timer reader showing start + real elapsed time (plus a settable jump)."""
+
+    def __init__(self, start=10):
+        self.start = start
+        self.jump = 0
+        self.began = time.monotonic()
+
+    def capture_timer(self):
+        return self.start + self.jump + int(time.monotonic() - self.began)
+
+    def read(self, img):
+        return TimerReading(f"{img // 60}:{img % 60:02d}", str(img), 0.99, "glyph")
+
+    def time_to_seconds(self, text):
+        minutes, seconds = text.split(":")
+        return int(minutes) * 60 + int(seconds)
+
+
+def test_ring_keeps_latest():
+    ring = SampleRing(capacity=8)
+    assert ring.latest(3) == []
+    for i in range(100):
+        ring.push(ClockSample(float(i), i, 1.0))
+    assert len(ring) == 8 and ring.written == 100
+    assert [s.game_seconds for s in ring.latest(3)] == [97, 98, 99]
+    assert [s.game_seconds for s in ring.latest(100)] == list(range(92, 100))
+    assert [s.game_seconds for s in ring.since(97.0)] == [98, 99]
+
+
+def test_ring_readers_never_see_torn_or_reordered_samples():
+    ring = SampleRing(capacity=4)
+    done = threading.Event()
+
+    def writer():
+        for i in range(200_000):
+            ring.push(ClockSample(float(i), i, 1.0))
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while not done.is_set():
+        values = [s.game_seconds for s in ring.latest(4)]
+        assert values == sorted(values) and len(set(values)) == len(values)
+    thread.join()
+
+
+def test_read_from_returns_each_sample_once():
+    ring = SampleRing(capacity=8)
+    assert ring.read_from(0) == ([], 0)
+    for i in range(5):
+        ring.push(ClockSample(float(i), i, 1.0))
+    samples, cursor = ring.read_from(0)
+    assert [s.game_seconds for s in samples] == [0, 1, 2, 3, 4] and cursor == 5
+    assert ring.read_from(cursor) == ([], 5)
+
+    # A reader that fell behind gets what is still in the ring
+    for i in range(5, 20):
+        ring.push(ClockSample(float(i), i, 1.0))
+    samples, cursor = ring.read_from(cursor)
+    assert [s.game_seconds for s in samples] == list(range(12, 20)) and cursor == 20
+
+
+def test_read_from_under_concurrent_writer():
+    ring = SampleRing(capacity=16)
+    total = 200_000
+    done = threading.Event()
+
+    def writer():
+        for i in range(total):
+            ring.push(ClockSample(float(i), i, 1.0))
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    seen, cursor = [], 0
+    while True:
+        finished = done.is_set()
+        samples, end = ring.read_from(cursor)
+        values = [s.game_seconds for s in samples]
+        # Never older than the cursor, never past the returned end, in order
+        assert all(cursor <= v < end for v in values) and values == sorted(values)
+        seen.extend(values)
+        cursor = end
+        if finished:
+            break
+    thread.join()
+
+    assert len(set(seen)) == len(seen)          # Nothing read twice
+    assert seen == sorted(seen) and seen[-1] == total - 1 and cursor == total
+
+
+def test_clock_syncs_without_blocking():
+    timer = FakeTimer(start=10)
+    clock = GameClock(replay_duration_seconds=600, timer_reader=timer, sample_interval=0.01)
+    try:
+        assert clock.wait_for_replay_start(timeout=5.0, poll_interval=0.02)
+        assert 10 <= clock.get_current_game_time() <= 11
+
+        # The game jumps ahead: the next validation re-anchors the clock from samples
+        timer.jump = 20
+        time.sleep(0.1)
+        start = time.perf_counter()
+        is_valid, drift = clock.validate_sync()
+        assert time.perf_counter() - start < 0.01
+        assert not is_valid and drift >= 19
+        assert 30 <= clock.get_current_game_time() <= 31
+
+        # Nothing new sampled since: nothing to validate against
+        clock.sampler.stop()
+        clock.validate_sync()
+        assert clock.validate_sync() == (True, None)
+        assert not clock.check_if_ended()
+    finally:
+        clock.stop()
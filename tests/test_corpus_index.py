@@ -0,0 +1,70 @@
+"""
+Corpus index: incremental updates and queries on the bundled replay.
+
+Run: poetry run python -m pytest tests/test_corpus_index.py
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from sc2cast import paths, replay_loader
+from sc2cast.corpus_index import DEFAULT_INDEX_PATH, CorpusIndex, analyze_replay, matchup_of
+from sc2cast.replay_cache import hash_replay
+
+
+REPLAY = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+def test_matchup_is_order_independent():
+    assert matchup_of(["Zerg", "Protoss"]) == matchup_of(["Protoss", "Zerg"]) == "PvZ"
+    assert matchup_of("ZvP".split("v")) == "PvZ"
+
+
+def test_incremental_update_and_query(tmp_path):
+    corpus = tmp_path / "replays"
+    corpus.mkdir()
+    shutil.copy(REPLAY, corpus / "a.SC2Replay")
+
+    with CorpusIndex(tmp_path / "index.sqlite") as index:
+        assert index.update(corpus, cache_dir=None)["analyzed"] == 1
+        assert index.update(corpus, cache_dir=None)["unchanged"] == 1
+
+        # Same content under a new name or a new mtime is not re-analyzed
+        shutil.copy(REPLAY, corpus / "b.SC2Replay")
+        os.utime(corpus / "a.SC2Replay", (0, 0))
+        counts = index.update(corpus, cache_dir=None)
+        assert (counts["touched"], counts["analyzed"]) == (2, 0)
+
+        (corpus / "b.SC2Replay").unlink()
+        assert index.update(corpus, cache_dir=None)["removed"] == 1
+
+        rows = index.query(matchup="TvP", map_name="persephone")
+        assert [Path(row["path"]).name for row in rows] == ["a.SC2Replay"]
+        assert rows[0]["battles"] == 1 and rows[0]["build"] == 75689
+        assert [p["race"] for p in index.players_of(rows[0]["path"])] == ["Terran", "Protoss"]
+
+        assert index.query(race="Zerg") == []
+        assert index.query(min_high_battles=1) == []
+
+
+def test_analysis_keeps_cache_and_memo_in_cache_dir(tmp_path, monkeypatch):
+    digest = hash_replay(REPLAY)
+    cache_dir = tmp_path / "cache"
+
+    row = analyze_replay(REPLAY, digest, cache_dir=cache_dir)
+    assert row["hash"] == digest and row["battles"] == 1
+    assert (cache_dir / "memo" / "load_levels.json").exists()
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    # No cache dir: no memo is built (nothing is written anywhere)
+    def no_memo(*args, **kwargs):
+        raise AssertionError("memo built without a cache dir")
+
+    monkeypatch.setattr(replay_loader, "LoadLevelMemo", no_memo)
+    assert analyze_replay(REPLAY, digest, cache_dir=None)["battles"] == 1
+
+
+def test_default_index_does_not_depend_on_cwd():
+    assert DEFAULT_INDEX_PATH.is_absolute()
+    assert DEFAULT_INDEX_PATH == paths.DATA_DIR / "corpus.sqlite"
@@ -0,0 +1,71 @@
+"""
+EventIndex range queries vs brute-force scans.
+
+Run: poetry run python -m pytest tests/test_event_index.py
+"""
+
+import random
+
+from sc2cast.event_index import EventIndex
+from sc2cast.event_prioritizer import PrioritizedEvent, BattleEvent
+
+
+def random_events(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        PrioritizedEvent(rng.randint(0, 600), 'tech', 'event', None, 'medium', 60, rng.randint(0, 12))
+        for _ in range(count)
+    ]
+
+
+def test_overlapping_and_next_after_match_scans():
+    events = random_events(500)
+    index = EventIndex(events)
+    rng = random.Random(1)
+
+    for _ in range(500):
+        t0 = rng.randint(-20, 650)
+        t1 = t0 + rng.randint(0, 40)
+
+        expected = {id(e) for e in events if e.time_seconds <= t1 and e.time_seconds + e.duration >= t0}
+        assert {id(e) for e in index.overlapping(t0, t1)} == expected
+
+        later = [e.time_seconds for e in events if e.time_seconds > t0]
+        upcoming = index.next_after(t0)
+        assert (upcoming is None and not later) or upcoming.time_seconds == min(later)
+
+
+def test_battle_spans_and_histogram():
+    battles = [
+        BattleEvent(start_time=50, end_time=80, location={'x': 0, 'y': 0}, deaths=[], army_value_lost=5, priority='low'),
+        BattleEvent(start_time=130, end_time=135, location={'x': 0, 'y': 0}, deaths=[], army_value_lost=5, priority='high'),
+    ]
+    index = EventIndex([b.to_dict() for b in battles])
+
+    assert [b['start_time'] for b in index.active_at(70)] == [50]
+    assert index.active_at(100) == []
+    assert index.histogram().tolist() == [1, 0, 1]
+    assert index.histogram(lambda b: b['priority'] == 'high').tolist() == [0, 0, 1]
+
+
+def test_long_span_only_widens_its_own_class():
+    events = random_events(500)
+    # One game-long event
+    events.append(PrioritizedEvent(0, 'game', 'whole game', None, 'low', 60, 620))
+    index = EventIndex(events)
+
+    # Short events are still only searched back by their own spans
+    spans = sorted(max_span for _, _, max_span in index._span_classes)
+    assert spans[-1] == 620 and spans[-2] <= 12
+    assert [len(members) for members, _, span in index._span_classes if span == 620] == [1]
+
+    rng = random.Random(2)
+    for _ in range(200):
+        t0 = rng.randint(-20, 650)
+        t1 = t0 + rng.randint(0, 40)
+        expected = [e for e in events if e.time_seconds <= t1 and e.time_seconds + e.duration >= t0]
+        found = index.overlapping(t0, t1)
+        assert {id(e) for e in found} == {id(e) for e in expected}
+        assert [e.time_seconds for e in found] == sorted(e.time_seconds for e in expected)
+
+    assert EventIndex([]).overlapping(0, 10) == []
@@ -0,0 +1,135 @@
+"""
+Columnar EventStore: list-of-dicts compatibility and prioritizer filters.
+
+EventStore replaced the extractor's list of event dicts. It must round-trip
+that format exactly, index like a list, hand out read-only views, and the
+prioritizer's vectorized masks must select the same events the old
+per-dict loops did.
+
+Run: poetry run python -m pytest tests/test_event_store.py
+"""
+
+import contextlib
+import io
+import random
+from collections.abc import Mapping
+
+import numpy as np
+import pytest
+
+from sc2cast import unit_catalog
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.event_store import EventStore
+
+
+UNIT_NAMES = ['Marine', 'Stalker', 'Zergling', 'SCV', 'Larva', 'MineralField', 'Hatchery', 'Nexus',
+              'CommandCenter', 'Spire', 'Stargate', 'Factory', 'RoboticsBay', 'Colossus', 'Unknown']
+
+
+def random_events(count, seed=0):
+    """Raw events in EventExtractor format, with missing players and locations."""
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        event_type = rng.choice(['unit_born', 'unit_died', 'unit_died', 'upgrade_complete'])
+        event = {
+            'timestamp': rng.randint(0, 1200),
+            'type': event_type,
+            'player': rng.choice([1, 2, None] if event_type == 'unit_died' else [1, 2]),
+            'priority': rng.choice(['low', 'medium', 'high']),
+            'location': None,
+        }
+        if event_type == 'upgrade_complete':
+            event['upgrade_name'] = rng.choice(['Stimpack', 'WarpGateResearch'])
+        else:
+            event['unit_name'] = rng.choice(UNIT_NAMES)
+            if rng.random() > 0.1:
+                event['location'] = {'x': rng.randint(0, 200), 'y': rng.randint(0, 200)}
+        if event_type == 'unit_died':
+            event['owner'] = rng.choice([1, 2, None])
+        events.append(event)
+    return events
+
+
+def test_round_trip():
+    events = random_events(500)
+    store = EventStore.from_records(events)
+    assert len(store) == 500
+    assert store.to_dicts() == events
+
+    # A one-shot stream works too, and a store is passed through as is
+    assert EventStore.from_records(iter(events)).to_dicts() == events
+    assert EventStore.from_records(store) is store
+
+
+def test_indexing():
+    events = random_events(50, seed=1)
+    store = EventStore.from_records(events)
+
+    assert dict(store[3]) == events[3]
+    assert dict(store[-1]) == events[-1]
+    with pytest.raises(IndexError):
+        store[50]
+
+    assert store[10:20].to_dicts() == events[10:20]
+    mask = store.of_type('unit_died') & store.with_priority('high')
+    assert store[mask].to_dicts() == [e for e in events if e['type'] == 'unit_died' and e['priority'] == 'high']
+    assert store[np.array([5, 2])].to_dicts() == [events[5], events[2]]
+
+    # Sub-stores share the name table
+    assert store[mask].names == store.names
+
+    ordered = store.sorted_by_time().to_dicts()
+    assert ordered == sorted(events, key=lambda e: e['timestamp'])
+
+
+def test_views_are_read_only():
+    store = EventStore.from_records(random_events(20, seed=2))
+    view = store[0]
+    assert isinstance(view, Mapping)
+    with pytest.raises(TypeError):
+        view['priority'] = 'high'
+    with pytest.raises(KeyError):
+        view['missing']
+
+    # Mutating a to_dicts() copy leaves the store alone
+    copy = store.to_dicts()[0]
+    copy['priority'] = 'changed'
+    assert store[0]['priority'] != 'changed'
+
+
+def dict_army_deaths(events):
+    """Old per-dict filter: army deaths with a location."""
+    return [
+        e for e in events
+        if e['type'] == 'unit_died' and e.get('location') and unit_catalog.lookup(e.get('unit_name', 'Unknown')).value > 0
+    ]
+
+
+def dict_births(events, flag):
+    return [e for e in events if e['type'] == 'unit_born' and getattr(unit_catalog.lookup(e['unit_name']), flag)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_prioritizer_masks_match_dict_filters(seed):
+    events = random_events(2000, seed=seed)
+    store = EventStore.from_records(events)
+    prioritizer = EventPrioritizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(store)
+
+    deaths = store[store.of_type('unit_died')]
+    assert prioritizer.army_deaths(deaths).to_dicts() == dict_army_deaths(events)
+
+    expansions = [e for e in dict_births(events, 'is_expansion') if e['timestamp'] >= 10]
+    assert [(e.time_seconds, e.description, e.location) for e in prioritizer.expansions] == [
+        (e['timestamp'], f"P{e['player']} expands - {e['unit_name']}", e['location']) for e in expansions
+    ]
+    assert [(e.time_seconds, e.description, e.location) for e in prioritizer.tech_events] == [
+        (e['timestamp'], f"P{e['player']} builds {e['unit_name']}", e['location']) for e in dict_births(events, 'is_tech')
+    ]
+
+    # Every death of every battle is an army death
+    army = {(e['timestamp'], e['location']['x'], e['location']['y']) for e in dict_army_deaths(events)}
+    for battle in prioritizer.battles:
+        assert all((d['timestamp'], d['location']['x'], d['location']['y']) in army for d in battle.deaths)
@@ -0,0 +1,83 @@
+"""
+Streaming event extraction: generator and sc2reader plugin modes.
+
+Both modes must produce exactly what EventExtractor does on the same replay:
+the same event records in the same order, and the same player stats.
+
+Run: poetry run python -m pytest tests/test_event_stream.py
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+import sc2reader
+from sc2reader import utils
+from sc2reader.engine import GameEngine
+
+from sc2cast.event_extractor import EventExtractor
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.event_stream import StreamingEventExtractor
+from sc2cast.replay_loader import apply_sc2reader_patch
+from sc2cast.tracker_events import iter_tracker_records
+
+
+REPLAY_PATH = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """EventExtractor's events and player stats for the bundled replay."""
+    extractor = EventExtractor(REPLAY_PATH)
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.load_replay()
+        extractor.extract_events()
+    return extractor
+
+
+def test_stream_matches_extractor(reference):
+    streaming = StreamingEventExtractor(REPLAY_PATH)
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = list(streaming.stream())
+
+    assert records == reference.events.to_dicts()
+    assert streaming.event_count == len(records)
+    assert streaming.player_stats.to_records() == reference.player_stats.to_records()
+    assert streaming.game_length_seconds == reference.game_length_seconds == 310
+
+
+def test_prioritizer_consumes_stream(reference):
+    with contextlib.redirect_stdout(io.StringIO()):
+        streamed = EventPrioritizer()
+        streamed.process_events(StreamingEventExtractor(REPLAY_PATH).stream())
+        loaded = EventPrioritizer()
+        loaded.process_events(reference.events)
+
+    assert [b.to_dict() for b in streamed.battles] == [b.to_dict() for b in loaded.battles]
+    assert len(streamed.all_priority_events) == len(loaded.all_priority_events)
+
+
+def test_plugin_mode_matches_extractor(reference):
+    records = []
+    extractor = StreamingEventExtractor(REPLAY_PATH, callback=records.append)
+    apply_sc2reader_patch()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sc2reader.load_replay(str(REPLAY_PATH), load_level=3, load_map=False, engine=GameEngine(plugins=[extractor]))
+
+    assert records == reference.events.to_dicts()
+    assert extractor.event_count == len(records)
+    assert extractor.player_stats.to_records() == reference.player_stats.to_records()
+
+
+def test_misframed_tracker_data_raises():
+    apply_sc2reader_patch()
+    replay = sc2reader.load_replay(str(REPLAY_PATH), load_level=1, load_map=False, engine=None)
+    data = utils.extract_data_file("replay.tracker.events", replay.archive)
+    assert sum(1 for _ in iter_tracker_records(data)) == 514
+
+    # A stray byte shifts every later event: decoding stops instead of misreading
+    for corrupted in (b"\x00" + data, data[:1000] + b"\x00" + data[1000:], data[:-3]):
+        with pytest.raises(ValueError):
+            for _ in iter_tracker_records(corrupted):
+                pass
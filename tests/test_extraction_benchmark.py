@@ -0,0 +1,153 @@
+"""
+Benchmark event extraction: legacy two-pass vs single-pass dispatch.
+
+The legacy extractor walked the event list twice (unit registry, then
+_process_event with type(event).__name__ and hasattr/getattr lookups on
+every event). The current extractor does one pass with a dispatch table
+keyed by event class.
+
+Run: poetry run python tests/test_extraction_benchmark.py
+"""
+
+import contextlib
+import io
+import time
+from pathlib import Path
+
+import numpy as np
+
+from sc2cast.event_extractor import EventExtractor
+from sc2cast.event_store import EventStore
+
+
+REPLAY_PATH = Path("replays/4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay")
+REPEATS = 200
+
+
+def legacy_extract(extractor, events):
+    """Reference copy of the original two-pass extraction loop."""
+    unit_registry = {}
+    for event in events:
+        if type(event).__name__ == "UnitBornEvent":
+            unit_id = getattr(event, 'unit_id', None)
+            unit_type = getattr(event, 'unit_type_name', None)
+            if unit_id and unit_type:
+                unit_registry[unit_id] = (unit_type, getattr(event, 'control_pid', None))
+
+    extracted = []
+    for event in events:
+        event_type = type(event).__name__
+
+        location = None
+        if hasattr(event, 'location') and event.location:
+            location = {"x": event.location[0], "y": event.location[1]}
+        elif hasattr(event, 'x') and hasattr(event, 'y'):
+            location = {"x": event.x, "y": event.y}
+
+        if event_type == "UnitBornEvent":
+            unit_name = getattr(event, 'unit_type_name', 'Unknown')
+            extracted.append({
+                "timestamp": event.second,
+                "type": "unit_born",
+                "unit_name": unit_name,
+                "player": getattr(event, 'control_pid', 0),
+                "priority": extractor._calculate_priority("unit_born", event, unit_name),
+                "location": location
+            })
+        elif event_type == "UnitDiedEvent":
+            unit_name, owner = unit_registry.get(getattr(event, 'unit_id', None), ('Unknown', None))
+            extracted.append({
+                "timestamp": event.second,
+                "type": "unit_died",
+                "unit_name": unit_name,
+                "player": getattr(event, 'killer_pid', 0),
+                "owner": owner,
+                "priority": extractor._calculate_priority("unit_died", event, unit_name),
+                "location": location
+            })
+        elif event_type == "UpgradeCompleteEvent":
+            upgrade_name = getattr(event, 'upgrade_type_name', 'Unknown')
+            extracted.append({
+                "timestamp": event.second,
+                "type": "upgrade_complete",
+                "upgrade_name": upgrade_name,
+                "player": getattr(event, 'pid', 0),
+                "priority": extractor._calculate_priority("upgrade_complete", event, upgrade_name),
+                "location": None
+            })
+
+    return extracted
+
+
+def load_extractor():
+    """Load the bundled replay once (quietly)."""
+    extractor = EventExtractor(REPLAY_PATH)
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.load_replay()
+    return extractor
+
+
+def run_single_pass(extractor):
+    """Run the current extractor and return its events."""
+    extractor.events = EventStore()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.extract_events()
+    return extractor.events
+
+
+def time_per_event(func, event_count):
+    """Average cost of func() per input event, in microseconds."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    elapsed = time.perf_counter() - start
+    return elapsed / REPEATS / event_count * 1e6
+
+
+def test_single_pass_matches_legacy():
+    """Single-pass extraction must produce exactly the legacy events."""
+    extractor = load_extractor()
+    events = extractor.replay.tracker_events
+
+    assert run_single_pass(extractor).to_dicts() == legacy_extract(extractor, events)
+
+
+def test_deaths_record_the_dead_units_owner():
+    """A death's owner is the player who had the unit, not its killer."""
+    extractor = load_extractor()
+    deaths = run_single_pass(extractor)
+    deaths = deaths[deaths.of_type("unit_died") & (deaths.owners > 0) & (deaths.players > 0)]
+
+    # Only an expiring MULE "kills" itself
+    self_kills = deaths[deaths.owners == deaths.players]
+    assert len(deaths) > 40 and set(self_kills.names_of()) == {"MULE"}
+    assert set(np.unique(deaths.owners)) == {1, 2}
+
+
+def main():
+    """Benchmark both extractors on the bundled replay."""
+    print("⏱️  EVENT EXTRACTION BENCHMARK")
+    print("=" * 60)
+
+    if not REPLAY_PATH.exists():
+        print(f"❌ Replay not found: {REPLAY_PATH}")
+        return
+
+    extractor = load_extractor()
+    events = extractor.replay.tracker_events
+    print(f"📂 {REPLAY_PATH.name}: {len(events)} tracker events, {REPEATS} repeats")
+
+    assert run_single_pass(extractor).to_dicts() == legacy_extract(extractor, events)
+    print("✅ Outputs identical")
+
+    before = time_per_event(lambda: legacy_extract(extractor, events), len(events))
+    after = time_per_event(lambda: run_single_pass(extractor), len(events))
+
+    print()
+    print(f"  Legacy two-pass:      {before:6.2f} µs/event")
+    print(f"  Single-pass dispatch: {after:6.2f} µs/event")
+    print(f"  Speedup:              {before / after:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Glyph-template timer reader on synthetic timer crops.
+
+Run: poetry run python -m pytest tests/test_glyph_reader.py
+"""
+
+import inspect
+import time
+
+import numpy as np
+
+from sc2cast import paths
+from sc2cast.glyph_reader import DEFAULT_TEMPLATES_PATH, GlyphReader, GlyphTemplates
+from sc2cast.timer_reader import RECOGNIZER_HEIGHT, GameTimerReader, preprocess_for_recognizer
+
+
+READ_BUDGET_MS = 5  # Generous: a read is ~0.1 ms, the OCR it replaces tens of ms
+
+
+# 5x7 bitmap font standing in for the game's timer font
+FONT = {
+    '0': ["01110", "10001", "10011", "10101", "11001", "10001", "01110"],
+    '1': ["00100", "01100", "00100", "00100", "00100", "00100", "01110"],
+    '2': ["01110", "10001", "00001", "00010", "00100", "01000", "11111"],
+    '3': ["11110", "00001", "00001", "01110", "00001", "00001", "11110"],
+    '4': ["00010", "00110", "01010", "10010", "11111", "00010", "00010"],
+    '5': ["11111", "10000", "11110", "00001", "00001", "10001", "01110"],
+    '6': ["00110", "01000", "10000", "11110", "10001", "10001", "01110"],
+    '7': ["11111", "00001", "00010", "00100", "01000", "01000", "01000"],
+    '8': ["01110", "10001", "10001", "01110", "10001", "10001", "01110"],
+    '9': ["01110", "10001", "10001", "01111", "00001", "00010", "01100"],
+    ':': ["0", "1", "1", "0", "1", "1", "0"],
+    '/': ["00001", "00010", "00010", "00100", "01000", "01000", "10000"],
+}
+
+
+def render(text, seed=0, noise=12):
+    """A 200x25 RGB timer crop: light text on a dark, slightly noisy background."""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(10, 10 + noise, size=(25, 200, 3)).astype(np.int16)
+    x = 4
+    for char in text:
+        if char == ' ':
+            x += 6
+            continue
+        bitmap = np.array([[c == '1' for c in row] for row in FONT[char]])
+        glyph = np.kron(bitmap, np.ones((2, 2), dtype=bool))
+        img[5:5 + glyph.shape[0], x:x + glyph.shape[1]][glyph] = (230, 210, 120)
+        x += glyph.shape[1] + 2
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def learned_templates():
+    templates = GlyphTemplates()
+    for i, text in enumerate(["0:12 / 3:45", "6:07 / 8:59", "10:36 / 12:48"]):
+        assert templates.learn(render(text, seed=i), text)
+    return templates
+
+
+def test_reads_learned_glyphs():
+    reader = GlyphReader(learned_templates())
+    reading = reader.read(render("9:58 / 14:03", seed=7))
+    assert reading.text == "9:58/14:03"
+    assert reading.confidence > 0.95
+
+
+def test_no_text_or_templates():
+    assert GlyphReader(learned_templates()).read(np.full((25, 200, 3), 30, dtype=np.uint8)) is None
+    assert GlyphReader().read(render("1:00")) is None
+
+
+def test_unknown_glyph_has_low_confidence():
+    templates = GlyphTemplates()
+    templates.learn(render("1:11"), "1:11")
+    assert GlyphReader(templates).read(render("8:88")).confidence < 0.85
+
+
+def test_read_is_fast():
+    reader = GlyphReader(learned_templates())
+    img = render("7:21 / 11:09")
+    reader.read(img)
+
+    # Best of three batches, so a busy CI machine doesn't fail the bound
+    per_read = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(100):
+            reader.read(img)
+        per_read.append((time.perf_counter() - start) / 100 * 1000)
+    assert min(per_read) < READ_BUDGET_MS, f"glyph read took {min(per_read):.2f} ms (budget {READ_BUDGET_MS} ms)"
+
+
+def test_timer_reader_falls_back_to_ocr_and_learns(tmp_path):
+    class FakeOCR:
+        def __init__(self):
+            self.calls = []
+
+        def readtext(self, img, detail=1):
+            self.calls.append(('readtext', img.shape))
+            return [(None, "4:44 / 5:55", 0.9)]
+
+        def recognize(self, img, horizontal_list, free_list, allowlist, detail=1):
+            self.calls.append(('recognize', img.shape))
+            assert horizontal_list == [[0, img.shape[1], 0, img.shape[0]]] and allowlist == "0123456789:/"
+            return [(None, "4:44/5:55", 0.9)]
+
+    path = tmp_path / "glyphs.npz"
+    learned_templates().save(path)
+
+    # Complete templates: EasyOCR isn't loaded up front
+    reader = GameTimerReader(templates_path=path, gate=False)
+    assert reader._reader is None
+
+    reading = reader.read(render("2:19 / 5:55"))
+    assert (reading.clean_time, reading.source) == ("2:19", "glyph")
+
+    # An unconfident glyph read goes to OCR
+    reader._reader = FakeOCR()
+    reader.min_confidence = 1.01
+    reading = reader.read(render("4:44 / 5:55"))
+    assert (reading.clean_time, reading.source) == ("4:44", "ocr")
+    assert (reader.glyph_reads, reader.ocr_reads) == (1, 1)
+    assert GlyphTemplates.load(path).counts['4'] > learned_templates().counts.get('4', 0)
+
+    # Text detection + recognizer by default; recognizer-only gets the preprocessed crop
+    assert reader._reader.calls == [('readtext', (25, 200, 3))]
+    reader.ocr_mode = "recognize"
+    reader.read(render("4:44 / 5:55"))
+    assert reader._reader.calls[-1] == ('recognize', (RECOGNIZER_HEIGHT, 512))
+
+    latency = reader.measure_ocr_latency(render("4:44 / 5:55"), repeats=2)
+    assert set(latency) == {"readtext", "recognize"} and latency["recognize"]["text"] == "4:44/5:55"
+
+
+def test_recognizer_preprocessing():
+    gray = preprocess_for_recognizer(render("1:23 / 4:56"))
+    assert gray.shape == (RECOGNIZER_HEIGHT, 512) and gray.dtype == np.uint8
+    assert set(np.unique(gray)) == {0, 255}
+    assert (gray == 0).mean() < 0.5  # Dark text on white
+
+
+def test_unchanged_crop_is_served_from_cache(tmp_path):
+    path = tmp_path / "glyphs.npz"
+    learned_templates().save(path)
+    reader = GameTimerReader(templates_path=path)
+
+    first = reader.read(render("3:07 / 9:28", seed=1))
+    again = reader.read(render("3:07 / 9:28", seed=2))  # Same text, new capture noise
+    ticked = reader.read(render("3:08 / 9:28", seed=3))
+
+    assert not first.cached and again.cached and not ticked.cached
+    assert again.clean_time == "3:07" and ticked.clean_time == "3:08"
+    assert (reader.gate_hits, reader.gate_misses, reader.glyph_reads) == (1, 2, 2)
+    assert reader.gate_hit_rate == 1 / 3
+
+    # Extrapolated within the displayed second
+    assert again.extrapolated_seconds(now=again.since + 0.5) == 187.5
+    assert again.extrapolated_seconds(now=again.since + 5.0) < 188
+
+
+def test_default_templates_live_in_the_data_dir():
+    assert DEFAULT_TEMPLATES_PATH.is_absolute()
+    assert DEFAULT_TEMPLATES_PATH == paths.DATA_DIR / "timer_glyphs.npz"
+    assert inspect.signature(GameTimerReader).parameters["templates_path"].default == DEFAULT_TEMPLATES_PATH
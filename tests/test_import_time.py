@@ -0,0 +1,76 @@
+"""
+Import-time budget for the analysis modules.
+
+Analysis-only code (batch workers, prioritization, script generation) must
+not import GUI automation or OCR backends. pyautogui and easyocr (which
+pulls in torch) are loaded lazily on first use instead.
+
+Run: poetry run python tests/test_import_time.py
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative import time allowed for sc2cast.event_prioritizer (mostly NumPy)
+IMPORT_BUDGET_MS = 500
+
+HEAVY_MODULES = ("pyautogui", "easyocr", "torch", "cv2")
+ANALYSIS_MODULES = ("sc2cast.event_prioritizer", "sc2cast.script_generator", "sc2cast.game_clock")
+
+
+def run_python(*args):
+    """Run a fresh interpreter with src/ on the path and return its result."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of a module in a fresh interpreter (-X importtime)."""
+    result = run_python("-X", "importtime", "-c", f"import {module}")
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def heavy_modules_imported(module: str):
+    """Heavy backends present in sys.modules after importing a module."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = run_python("-c", code).stdout.strip()
+    return output.split(",") if output else []
+
+
+def test_event_prioritizer_import_budget():
+    """import sc2cast.event_prioritizer stays under the import-time budget."""
+    # Best of three to smooth out a cold disk cache
+    elapsed = min(import_time_ms("sc2cast.event_prioritizer") for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_MS, f"import took {elapsed:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
+
+
+def test_analysis_modules_skip_heavy_backends():
+    """Analysis modules don't import GUI automation or OCR backends."""
+    for module in ANALYSIS_MODULES:
+        assert heavy_modules_imported(module) == [], module
+
+
+def main():
+    """Report import times for the analysis modules."""
+    print("⏱️  IMPORT TIME")
+    print("=" * 60)
+    for module in ANALYSIS_MODULES:
+        elapsed = min(import_time_ms(module) for _ in range(3))
+        heavy = heavy_modules_imported(module)
+        status = "✅" if not heavy else f"❌ imports {', '.join(heavy)}"
+        print(f"  {module:<28} {elapsed:7.1f} ms  {status}")
+    print(f"\n  Budget for sc2cast.event_prioritizer: {IMPORT_BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Incremental prioritization (push / poll_closed) vs batch process_events.
+
+The incremental API finalizes expansions and tech as they arrive and
+battles once no later death can join them. It must end up with the same
+battles, expansions and tech as the batch path.
+
+Run: poetry run python tests/test_incremental_prioritizer.py
+"""
+
+import contextlib
+import io
+import random
+import time
+
+from sc2cast.event_prioritizer import EventPrioritizer, BattleSettings
+
+
+UNIT_NAMES = ['Marine', 'Stalker', 'Zergling', 'Roach', 'SCV', 'Larva', 'Hatchery', 'Nexus',
+              'Spire', 'Stargate', 'Factory', 'CommandCenter', 'Colossus', 'MineralField']
+
+
+def synthetic_events(count, seed=0, duration=1200):
+    """Time-sorted raw events with fights scattered over a 200x200 map."""
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        event_type = rng.choice(['unit_born', 'unit_died', 'unit_died'])
+        events.append({
+            'timestamp': rng.randint(0, duration),
+            'type': event_type,
+            'unit_name': rng.choice(UNIT_NAMES),
+            'player': rng.choice([1, 2, None] if event_type == 'unit_died' else [1, 2]),
+            'priority': 'low',
+            'location': {'x': rng.randint(0, 200), 'y': rng.randint(0, 200)} if rng.random() > 0.05 else None,
+        })
+    events.sort(key=lambda e: e['timestamp'])
+    return events
+
+
+def run_batch(events):
+    prioritizer = EventPrioritizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(events)
+    return prioritizer
+
+
+def run_incremental(events):
+    prioritizer = EventPrioritizer()
+    polled = []
+    for event in events:
+        prioritizer.push(event)
+        polled.extend(prioritizer.poll_closed())
+    polled.extend(prioritizer.flush())
+    return prioritizer, polled
+
+
+def describe(prioritizer):
+    """Comparable summary: battles by start time, expansions and tech in order."""
+    battles = sorted((b.to_dict() for b in prioritizer.battles), key=lambda b: (b['start_time'], str(b['deaths'])))
+    return battles, [e.to_dict() for e in prioritizer.expansions], [e.to_dict() for e in prioritizer.tech_events]
+
+
+def test_incremental_matches_batch():
+    """push/poll_closed/flush finds exactly the batch battles, expansions and tech."""
+    for seed in range(10):
+        events = synthetic_events(3000, seed)
+        batch = run_batch(events)
+        incremental, polled = run_incremental(events)
+
+        assert describe(incremental) == describe(batch)
+        assert sorted(e.to_dict()['time_seconds'] for e in polled) == [e.time_seconds for e in batch.all_priority_events]
+        assert incremental.get_summary() == batch.get_summary()
+
+
+def test_battle_closes_after_time_window():
+    """A battle is reported once time_window seconds pass without a joining death."""
+    prioritizer = EventPrioritizer()
+    for second in (100, 101, 102):
+        prioritizer.push({'timestamp': second, 'type': 'unit_died', 'unit_name': 'Marine',
+                          'player': 2, 'priority': 'medium', 'location': {'x': 50, 'y': 50}})
+
+    prioritizer.push({'timestamp': 102 + BattleSettings.time_window, 'type': 'unit_born',
+                      'unit_name': 'SCV', 'player': 1, 'priority': 'low', 'location': {'x': 0, 'y': 0}})
+    assert prioritizer.poll_closed() == []
+
+    prioritizer.push({'timestamp': 103 + BattleSettings.time_window, 'type': 'unit_born',
+                      'unit_name': 'SCV', 'player': 1, 'priority': 'low', 'location': {'x': 0, 'y': 0}})
+    assert [e.event_type for e in prioritizer.poll_closed()] == ['battle']
+
+
+def main():
+    """Time per pushed event on a long synthetic game."""
+    print("⏱️  INCREMENTAL PRIORITIZER BENCHMARK")
+    print("=" * 60)
+
+    for count in (10_000, 100_000):
+        events = synthetic_events(count, duration=count // 5)
+
+        start = time.perf_counter()
+        prioritizer, polled = run_incremental(events)
+        elapsed = time.perf_counter() - start
+
+        print(f"  {count:>7,} events: {elapsed / count * 1e6:6.2f} µs/event, "
+              f"{len(prioritizer.battles)} battles, {len(polled)} events polled")
+
+
+if __name__ == "__main__":
+    main()
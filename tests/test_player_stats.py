@@ -0,0 +1,137 @@
+"""
+Player stats time series: lookups, economic event detection, and their use
+for battle scoring and stat panel timing.
+
+Run: poetry run python -m pytest tests/test_player_stats.py
+"""
+
+import contextlib
+import io
+
+import numpy as np
+
+from sc2cast.camera_director import ShotType
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.event_store import EventStore
+from sc2cast.player_stats import STAT_COLUMNS, PlayerStats
+from sc2cast.script_generator import ScriptGenerator
+
+
+def record(t, player, **values):
+    row = {'timestamp': t, 'player': player}
+    row.update({column: values.get(column, 0) for column in STAT_COLUMNS})
+    return row
+
+
+def sample_stats():
+    """Two players sampled every 10s for 200s (plus an off-grid final sample)."""
+    records = []
+    for t in list(range(0, 200, 10)) + [203]:
+        # Player 1: income jumps at 100s, loses 1000 army resources at 150s
+        income = 600 if t < 100 else 1200
+        lost = 0 if t < 150 else 1000
+        # Player 2: supply blocked at 30 / 30 from 50s to 70s
+        used = 30 if 50 <= t <= 70 else 20
+        records.append(record(t, 1, mineral_income=income, army_lost=lost, supply_used=40, supply_made=46))
+        records.append(record(t, 2, mineral_income=500, army_lost=t, supply_used=used, supply_made=30))
+    return PlayerStats.from_records(records)
+
+
+def test_value_at_is_last_sample_at_or_before():
+    stats = sample_stats()
+    assert stats.players == [1, 2]
+    assert stats.value_at(1, 'mineral_income', 99) == 600
+    assert stats.value_at(1, 'mineral_income', 100) == 1200
+    assert stats.value_at(1, 'army_lost', 10_000) == 1000
+    assert stats.value_at(1, 'army_lost', -5) == 0
+    assert stats.value_at(2, 'army_lost', np.array([0, 15, 203])).tolist() == [0, 10, 203]
+
+
+def test_records_round_trip():
+    stats = sample_stats()
+    again = PlayerStats.from_records(stats.to_records())
+    for player in stats.players:
+        for column in STAT_COLUMNS:
+            assert np.array_equal(again.series[player].columns[column], stats.series[player].columns[column])
+
+
+def test_economic_events():
+    stats = sample_stats()
+    assert [(e.time_seconds, e.player) for e in stats.army_swings()] == [(150, 1)]
+    assert [(e.time_seconds, e.player) for e in stats.income_spikes()] == [(100, 1)]
+
+    [block] = stats.supply_blocks()
+    assert (block.time_seconds, block.player, block.duration) == (50, 2, 30)
+
+    kinds = [e.kind for e in stats.economic_events()]
+    assert kinds == ['supply_block', 'income_spike', 'army_swing']
+
+
+def test_resources_lost_window():
+    stats = sample_stats()
+    # Widened to the enclosing samples: 140..150 and 10..50
+    assert stats.resources_lost(145, 148) == 1000 + 10
+    assert stats.resources_lost(20, 40) == 0 + 40
+
+    # Restricted to some players
+    assert stats.resources_lost(145, 148, players=[1]) == 1000
+    assert stats.resources_lost(145, 148, players=[2, 3]) == 10
+
+
+def deaths_at(x, owner, unit_name, count):
+    return [
+        {'timestamp': 145 + i % 3, 'type': 'unit_died', 'player': 3 - owner, 'owner': owner, 'unit_name': unit_name,
+         'priority': 'medium', 'location': {'x': x, 'y': 50}}
+        for i in range(count)
+    ]
+
+
+def test_concurrent_battles_are_charged_their_participants_losses():
+    # P1 loses marines at x=50 while P2 loses zealots at x=150, within one sample interval
+    prioritizer = EventPrioritizer(player_stats=sample_stats())
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(deaths_at(50, 1, 'Marine', 6) + deaths_at(150, 2, 'Zealot', 3))
+    assert sorted(b.resources_lost for b in prioritizer.battles) == [10, 1000]
+
+    # Known over-count: samples have no location, so two battles in which the
+    # same player loses units within one sample interval are each charged both
+    prioritizer = EventPrioritizer(player_stats=sample_stats())
+    with contextlib.redirect_stdout(io.StringIO()):
+        prioritizer.process_events(deaths_at(50, 1, 'Marine', 3) + deaths_at(150, 1, 'Marine', 3))
+    assert [b.resources_lost for b in prioritizer.battles] == [1000, 1000]
+
+
+def test_battles_scored_by_resources_lost():
+    records = [
+        {'timestamp': 145 + i % 3, 'type': 'unit_died', 'player': 1, 'unit_name': 'Marine',
+         'priority': 'medium', 'location': {'x': 50, 'y': 50}}
+        for i in range(6)
+    ]
+    store = EventStore.from_records(records)
+
+    by_value = EventPrioritizer()
+    by_resources = EventPrioritizer(player_stats=sample_stats())
+    with contextlib.redirect_stdout(io.StringIO()):
+        by_value.process_events(store)
+        by_resources.process_events(store)
+
+    assert by_value.battles[0].resources_lost is None
+    assert by_value.battles[0].priority == 'low'
+    battle = by_resources.battles[0]
+    assert battle.resources_lost == 1010
+    assert battle.priority == 'medium'
+    assert '1010 resources lost' in by_resources.all_priority_events[0].description
+
+
+def test_stat_panels_follow_economic_events():
+    stats = sample_stats()
+    generator = ScriptGenerator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fixed = generator.generate_from_events([], 200)
+        timed = generator.generate_from_events([], 200, stats.economic_events())
+
+    def panels(shots):
+        return [(s.time_seconds, s.params['panel']) for s in shots if s.shot_type == ShotType.STAT_PANEL]
+
+    assert panels(fixed) == [(15, 'income')]
+    assert panels(timed) == [(50, 'production'), (100, 'income'), (150, 'units_lost')]
@@ -0,0 +1,93 @@
+"""
+Recording pipeline director loop driven by a fake game clock.
+
+Run: poetry run python -m pytest tests/test_recording_pipeline.py
+"""
+
+from pathlib import Path
+
+import pytest
+
+from sc2cast import recording_pipeline
+from sc2cast.clock_estimator import ClockEstimate
+from sc2cast.recording_pipeline import RecordingPipeline
+from sc2cast.replay_session import ReplaySession
+
+
+class FakeClock:
+    """Ends after `ticks` loop iterations; validations report the queued drifts."""
+
+    def __init__(self, ticks, validations):
+        self.ticks = ticks
+        self.validations = list(validations)
+        self.game_time = 0.0
+        self.stopped = False
+
+    def check_if_ended(self):
+        self.ticks -= 1
+        return self.ticks < 0
+
+    def get_game_time(self):
+        self.game_time += 1.0
+        return self.game_time
+
+    def get_current_game_time_formatted(self):
+        return "0:00"
+
+    def should_validate_now(self, validation_interval=1.0):
+        return bool(self.validations)
+
+    def validate_sync(self):
+        return self.validations.pop(0)
+
+    def get_estimate(self):
+        return ClockEstimate(game_time=self.game_time, rate=8.0, uncertainty=0.25, paused=False)
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeDirector:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, game_time):
+        self.updates.append(game_time)
+
+    def get_progress(self):
+        return f"{len(self.updates)} updates"
+
+
+def test_director_loop_reports_only_recalibrations(monkeypatch, capsys):
+    monkeypatch.setattr(recording_pipeline.time, "sleep", lambda seconds: None)
+    pipeline = RecordingPipeline(Path("missing.SC2Replay"), [], Path("out.mp4"))
+    pipeline.replay_duration = 310
+    pipeline.clock = FakeClock(ticks=5, validations=[(True, 0.2), (True, None), (False, 4.5), (True, 0.1)])
+    pipeline.director = FakeDirector()
+
+    assert pipeline.run_director_loop() == 4
+    assert pipeline.director.updates == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert pipeline.clock.stopped
+
+    output = capsys.readouterr().out
+    assert output.count("Clock recalibrated") == 1
+    assert "drift was: 4.5s, rate now 8.00x ± 0.25s" in output
+
+
+def test_replay_is_a_session_or_a_path():
+    session = ReplaySession(Path("game.SC2Replay"))
+    assert RecordingPipeline(session, [], Path("out.mp4")).session is session
+
+    pipeline = RecordingPipeline(replay=Path("game.SC2Replay"), camera_script=[], output_path=Path("out.mp4"))
+    assert pipeline.session.replay_path == pipeline.replay_path == Path("game.SC2Replay")
+
+
+def test_replay_path_keyword_still_works():
+    with pytest.warns(DeprecationWarning):
+        pipeline = RecordingPipeline(replay_path=Path("game.SC2Replay"), camera_script=[], output_path=Path("out.mp4"))
+    assert pipeline.replay_path == Path("game.SC2Replay")
+
+    with pytest.raises(TypeError):
+        RecordingPipeline(Path("a.SC2Replay"), [], Path("out.mp4"), replay_path=Path("b.SC2Replay"))
+    with pytest.raises(TypeError):
+        RecordingPipeline(camera_script=[], output_path=Path("out.mp4"))
@@ -0,0 +1,62 @@
+"""
+Content-addressed replay analysis cache: hits, eviction, corruption, keys.
+
+Run: poetry run python -m pytest tests/test_replay_cache.py
+"""
+
+import os
+
+from sc2cast import paths
+from sc2cast.replay_cache import DEFAULT_CACHE_DIR, ReplayCache
+
+
+def test_hit_and_miss(tmp_path):
+    cache = ReplayCache(tmp_path / "cache")
+    assert cache.get("missing-v1") is None
+
+    cache.put("abc-v1", {"events": [1, 2, 3]})
+    assert cache.get("abc-v1") == {"events": [1, 2, 3]}
+
+    cache.clear()
+    assert cache.get("abc-v1") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ReplayCache(tmp_path, max_bytes=10**6)
+    payload = {"data": "x" * 1000}
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, payload)
+        os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+
+    # Reading "a" makes it the most recently used
+    assert cache.get("a") is not None
+
+    cache.max_bytes = 2500
+    cache.put("d", payload)
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["a", "d"]
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ReplayCache(tmp_path)
+    (tmp_path / "bad-v1.json").write_text('{"events": [1, 2', encoding="utf-8")
+    assert cache.get("bad-v1") is None
+    assert not (tmp_path / "bad-v1.json").exists()
+
+
+def test_key_follows_content_and_version(tmp_path):
+    cache = ReplayCache(tmp_path)
+    replay = tmp_path / "game.SC2Replay"
+    replay.write_bytes(b"replay bytes")
+
+    key = cache.key_for(replay, 3)
+    assert key == cache.key_for(tmp_path / "unused", 3, data=b"replay bytes")
+    assert key != cache.key_for(replay, 4)   # Extractor version bump invalidates
+
+    replay.write_bytes(b"other bytes")
+    assert cache.key_for(replay, 3) != key   # So does new content under the same name
+
+
+def test_default_dir_does_not_depend_on_cwd(monkeypatch, tmp_path):
+    assert DEFAULT_CACHE_DIR.is_absolute()
+    monkeypatch.setenv("SC2CAST_DATA_DIR", str(tmp_path))
+    assert paths.data_dir() == tmp_path
@@ -0,0 +1,56 @@
+"""
+Header-only replay metadata against sc2reader's own load of the same replay.
+
+Run: poetry run python -m pytest tests/test_replay_header.py
+"""
+
+import contextlib
+import io
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sc2reader
+from sc2reader import utils
+
+from sc2cast.replay_header import game_loops_to_seconds, read_build_numbers, read_replay_metadata
+from sc2cast.replay_loader import apply_sc2reader_patch
+
+
+REPLAY_PATH = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+def test_metadata_matches_sc2reader():
+    metadata = read_replay_metadata(REPLAY_PATH)
+    apply_sc2reader_patch()
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay = sc2reader.load_replay(str(REPLAY_PATH), load_level=1, load_map=False, engine=None)
+
+    # Duration and version from the header
+    assert metadata["game_length_seconds"] == replay.game_length.seconds == 310
+    assert metadata["game_length_formatted"] == "5:10"
+    assert metadata["game_loops"] == replay.frames
+    assert (metadata["build"], metadata["base_build"]) == (replay.build, replay.base_build)
+    assert metadata["game_version"] == replay.release_string
+
+    # Map, players and date from replay.details (AI-arena replays have no
+    # cache_handles, so sc2reader's own Replay attributes stay unset: compare
+    # against its decoded details instead)
+    details = replay.raw_data["replay.details"]
+    assert metadata["map_name"] == details["map_name"] == "Persephone AIE"
+    assert [(p["name"], p["race"], p["result"]) for p in metadata["players"]] == [
+        (p["name"], p["race"], {1: "Win", 2: "Loss"}[p["result"]]) for p in details["players"]
+    ]
+    unix_time = utils.windows_to_unix(details["file_time"] - details["utc_adjustment"])
+    expected_date = datetime.fromtimestamp(unix_time, tz=timezone.utc).replace(tzinfo=None)
+    assert datetime.fromisoformat(metadata["date"]).replace(microsecond=0) == expected_date
+
+    # Map size and speed from replay.initData
+    game_description = replay.raw_data["replay.initData"]["game_description"]
+    assert metadata["map_size"] == (game_description["map_size_x"], game_description["map_size_y"])
+    assert metadata["game_speed"] == game_description["game_speed"]
+
+
+def test_build_numbers_and_loop_conversion():
+    assert read_build_numbers(REPLAY_PATH.read_bytes()) == (75689, 75689)
+    assert game_loops_to_seconds(6948, 75689) == 310
+    assert game_loops_to_seconds(16 * 60, 30000) == 60   # Pre-LotV builds run at 16 loops per second
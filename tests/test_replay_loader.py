@@ -0,0 +1,126 @@
+"""
+Load level ladder and the per-build memo of levels that fail.
+
+Run: poetry run python -m pytest tests/test_replay_loader.py
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+import sc2reader
+from sc2reader.resources import Replay
+
+from sc2cast import replay_loader
+from sc2cast.replay_loader import LOAD_LADDER, LoadLevelMemo, apply_sc2reader_patch, load_replay_ladder, load_tracker_only, memo_for
+
+
+REPLAY_PATH = Path("replays/4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay")
+BASE_BUILD = 75689
+
+
+def test_level_is_skipped_after_repeated_failures(tmp_path):
+    memo = LoadLevelMemo(tmp_path / "memo.json")
+    memo.record(BASE_BUILD, "tracker", success=False)
+    assert memo.ladder_for(BASE_BUILD) == list(LOAD_LADDER)  # One bad file isn't enough
+
+    memo.record(BASE_BUILD, "tracker", success=False)
+    assert memo.ladder_for(BASE_BUILD) == [3, 2, 0]
+    assert memo.ladder_for(12345) == list(LOAD_LADDER)     # Other builds are unaffected
+
+    # A level that ever worked is never skipped
+    memo.record(BASE_BUILD, 3, success=True)
+    memo.record(BASE_BUILD, 3, success=False)
+    memo.record(BASE_BUILD, 3, success=False)
+    assert 3 in memo.ladder_for(BASE_BUILD)
+
+
+def test_memo_persists_and_merges(tmp_path):
+    path = tmp_path / "memo" / "load_levels.json"
+    first, second = LoadLevelMemo(path), LoadLevelMemo(path)
+    first.record(BASE_BUILD, 2, success=False)
+    second.record(BASE_BUILD, 2, success=False)  # Another process, stale in-memory copy
+
+    assert LoadLevelMemo(path).outcomes == {str(BASE_BUILD): {"2": [0, 2]}}
+    assert 2 not in LoadLevelMemo(path).ladder_for(BASE_BUILD)
+
+
+def test_never_leaves_nothing_to_try(tmp_path):
+    memo = LoadLevelMemo(tmp_path / "memo.json")
+    for level in LOAD_LADDER:
+        for _ in range(2):
+            memo.record(BASE_BUILD, level, success=False)
+    assert memo.ladder_for(BASE_BUILD) == [LOAD_LADDER[-1]]
+
+
+def test_memo_follows_cache_dir(tmp_path):
+    assert memo_for(None) is None
+    assert memo_for(tmp_path).path == tmp_path / "memo" / "load_levels.json"
+
+
+def test_ladder_falls_back_and_records(tmp_path, monkeypatch):
+    attempts = []
+
+    def fake_load(replay_path, load_level=4, tracker_only=False, data=None):
+        level = "tracker" if tracker_only else load_level
+        attempts.append(level)
+        if level == "tracker":
+            raise ValueError("broken tracker events")
+        return f"replay@{level}"
+
+    monkeypatch.setattr(replay_loader, "load_replay_safe", fake_load)
+    monkeypatch.setattr(replay_loader, "read_build_numbers", lambda data: (BASE_BUILD + 1, BASE_BUILD))
+    memo = LoadLevelMemo(tmp_path / "memo.json")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(3):
+            assert load_replay_ladder("game.SC2Replay", data=b"", memo=memo) == ("replay@3", 3)
+
+    # Two failed attempts, then the build skips straight to level 3
+    assert attempts == ["tracker", 3, "tracker", 3, 3]
+    assert memo.outcomes[str(BASE_BUILD)] == {"tracker": [0, 2], "3": [1, 0]}
+
+    # The last level's error propagates
+    monkeypatch.setattr(replay_loader, "load_replay_safe", lambda *args, **kwargs: 1 / 0)
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(ZeroDivisionError):
+        load_replay_ladder("game.SC2Replay", data=b"")
+
+
+def test_bundled_replay_loads_tracker_only(tmp_path):
+    memo = LoadLevelMemo(tmp_path / "memo.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay, level = load_replay_ladder(REPLAY_PATH, memo=memo)
+    assert level == "tracker" and replay.tracker_events
+    assert memo.outcomes == {str(BASE_BUILD): {"tracker": [1, 0]}}
+
+
+def tracker_signature(replay):
+    return [(e.__class__.__name__, e.frame, e.second, getattr(e, 'unit_id', None), getattr(e, 'pid', None))
+            for e in replay.tracker_events]
+
+
+def test_tracker_only_matches_full_load():
+    apply_sc2reader_patch()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker_only = load_tracker_only(str(REPLAY_PATH))
+        full = sc2reader.load_replay(str(REPLAY_PATH), load_level=3, load_map=False)
+
+    assert tracker_signature(tracker_only) == tracker_signature(full)
+    assert len(tracker_only.tracker_events) == 514
+    assert tracker_only.game_length.seconds == full.game_length.seconds == 310
+
+
+def test_tracker_only_skips_messages_players_and_game_events(monkeypatch):
+    def broken(self):
+        raise IndexError("level 2+ step")
+
+    # The steps that break on AI-arena replays never run
+    for step in ("load_message_events", "load_players", "load_game_events"):
+        monkeypatch.setattr(Replay, step, broken)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay = load_tracker_only(str(REPLAY_PATH))
+    assert replay.load_level == 1 and replay.events == []
+    assert not {"replay.message.events", "replay.game.events"} & set(replay.raw_data)
+    assert len(replay.tracker_events) == 514
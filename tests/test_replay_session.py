@@ -0,0 +1,64 @@
+"""
+ReplaySession: one lazily parsed replay shared by every pipeline stage.
+
+Run: poetry run python -m pytest tests/test_replay_session.py
+"""
+
+import contextlib
+import io
+from pathlib import Path
+
+from sc2cast import replay_session
+from sc2cast.replay_cache import ReplayCache
+from sc2cast.replay_session import ReplaySession
+
+
+REPLAY_PATH = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+def test_of_takes_a_path_or_a_session():
+    session = ReplaySession.of(REPLAY_PATH)
+    assert isinstance(session, ReplaySession) and session.replay_path == REPLAY_PATH
+    assert ReplaySession.of(str(REPLAY_PATH)).replay_path == REPLAY_PATH
+
+    # An existing session is shared, not wrapped or re-created
+    assert ReplaySession.of(session) is session
+
+
+def test_nothing_is_read_until_used():
+    session = ReplaySession(Path("missing.SC2Replay"))
+    assert session._metadata is None and session._extractor is None
+
+
+def test_metadata_comes_from_the_header():
+    session = ReplaySession(REPLAY_PATH)
+    assert session.duration == 310 and session.duration_formatted == "5:10"
+    assert session.metadata["map_name"] == "Persephone AIE"
+    assert session._extractor is None  # No sc2reader load for the duration
+
+
+def test_events_are_extracted_once(tmp_path):
+    session = ReplaySession(REPLAY_PATH, cache=ReplayCache(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        events = session.events
+        assert session.extractor is session.extractor
+    assert len(events) > 0 and session.player_stats
+    assert session.events is events
+
+    # A second session for the same replay is served from the cache
+    again = ReplaySession(REPLAY_PATH, cache=ReplayCache(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert again.events.to_dicts() == events.to_dicts()
+    assert again.extractor.from_cache
+
+
+def test_metadata_falls_back_to_the_extractor(monkeypatch):
+    def broken_header(path):
+        raise ValueError("unreadable header")
+
+    monkeypatch.setattr(replay_session, "read_replay_metadata", broken_header)
+    session = ReplaySession(REPLAY_PATH)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert session.duration == 310
+    assert session.metadata["map_name"] == "Persephone AIE"
+    assert session._extractor is not None
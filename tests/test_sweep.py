@@ -0,0 +1,87 @@
+"""
+Battle settings sweep: grid, coverage metrics and per-setting summaries.
+
+Run: poetry run python -m pytest tests/test_sweep.py
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from sc2cast import sweep
+from sc2cast.event_prioritizer import BattleEvent, BattleSettings
+from sc2cast.sweep import covered_seconds, settings_grid, summarize
+
+
+def battle(start, end):
+    return BattleEvent(start_time=start, end_time=end, location={"x": 0, "y": 0}, deaths=[],
+                       army_value_lost=0, priority="low")
+
+
+def metrics(battles, army_deaths, battle_deaths, battle_seconds, game_seconds, high_battles=0):
+    return {"battles": battles, "high_battles": high_battles, "army_deaths": army_deaths,
+            "battle_deaths": battle_deaths, "battle_seconds": battle_seconds, "game_seconds": game_seconds}
+
+
+def test_grid_covers_every_combination():
+    grid = settings_grid(time_window=[20, 30], min_deaths=[3, 5], high_deaths=[10, 15])
+    assert len(grid) == 8 and len(set(grid)) == 8
+    assert grid[0] == BattleSettings(time_window=20, min_deaths=3, high_deaths=10)
+    assert grid[-1] == BattleSettings(time_window=30, min_deaths=5, high_deaths=15)
+
+    # Axes not swept keep their defaults
+    assert all(s.space_window == BattleSettings().space_window for s in grid)
+    assert settings_grid() == [BattleSettings()]
+
+
+def test_overlapping_battles_count_once():
+    assert covered_seconds([]) == 0
+    assert covered_seconds([battle(100, 130)]) == 30
+    # Two fights at once in different places, one inside another, one apart
+    assert covered_seconds([battle(120, 150), battle(100, 130), battle(105, 110), battle(200, 210)]) == 60
+    assert covered_seconds([battle(100, 130), battle(130, 140)]) == 40
+
+
+def test_summarize_aggregates_per_setting():
+    grid = [BattleSettings(min_deaths=3), BattleSettings(min_deaths=5, medium_deaths=4)]
+    per_replay = [
+        [metrics(4, 40, 30, 120, 600, high_battles=1), metrics(2, 40, 20, 60, 600)],
+        [metrics(2, 10, 5, 30, 300), metrics(0, 10, 0, 0, 300)],
+    ]
+    first, second = summarize(grid, per_replay)
+
+    assert first["min_deaths"] == 3 and second["medium_deaths"] == 4
+    assert all(name in first for name in sweep.SETTING_FIELDS)
+    assert (first["battles"], first["high_battles"], first["battles_per_replay"]) == (6, 1, 3.0)
+    assert first["death_coverage"] == round(35 / 50, 3)
+    assert first["time_coverage"] == round(150 / 900, 3)
+    assert (second["battles"], second["death_coverage"], second["time_coverage"]) == (2, 0.4, round(60 / 900, 3))
+
+    # No replays (or no army deaths) is zero coverage, not a division error
+    empty = summarize(grid, [])
+    assert [row["battles"] for row in empty] == [0, 0]
+    assert empty[0]["death_coverage"] == 0.0 and empty[0]["battles_per_replay"] == 0.0
+
+
+def test_cli_sweeps_death_thresholds(tmp_path, monkeypatch):
+    swept = {}
+
+    def fake_run_sweep(replay_dir, grid, jobs=1, cache_dir=None):
+        swept["grid"] = grid
+        return summarize(grid, [])
+
+    monkeypatch.setattr(sweep, "run_sweep", fake_run_sweep)
+    argv = [str(tmp_path), "--high-deaths", "10,15", "--medium-deaths", "5", "--out", str(tmp_path / "sweep.csv")]
+    assert sweep.main(argv) == 0
+
+    assert [(s.high_deaths, s.medium_deaths) for s in swept["grid"]] == [(10, 5), (15, 5)]
+    assert (tmp_path / "sweep.csv").read_text(encoding="utf-8").startswith(",".join(sweep.SETTING_FIELDS))
+
+
+@pytest.mark.parametrize("option", ["--time-windows", "--space-windows"])
+def test_cli_rejects_non_positive_windows(tmp_path, option):
+    with contextlib.redirect_stderr(io.StringIO()), pytest.raises(SystemExit):
+        sweep.main([str(tmp_path), option, "20,0"])
+    with contextlib.redirect_stderr(io.StringIO()), pytest.raises(SystemExit):
+        sweep.main([str(tmp_path), option, "-10"])
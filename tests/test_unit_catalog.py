@@ -0,0 +1,105 @@
+"""
+Unit catalog classification.
+
+Run: poetry run python -m pytest tests/test_unit_catalog.py
+"""
+
+import pytest
+
+from sc2cast import unit_catalog
+from sc2cast.event_prioritizer import EventPrioritizer
+from sc2cast.event_store import EventStore
+
+
+def test_only_founding_townhalls_are_expansions():
+    for name in ['CommandCenter', 'Nexus', 'Hatchery']:
+        assert unit_catalog.lookup(name).is_expansion, name
+    for name in ['Lair', 'Hive', 'OrbitalCommand', 'PlanetaryFortress']:
+        info = unit_catalog.lookup(name)
+        assert info.category == 'townhall' and not info.is_expansion, name
+
+
+def test_variants_share_their_base_entry():
+    assert unit_catalog.normalize('SiegeTankSieged') == 'siegetank'
+    assert unit_catalog.normalize('VikingFighter') == 'viking'
+    assert unit_catalog.normalize('ZerglingBurrowed') == 'zergling'
+    assert unit_catalog.normalize('LurkerMPBurrowed') == 'lurker'
+    assert unit_catalog.lookup('FactoryTechLab').is_tech is False
+    assert unit_catalog.lookup('SomethingNew').category == 'unknown'
+
+
+def test_priorities():
+    assert unit_catalog.lookup('Hatchery').born_priority == 'high'
+    assert unit_catalog.lookup('Gateway').born_priority == 'medium'
+    assert unit_catalog.lookup('Probe').born_priority == 'low'
+    assert unit_catalog.lookup('Carrier').died_priority == 'high'
+    assert unit_catalog.lookup('Marine').died_priority == 'medium'
+    assert unit_catalog.lookup('MineralField').died_priority == 'low'
+    assert unit_catalog.upgrade_priority('SprayTerran') == 'low'
+    assert unit_catalog.upgrade_priority('TerranInfantryWeaponsLevel1') == 'low'
+    assert unit_catalog.upgrade_priority('ZerglingMovementSpeed') == 'medium'
+
+
+# (name, priority under the old substring rules, catalog priority)
+BORN_CHANGES = [
+    ('Factory', 'medium', 'high'),              # Tech path, like Stargate
+    ('Starport', 'medium', 'high'),
+    ('FactoryFlying', 'medium', 'high'),
+    ('FusionCore', 'low', 'high'),
+    ('PlanetaryFortress', 'low', 'high'),        # Town hall, like OrbitalCommand
+    ('WarpGate', 'low', 'medium'),               # Production ('gateway' not a substring)
+    ('SpawningPool', 'low', 'medium'),
+    ('RoachWarren', 'low', 'medium'),
+    ('HydraliskDen', 'low', 'medium'),
+    ('BarracksTechLab', 'medium', 'low'),        # Add-ons matched 'barracks'/'factory'/'starport'
+    ('FactoryReactor', 'medium', 'low'),
+    ('StarportTechLab', 'medium', 'low'),
+    ('RoboticsBay', 'high', 'high'),             # Unchanged: a tech building
+]
+
+DIED_CHANGES = [
+    ('Archon', 'low', 'high'),                   # Army value 4+
+    ('Immortal', 'low', 'high'),
+    ('VoidRay', 'low', 'high'),
+    ('Tempest', 'low', 'high'),
+    ('Marauder', 'low', 'medium'),               # Every army unit, not six named ones
+    ('Queen', 'low', 'medium'),
+    ('SiegeTankSieged', 'low', 'medium'),
+    ('Lair', 'low', 'high'),                     # Every town hall
+    ('Hive', 'low', 'high'),
+    ('PlanetaryFortress', 'low', 'high'),
+    ('RoachWarren', 'medium', 'low'),            # Matched 'roach'/'hydralisk'/'baneling'/'ultralisk'
+    ('HydraliskDen', 'medium', 'low'),
+    ('BanelingNest', 'medium', 'low'),
+    ('UltraliskCavern', 'high', 'low'),
+    ('BanelingCocoon', 'medium', 'low'),
+    ('BroodLordCocoon', 'high', 'low'),
+    ('Spire', 'low', 'low'),                     # Unchanged: tech building deaths
+    ('Stargate', 'low', 'low'),
+    ('RoboticsBay', 'low', 'low'),
+]
+
+
+@pytest.mark.parametrize("name, before, after", BORN_CHANGES)
+def test_born_priority_changes(name, before, after):
+    assert unit_catalog.lookup(name).born_priority == after
+
+
+@pytest.mark.parametrize("name, before, after", DIED_CHANGES)
+def test_died_priority_changes(name, before, after):
+    assert unit_catalog.lookup(name).died_priority == after
+
+
+def test_store_column_and_prioritizer():
+    births = [
+        {'timestamp': 60 + i, 'type': 'unit_born', 'unit_name': name, 'player': 1,
+         'priority': 'low', 'location': {'x': 10, 'y': 10}}
+        for i, name in enumerate(['Hatchery', 'Lair', 'Hive', 'Spire', 'FactoryTechLab', 'Drone'])
+    ]
+    store = EventStore.from_records(births)
+    assert unit_catalog.column(store, 'is_expansion', dtype=bool).tolist() == [True, False, False, False, False, False]
+
+    prioritizer = EventPrioritizer()
+    prioritizer.process_events(births)
+    assert [e.description for e in prioritizer.expansions] == ['P1 expands - Hatchery']
+    assert [e.description for e in prioritizer.tech_events] == ['P1 builds Spire']
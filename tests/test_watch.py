@@ -0,0 +1,82 @@
+"""
+Watch mode: debouncing, change detection and the bounded analysis loop.
+
+Run: poetry run python -m pytest tests/test_watch.py
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from sc2cast.batch import is_done
+from sc2cast.script_generator import ScriptGenerator
+from sc2cast.watch import Debouncer, InotifyWatcher, PollingWatcher, WatchDaemon, make_watcher
+
+
+REPLAY = Path(__file__).resolve().parents[1] / "replays" / "4323200_changeling_Mike_MagannathaAIE_v2.SC2Replay"
+
+
+def test_debouncer_waits_for_writes_to_stop(tmp_path):
+    path = tmp_path / "a.SC2Replay"
+    path.write_bytes(b"partial")
+    debouncer = Debouncer(settle_seconds=5)
+    debouncer.touch(path)
+
+    now = time.time()
+    assert debouncer.settled(now) == set()          # First look
+    assert debouncer.settled(now + 1) == set()      # Unchanged, but modified too recently
+
+    with open(path, "ab") as f:
+        f.write(b" more")
+    os.utime(path, (now - 10, now - 10))
+    assert debouncer.settled(now + 2) == set()      # Changed since the last look
+    assert debouncer.settled(now + 3) == {path}
+    assert len(debouncer) == 0
+
+
+def test_watchers_see_new_replays(tmp_path):
+    watchers = [PollingWatcher(tmp_path, interval=0), make_watcher(tmp_path)]
+    for watcher in watchers:
+        watcher.changes(timeout=0)
+
+    (tmp_path / "new.SC2Replay").write_bytes(b"data")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    for watcher in watchers:
+        assert watcher.changes(timeout=1) == {tmp_path / "new.SC2Replay"}, type(watcher).__name__
+        watcher.close()
+    assert isinstance(watchers[1], (InotifyWatcher, PollingWatcher))
+
+
+def test_daemon_prepares_artifacts(tmp_path):
+    replays, out = tmp_path / "replays", tmp_path / "out"
+    replays.mkdir()
+    shutil.copy(REPLAY, replays / "game.SC2Replay")
+    os.utime(replays / "game.SC2Replay", (time.time() - 60, time.time() - 60))
+
+    daemon = WatchDaemon(replays, out, jobs=1, settle_seconds=1, cache_dir=None)
+    stats = daemon.run(exit_when_idle=True, tick=0.1)
+
+    assert stats == {"analyzed": 1, "failed": 0, "skipped": 0}
+    assert is_done(replays / "game.SC2Replay", out)
+    assert ScriptGenerator.load_script(out / "game" / "analysis.npz")
+
+    # Already analyzed replays are skipped on restart
+    assert WatchDaemon(replays, out, jobs=1, cache_dir=None).run(exit_when_idle=True, tick=0.1)["skipped"] == 1
+
+
+def test_replay_written_during_analysis_is_rechecked(tmp_path):
+    daemon = WatchDaemon(tmp_path, tmp_path / "out", jobs=1, use_inotify=False, cache_dir=None)
+    path = tmp_path / "game.SC2Replay"
+    path.write_bytes(b"data")
+
+    daemon._enqueue(path)
+    daemon._enqueue(path)
+    assert list(daemon.queue) == [path]    # Queued once
+
+    daemon.in_flight[object()] = daemon.queue.popleft()
+    daemon._queued.discard(path)
+    daemon._enqueue(path)
+    assert not daemon.queue and len(daemon.debouncer) == 1
+    daemon.watcher.close()